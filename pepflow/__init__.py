@@ -60,9 +60,18 @@ from .operator import StronglyMonotoneOperator as StronglyMonotoneOperator
 from .operator import Duplet as Duplet
 from .parameter import Parameter as Parameter
 from .scalar import EvaluatedScalar as EvaluatedScalar
+from .sparse_array import SparseArray as SparseArray
+from .low_rank import LowRankMatrix as LowRankMatrix
+from .gram_matrix import GramMatrix as GramMatrix
+from .gram_matrix import EvaluatedGramMatrix as EvaluatedGramMatrix
+from .gram_matrix import gram as gram
+from .rational_array import RationalArray as RationalArray
 from .scalar import Scalar as Scalar
+from .scalar import sum_scalars as sum_scalars
 from .vector import EvaluatedVector as EvaluatedVector
 from .vector import Vector as Vector
+from .vector import VectorArray as VectorArray
+from .vector import sum_vectors as sum_vectors
 
 # Solver
 from .solver import CVXPrimalSolver as CVXPrimalSolver
@@ -76,6 +85,7 @@ from .utils import SOP_self as SOP_self
 from .utils import NUMERICAL_TYPE as NUMERICAL_TYPE
 from .utils import PEPType as PEPType
 from .utils import Comparator as Comparator
+from .utils import EvalBackend as EvalBackend
 from .ipython_utils import pprint_str as pprint_str
 from .ipython_utils import pprint_matrix as pprint_matrix
 from .ipython_utils import pprint_labeled_vector as pprint_labeled_vector
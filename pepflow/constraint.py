@@ -25,6 +25,7 @@ import attrs
 import numpy as np
 
 if TYPE_CHECKING:
+    from pepflow.gram_matrix import GramMatrix
     from pepflow.scalar import Scalar
     from pepflow.utils import Comparator
 
@@ -149,6 +150,12 @@ class ScalarConstraint(Constraint):
         self.associated_dual_var_constraints.append((utils.Comparator.EQ, val))
 
 
+def _matrix_shape(matrix: np.ndarray | GramMatrix | float) -> tuple[int, ...] | None:
+    """Return the shape of an np.ndarray or :class:`GramMatrix`, `None` otherwise."""
+    # Numbers, including numpy scalars whose shape is `()`, have no shape.
+    return getattr(matrix, "shape", None) or None
+
+
 @attrs.frozen
 class PSDConstraint(Constraint):
     """A :class:`PSDConstraint` object that represents positive semidefinite
@@ -158,10 +165,12 @@ class PSDConstraint(Constraint):
     `X << Y`, `X >> Y`, and `X = Y`.
 
     Attributes:
-        lhs (np.ndarray | float): The matrix on the left hand side of the relation.
-            The np.ndarray is composed of :class:`Scalar` objects.
-        rhs (np.ndarray | float): The matrix on the right hand side of the relation.
-            The np.ndarray is composed of :class:`Scalar` objects.
+        lhs (np.ndarray | :class:`GramMatrix` | float): The matrix on the left
+            hand side of the relation. The np.ndarray is composed of
+            :class:`Scalar` objects.
+        rhs (np.ndarray | :class:`GramMatrix` | float): The matrix on the right
+            hand side of the relation. The np.ndarray is composed of
+            :class:`Scalar` objects.
         cmp (:class:`Comparator`): :class:`Comparator` is an enumeration
             that can be either `SEQ`, `PEQ`, or `EQ`. They represent `>>`, `<<`,
             or `=` respectively.
@@ -171,8 +180,8 @@ class PSDConstraint(Constraint):
             variable of this :class:`PSDConstraint` object.
     """
 
-    lhs: np.ndarray | float
-    rhs: np.ndarray | float
+    lhs: np.ndarray | GramMatrix | float
+    rhs: np.ndarray | GramMatrix | float
     cmp: utils.Comparator
     name: str
 
@@ -189,9 +198,10 @@ class PSDConstraint(Constraint):
         ]:
             raise ValueError("The cmp should be PEQ, SEQ, or EQ.")
 
-        if isinstance(self.lhs, np.ndarray) and isinstance(self.rhs, np.ndarray):
-            if not self.lhs.shape == self.rhs.shape:
-                raise ValueError("The shape of the lhs should match the rhs.")
+        lhs_shape = _matrix_shape(self.lhs)
+        rhs_shape = _matrix_shape(self.rhs)
+        if lhs_shape is not None and rhs_shape is not None and lhs_shape != rhs_shape:
+            raise ValueError("The shape of the lhs should match the rhs.")
 
     @classmethod
     def make(
@@ -218,13 +228,15 @@ class PSDConstraint(Constraint):
 
     def is_compatiable_shape(self, val: np.ndarray | float) -> None:
         """Check that if val is a np.ndarray whether it is of the same shape as the LHS and RHS."""
-        if isinstance(self.lhs, np.ndarray) and isinstance(val, np.ndarray):
-            if self.lhs.shape != val.shape:
+        lhs_shape = _matrix_shape(self.lhs)
+        rhs_shape = _matrix_shape(self.rhs)
+        if lhs_shape is not None and isinstance(val, np.ndarray):
+            if lhs_shape != val.shape:
                 raise ValueError(
                     "The input must be the same shape as the matrix associated with the LHS of this PSDConstraint."
                 )
-        elif isinstance(self.rhs, np.ndarray) and isinstance(val, np.ndarray):
-            if self.rhs.shape != val.shape:
+        elif rhs_shape is not None and isinstance(val, np.ndarray):
+            if rhs_shape != val.shape:
                 raise ValueError(
                     "The input must be the same shape as the matrix associated with the RHS of this PSDConstraint."
                 )
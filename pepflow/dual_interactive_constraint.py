@@ -52,24 +52,27 @@ def solve_dual_prob_and_get_all_plot_data(
 
     plot_data_list = []
 
-    result = pep_builder.solve_dual(
-        context=context, resolve_parameters=resolve_parameters
-    )
-
-    for func in context.func_to_triplets.keys():
-        plot_data = PlotData.from_func_or_oper_pep_result_and_builder(
-            func, result, pep_builder
-        )
-        plot_data_list.append(plot_data)
-
-    for oper in context.oper_to_duplets.keys():
-        # Skip LinearOperator objects because they should not have interpolation conditions implemented.
-        if isinstance(oper, LinearOperatorTranspose):
-            continue
-        plot_data = PlotData.from_func_or_oper_pep_result_and_builder(
-            oper, result, pep_builder
+    # Dash runs the callbacks in worker threads, which may not have
+    # `context` as their current context.
+    with context:
+        result = pep_builder.solve_dual(
+            context=context, resolve_parameters=resolve_parameters
         )
-        plot_data_list.append(plot_data)
+
+        for func in context.func_to_triplets.keys():
+            plot_data = PlotData.from_func_or_oper_pep_result_and_builder(
+                func, result, pep_builder
+            )
+            plot_data_list.append(plot_data)
+
+        for oper in context.oper_to_duplets.keys():
+            # Skip LinearOperator objects because they should not have interpolation conditions implemented.
+            if isinstance(oper, LinearOperatorTranspose):
+                continue
+            plot_data = PlotData.from_func_or_oper_pep_result_and_builder(
+                oper, result, pep_builder
+            )
+            plot_data_list.append(plot_data)
 
     return plot_data_list, result
 
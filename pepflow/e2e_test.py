@@ -62,6 +62,37 @@ def test_gd_e2e():
         assert math.isclose(dual_result.opt_value, expected_opt_value, rel_tol=1e-3)
 
 
+def test_gd_other_backends_e2e():
+    ctx = pc.PEPContext("gd_other_backends").set_as_current()
+    pep_builder = pep.PEPBuilder(ctx)
+    eta = 1
+    N = 5
+
+    f = function.SmoothConvexFunction(is_basis=True, tags=["f"], L=1)
+    x = pep_builder.add_init_point("x_0")
+    x_star = f.set_stationary_point("x_star")
+    pep_builder.add_initial_constraint(
+        ((x - x_star) ** 2).le(1, name="initial_condition")
+    )
+    for i in range(N):
+        x = x - eta * f.grad(x)
+        x.add_tag(f"x_{i + 1}")
+    pep_builder.set_performance_metric(f.func_val(x) - f.func_val(x_star))
+
+    expected_opt_value = 1 / (4 * N + 2)
+    result = pep_builder.solve_primal(backend="sparse")
+    assert math.isclose(result.opt_value, expected_opt_value, rel_tol=1e-3)
+
+    dual_result = pep_builder.solve_dual(backend="sparse")
+    assert math.isclose(dual_result.opt_value, expected_opt_value, rel_tol=1e-3)
+
+    result = pep_builder.solve_primal(backend="low_rank")
+    assert math.isclose(result.opt_value, expected_opt_value, rel_tol=1e-3)
+
+    dual_result = pep_builder.solve_dual(backend="low_rank")
+    assert math.isclose(dual_result.opt_value, expected_opt_value, rel_tol=1e-3)
+
+
 def test_gd_strongly_convex_e2e():
     ctx = pc.PEPContext("gd").set_as_current()
     pep_builder = pep.PEPBuilder(ctx)
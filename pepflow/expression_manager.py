@@ -18,17 +18,23 @@
 # under the License.
 from __future__ import annotations
 
-import functools
 import math
-from typing import TYPE_CHECKING
+from collections.abc import Callable, Sequence
+from fractions import Fraction
+from typing import TYPE_CHECKING, Any
 
+import attrs
 import numpy as np
 import sympy as sp
 
+from pepflow import gram_matrix as gm
+from pepflow import low_rank as lr
 from pepflow import math_expression as me
 from pepflow import parameter as pm
 from pepflow import pep_context as pc
+from pepflow import rational_array as ra
 from pepflow import scalar as sc
+from pepflow import sparse_array as spa
 from pepflow import utils
 from pepflow import vector as vt
 
@@ -36,6 +42,319 @@ if TYPE_CHECKING:
     from pepflow.utils import NUMERICAL_TYPE
 
 
+def _children(node: vt.Vector | sc.Scalar) -> list[vt.Vector | sc.Scalar]:
+    """Return the :class:`Vector` and :class:`Scalar` operands of `node`."""
+    expr = node.eval_expression
+    if isinstance(expr, vt.VectorRepresentation):
+        operands = [expr.left_vector, expr.right_vector]
+    elif isinstance(expr, sc.ScalarRepresentation):
+        operands = [expr.left_scalar, expr.right_scalar]
+    elif isinstance(expr, (vt.VectorSumRepresentation, sc.ScalarSumRepresentation)):
+        operands = list(expr.terms)
+    elif isinstance(expr, vt.VectorByBasisRepresentation):
+        operands = list(expr.coeffs.keys())
+    elif isinstance(expr, sc.ScalarByBasisRepresentation):
+        operands = list(expr.func_coeffs.keys())
+        for key in expr.inner_prod_coeffs:
+            operands.extend(key)
+    else:
+        operands = []
+    return [x for x in operands if isinstance(x, (vt.Vector, sc.Scalar))]
+
+
+def topological_order(
+    nodes: list[vt.Vector | sc.Scalar],
+) -> list[vt.Vector | sc.Scalar]:
+    """Order `nodes` and all of their operands so that every :class:`Vector`
+    or :class:`Scalar` comes after the objects it is built from.
+
+    The traversal uses an explicit stack so it does not hit the recursion
+    limit on very deep expressions.
+    """
+    order = []
+    visited = set()
+    for root in nodes:
+        if root.uid in visited:
+            continue
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            if node.uid in visited:
+                continue
+            visited.add(node.uid)
+            stack.append((node, True))
+            for child in _children(node):
+                if child.uid not in visited:
+                    stack.append((child, False))
+    return order
+
+
+# The number of terms stacked at once by `_weighted_sum`.
+_SUM_CHUNK_SIZE = 1024
+
+
+def _weighted_sum(weights: Sequence, arrays: Sequence) -> Any:
+    """Return `sum_i weights[i] * arrays[i]`.
+
+    Dense arrays are stacked and reduced with one `np.tensordot` per chunk
+    of `_SUM_CHUNK_SIZE` terms, which bounds the memory of the stacked
+    operand. Other coordinates, e.g., :class:`SparseArray` objects, are
+    accumulated one term at a time.
+    """
+    if all(isinstance(x, np.ndarray) for x in arrays):
+        total = None
+        for start in range(0, len(arrays), _SUM_CHUNK_SIZE):
+            stop = start + _SUM_CHUNK_SIZE
+            chunk = np.tensordot(
+                np.asarray(weights[start:stop]), np.stack(arrays[start:stop]), axes=1
+            )
+            total = chunk if total is None else total + chunk
+        return total
+    total = weights[0] * arrays[0]
+    for weight, array in zip(weights[1:], arrays[1:]):
+        total = total + weight * array
+    return total
+
+
+@attrs.frozen
+class CompiledExpressions:
+    """
+    The concrete representations of many :class:`Vector` and :class:`Scalar`
+    objects stored in a few stacked arrays.
+
+    Produced by :py:func:`ExpressionManager.compile` and by substituting the
+    parameters of :class:`ParametricExpressions`. The arrays are read-only.
+
+    Attributes:
+        vector_coords (np.ndarray): A matrix whose rows are the `coords` of
+            the compiled :class:`Vector` objects.
+        vector_uid_to_row (dict): Map from the uid of a :class:`Vector` to
+            its row in `vector_coords`.
+        scalar_func_coords (np.ndarray): A matrix whose rows are the
+            `func_coords` of the compiled :class:`Scalar` objects.
+        scalar_inner_prod_coords (np.ndarray): A rank-3 tensor whose slices
+            are the `inner_prod_coords` of the compiled :class:`Scalar` objects.
+        scalar_offsets (np.ndarray): The `offset` of the compiled
+            :class:`Scalar` objects.
+        scalar_uid_to_row (dict): Map from the uid of a :class:`Scalar` to
+            its row in the scalar arrays.
+    """
+
+    vector_coords: np.ndarray
+    vector_uid_to_row: dict
+    scalar_func_coords: np.ndarray
+    scalar_inner_prod_coords: np.ndarray
+    scalar_offsets: np.ndarray
+    scalar_uid_to_row: dict
+
+    def evaluated_vector(self, vector: vt.Vector) -> vt.EvaluatedVector | None:
+        row = self.vector_uid_to_row.get(vector.uid)
+        if row is None:
+            return None
+        return vt.EvaluatedVector(coords=self.vector_coords[row])
+
+    def evaluated_scalar(self, scalar: sc.Scalar) -> sc.EvaluatedScalar | None:
+        row = self.scalar_uid_to_row.get(scalar.uid)
+        if row is None:
+            return None
+        return sc.EvaluatedScalar(
+            func_coords=self.scalar_func_coords[row],
+            inner_prod_coords=self.scalar_inner_prod_coords[row],
+            offset=self.scalar_offsets[row],
+        )
+
+
+def _parameter_names(node: vt.Vector | sc.Scalar) -> set[str]:
+    """Return the names of the :class:`Parameter` operands of `node`."""
+    expr = node.eval_expression
+    if isinstance(expr, vt.VectorRepresentation):
+        operands = [expr.left_vector, expr.right_vector]
+    elif isinstance(expr, sc.ScalarRepresentation):
+        operands = [expr.left_scalar, expr.right_scalar]
+    elif isinstance(expr, (vt.VectorSumRepresentation, sc.ScalarSumRepresentation)):
+        operands = list(expr.weights)
+    elif isinstance(expr, vt.VectorByBasisRepresentation):
+        operands = list(expr.coeffs.values())
+    elif isinstance(expr, sc.ScalarByBasisRepresentation):
+        operands = [
+            *expr.func_coeffs.values(),
+            *expr.inner_prod_coeffs.values(),
+            expr.offset,
+        ]
+    else:
+        operands = []
+    names = set()
+    for x in operands:
+        if isinstance(x, pm.Parameter):
+            names.update(x.get_param_names())
+    return names
+
+
+@attrs.frozen
+class ParametricArray:
+    """
+    An array whose entries are functions of some :class:`Parameter` objects.
+
+    The entries that do not depend on the parameters are kept in a constant
+    array. The other entries are lowered by `sympy.lambdify` into a single
+    numpy-vectorized function, so substituting a whole batch of parameter
+    values is one call.
+
+    Attributes:
+        constant (np.ndarray): The array with the parameter-dependent entries
+            set to zero.
+        flat_indices (np.ndarray): The flat indices of the parameter-dependent
+            entries.
+        func (Callable | `None`): The function mapping the parameter values to
+            the tuple of the parameter-dependent entries.
+    """
+
+    constant: np.ndarray
+    flat_indices: np.ndarray
+    func: Callable | None
+
+    @classmethod
+    def from_expressions(
+        cls, array: np.ndarray, symbols: list[sp.Symbol]
+    ) -> ParametricArray:
+        constant = np.zeros(array.shape)
+        flat_indices = []
+        expressions = []
+        for i, val in enumerate(array.flat):
+            if isinstance(val, sp.Basic) and val.free_symbols:
+                flat_indices.append(i)
+                expressions.append(val)
+            else:
+                constant.flat[i] = float(val)
+        func = None
+        if expressions:
+            func = sp.lambdify(symbols, expressions, modules="numpy", cse=True)
+        return cls(
+            constant=constant,
+            flat_indices=np.array(flat_indices, dtype=int),
+            func=func,
+        )
+
+    def substitute(self, values: list[np.ndarray]) -> np.ndarray:
+        """Return the arrays for a batch of parameter values.
+
+        Args:
+            values (list[np.ndarray]): The one-dimensional arrays of the values
+                of each parameter, all of the same length `B`.
+
+        Returns:
+            np.ndarray: An array of shape `(B, *constant.shape)`.
+        """
+        batch_size = len(values[0]) if values else 1
+        out = np.tile(self.constant, (batch_size,) + (1,) * self.constant.ndim)
+        if self.func is not None:
+            entries = [np.broadcast_to(x, (batch_size,)) for x in self.func(*values)]
+            out.reshape(batch_size, -1)[:, self.flat_indices] = np.stack(
+                entries, axis=1
+            )
+        return out
+
+
+@attrs.frozen
+class ParametricExpressions:
+    """
+    The concrete representations of many :class:`Vector` and :class:`Scalar`
+    objects as functions of the :class:`Parameter` objects they use.
+
+    Produced by :py:func:`ExpressionManager.parametrize`, which walks the
+    expressions once with symbolic parameters. Afterwards,
+    :py:func:`substitute` and :py:func:`batch_substitute` only evaluate the
+    lowered numpy functions.
+
+    Attributes:
+        param_names (tuple[str, ...]): The names of the parameters, in the
+            order of the arguments of the lowered functions.
+        vector_coords (:class:`ParametricArray`): The stacked `coords` of the
+            :class:`Vector` objects.
+        vector_uid_to_row (dict): Map from the uid of a :class:`Vector` to
+            its row in `vector_coords`.
+        scalar_func_coords (:class:`ParametricArray`): The stacked
+            `func_coords` of the :class:`Scalar` objects.
+        scalar_inner_prod_coords (:class:`ParametricArray`): The stacked
+            `inner_prod_coords` of the :class:`Scalar` objects.
+        scalar_offsets (:class:`ParametricArray`): The `offset` of the
+            :class:`Scalar` objects.
+        scalar_uid_to_row (dict): Map from the uid of a :class:`Scalar` to
+            its row in the scalar arrays.
+    """
+
+    param_names: tuple[str, ...]
+    vector_coords: ParametricArray
+    vector_uid_to_row: dict
+    scalar_func_coords: ParametricArray
+    scalar_inner_prod_coords: ParametricArray
+    scalar_offsets: ParametricArray
+    scalar_uid_to_row: dict
+
+    def batch_substitute(
+        self, resolve_parameters: dict[str, Sequence[NUMERICAL_TYPE] | np.ndarray]
+    ) -> list[CompiledExpressions]:
+        """
+        Substitute a batch of parameter values.
+
+        Args:
+            resolve_parameters (dict[str, Sequence | np.ndarray]): A dictionary
+                that maps the name of each parameter to the sequence of its
+                values. All sequences must have the same length.
+
+        Returns:
+            list[:class:`CompiledExpressions`]: The concrete representations
+            for each set of parameter values.
+        """
+        missing = set(self.param_names) - set(resolve_parameters)
+        if missing:
+            raise ValueError(f"Cannot resolve Parameters named: {sorted(missing)}")
+        values = [
+            np.asarray(resolve_parameters[name], dtype=float)
+            for name in self.param_names
+        ]
+        if len({len(x) for x in values}) > 1:
+            raise ValueError("All parameters must have the same number of values.")
+        vector_coords = self.vector_coords.substitute(values)
+        func_coords = self.scalar_func_coords.substitute(values)
+        inner_prod_coords = self.scalar_inner_prod_coords.substitute(values)
+        offsets = self.scalar_offsets.substitute(values)
+        for array in [vector_coords, func_coords, inner_prod_coords, offsets]:
+            array.flags.writeable = False
+        return [
+            CompiledExpressions(
+                vector_coords=vector_coords[b],
+                vector_uid_to_row=self.vector_uid_to_row,
+                scalar_func_coords=func_coords[b],
+                scalar_inner_prod_coords=inner_prod_coords[b],
+                scalar_offsets=offsets[b],
+                scalar_uid_to_row=self.scalar_uid_to_row,
+            )
+            for b in range(len(vector_coords))
+        ]
+
+    def substitute(
+        self, resolve_parameters: dict[str, NUMERICAL_TYPE]
+    ) -> CompiledExpressions:
+        """
+        Substitute a single set of parameter values.
+
+        Args:
+            resolve_parameters (dict[str, :data:`NUMERICAL_TYPE`]): A
+                dictionary that maps the name of parameters to the numerical
+                values.
+
+        Returns:
+            :class:`CompiledExpressions`: The concrete representations.
+        """
+        return self.batch_substitute(
+            {name: [resolve_parameters[name]] for name in resolve_parameters}
+        )[0]
+
+
 class ExpressionManager:
     """
     A class handling concrete representations of abstract :class:`Vector` and
@@ -47,40 +366,57 @@ class ExpressionManager:
             of interest.
         resolve_parameters (dict[str, :data:`NUMERICAL_TYPE`] | `None`): A
             dictionary that maps the name of parameters to the numerical values.
+        backend (:class:`EvalBackend`): The storage of the coordinates of the
+            :class:`EvaluatedVector` and :class:`EvaluatedScalar` objects. With
+            :attr:`EvalBackend.SPARSE`, only the nonzero coordinates are
+            stored in :class:`SparseArray` objects. With
+            :attr:`EvalBackend.LOW_RANK`, the `inner_prod_coords` are
+            :class:`LowRankMatrix` objects. With :attr:`EvalBackend.RATIONAL`,
+            the coordinates are exact :class:`RationalArray` objects whatever
+            the value of `sympy_mode`, so every coefficient must be an `int`,
+            a `fractions.Fraction` or a `sympy.Rational`. By default
+            :attr:`EvalBackend.DENSE`.
+        cache (:class:`MemoCache`): The memo of the evaluations and
+            representations computed by this :class:`ExpressionManager`. Its
+            size is bounded by the `cache_size` argument (unbounded if `None`).
     """
 
     def __init__(
         self,
         pep_context: pc.PEPContext,
         resolve_parameters: dict[str, NUMERICAL_TYPE] | None = None,
+        *,
+        backend: utils.EvalBackend | str = utils.EvalBackend.DENSE,
+        cache_size: int | None = None,
     ):
         self.context = pep_context
-        self._basis_vectors = []
-        self._basis_vector_uid_to_index = {}
-        self._basis_scalars = []
-        self._basis_scalar_uid_to_index = {}
+        self.backend = utils.EvalBackend(backend)
+        self.cache = utils.MemoCache(maxsize=cache_size)
+        # Keyed by sympy_mode.
+        self._compiled: dict[bool, CompiledExpressions] = {}
         self.resolve_parameters = resolve_parameters or {}
-        for vector in self.context.vectors:
-            if vector.is_basis:
-                self._basis_vectors.append(vector)
-                self._basis_vector_uid_to_index[vector.uid] = (
-                    len(self._basis_vectors) - 1
-                )
-        for scalar in self.context.scalars:
-            if scalar.is_basis:
-                self._basis_scalars.append(scalar)
-                self._basis_scalar_uid_to_index[scalar.uid] = (
-                    len(self._basis_scalars) - 1
-                )
-
+        # The basis lists of the context are append-only, so the first
+        # `_num_basis_*` entries are the basis of this manager even if more
+        # basis objects are added later.
+        self._basis_vectors = self.context._basis_vectors
+        self._basis_vector_uid_to_index = self.context._basis_vector_uid_to_index
+        self._basis_scalars = self.context._basis_scalars
+        self._basis_scalar_uid_to_index = self.context._basis_scalar_uid_to_index
         self._num_basis_vectors = len(self._basis_vectors)
         self._num_basis_scalars = len(self._basis_scalars)
 
     def get_index_of_basis_vector(self, vector: vt.Vector) -> int:
-        return self._basis_vector_uid_to_index[vector.uid]
+        index = self._basis_vector_uid_to_index[vector.uid]
+        if index >= self._num_basis_vectors:
+            # Added to the context after this manager was created.
+            raise KeyError(vector.uid)
+        return index
 
     def get_index_of_basis_scalar(self, scalar: sc.Scalar) -> int:
-        return self._basis_scalar_uid_to_index[scalar.uid]
+        index = self._basis_scalar_uid_to_index[scalar.uid]
+        if index >= self._num_basis_scalars:
+            raise KeyError(scalar.uid)
+        return index
 
     def get_tag_of_basis_vector_index(self, index: int) -> str:
         return self._basis_vectors[index].__repr__()
@@ -88,7 +424,341 @@ class ExpressionManager:
     def get_tag_of_basis_scalar_index(self, index: int) -> str:
         return self._basis_scalars[index].__repr__()
 
-    @functools.cache
+    def clear_cache(self) -> None:
+        """Drop the memoized evaluations and the compiled arrays."""
+        self.cache.clear()
+        self._compiled.clear()
+
+    def cache_info(self) -> dict[str, int | None]:
+        """Return the hits, misses, maxsize and current size of the cache."""
+        return self.cache.info()
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.backend == utils.EvalBackend.SPARSE
+
+    def _coords_from_entries(
+        self, shape: tuple[int, ...], entries: dict, sympy_mode: bool
+    ) -> np.ndarray | spa.SparseArray | ra.RationalArray:
+        """Build the coordinates of the given shape from the nonzero entries."""
+        if self.backend == utils.EvalBackend.RATIONAL:
+            return ra.RationalArray.from_entries(shape, entries)
+        if self.is_sparse:
+            return spa.SparseArray(
+                shape=shape,
+                entries={k: v for k, v in entries.items() if v != 0},
+                sympy_mode=sympy_mode,
+            )
+        array = np.zeros(shape)
+        if sympy_mode:
+            array = array * sp.S(0)
+        elif any(isinstance(val, sp.Basic) for val in entries.values()):
+            # E.g., the coefficients are symbolic parameters.
+            array = array.astype(object)
+        for index, val in entries.items():
+            array[index] += val
+        return array
+
+    def _zero_matrix(self, sympy_mode: bool):
+        """The zero `inner_prod_coords` of the backend."""
+        if self.backend == utils.EvalBackend.LOW_RANK:
+            return lr.LowRankMatrix.zeros(self._num_basis_vectors, sympy_mode)
+        return self._coords_from_entries(
+            (self._num_basis_vectors, self._num_basis_vectors), {}, sympy_mode
+        )
+
+    def _sym_outer(self, v, w, sympy_mode: bool):
+        if self.is_sparse:
+            return spa.SparseArray.sym_outer(v, w, sympy_mode=sympy_mode)
+        if self.backend == utils.EvalBackend.LOW_RANK:
+            return lr.LowRankMatrix.sym_outer(v, w, sympy_mode=sympy_mode)
+        if self.backend == utils.EvalBackend.RATIONAL:
+            return ra.RationalArray.sym_outer(v, w)
+        return utils.SOP(v, w, sympy_mode=sympy_mode)
+
+    def _zero_offset(self, sympy_mode: bool):
+        if self.backend == utils.EvalBackend.RATIONAL:
+            return Fraction(0)
+        return sp.S(0) if sympy_mode else float(0.0)
+
+    @staticmethod
+    def _eval_key(node: vt.Vector | sc.Scalar, sympy_mode: bool) -> tuple:
+        name = "eval_vector" if isinstance(node, vt.Vector) else "eval_scalar"
+        return (name, node.uid, sympy_mode)
+
+    def _evaluate(
+        self, root: vt.Vector | sc.Scalar, sympy_mode: bool
+    ) -> vt.EvaluatedVector | sc.EvaluatedScalar:
+        """Evaluate `root` and every operand that is not memoized yet.
+
+        The expression is traversed with an explicit stack in post-order so
+        each node is evaluated after its operands. Thus, the recursion in
+        :py:func:`_eval_vector_node` and :py:func:`_eval_scalar_node` only
+        hits the memo and never goes deeper than one level.
+        """
+        value = self.cache.get(self._eval_key(root, sympy_mode))
+        if value is not utils.MemoCache.MISSING:
+            return value
+
+        compiled = self._compiled.get(sympy_mode)
+
+        def is_evaluated(node: vt.Vector | sc.Scalar) -> bool:
+            if self._eval_key(node, sympy_mode) in self.cache:
+                return True
+            return compiled is not None and (
+                node.uid in compiled.vector_uid_to_row
+                or node.uid in compiled.scalar_uid_to_row
+            )
+
+        def compute(node: vt.Vector | sc.Scalar, results: dict):
+            if isinstance(node, vt.Vector):
+                value = self._eval_vector_node(node, sympy_mode)
+            else:
+                value = self._eval_scalar_node(node, sympy_mode)
+            self.cache.put(self._eval_key(node, sympy_mode), value)
+            return value
+
+        results = utils.evaluate_dag(
+            [root],
+            children=lambda node: [x for x in _children(node) if not is_evaluated(x)],
+            compute=compute,
+        )
+        return results[root.uid]
+
+    def _zeros(self, shape: tuple[int, ...], sympy_mode: bool) -> np.ndarray:
+        array = np.zeros(shape)
+        if sympy_mode:
+            array = array * sp.S(0)
+        return array
+
+    def compile(
+        self,
+        sympy_mode: bool = False,
+        roots: list[vt.Vector | sc.Scalar] | None = None,
+    ) -> ExpressionManager:
+        """
+        Evaluate every :class:`Vector` and :class:`Scalar` of the associated
+        :class:`PEPContext`, or only those `roots` are built from, in a single
+        pass.
+
+        The objects are ordered topologically once. The concrete
+        representations of all the :class:`Vector` objects are stacked into one
+        coefficient matrix (rows are vectors, columns are basis vectors) and
+        those of all the :class:`Scalar` objects into stacked arrays, filled
+        with row operations. Afterwards, :py:func:`eval_vector` and
+        :py:func:`eval_scalar` of the compiled objects are index lookups into
+        these arrays. Objects created after compiling are still evaluated on
+        demand.
+
+        Only the dense backend can be compiled.
+
+        Args:
+            sympy_mode (bool): If true, compile the SymPy representations.
+                By default `False`.
+            roots (list[:class:`Vector` | :class:`Scalar`] | `None`): Only
+                compile these objects and their operands. `None` means all the
+                objects of the associated :class:`PEPContext`.
+
+        Returns:
+            :class:`ExpressionManager`: This :class:`ExpressionManager`.
+        """
+        if self.backend != utils.EvalBackend.DENSE:
+            raise ValueError("Only the dense backend can be compiled.")
+
+        if roots is None:
+            roots = [*self.context.vectors, *self.context.scalars]
+        order = topological_order(roots)
+        vectors = [x for x in order if isinstance(x, vt.Vector)]
+        scalars = [x for x in order if isinstance(x, sc.Scalar)]
+        n = self._num_basis_vectors
+
+        vector_coords = self._zeros((len(vectors), n), sympy_mode)
+        vector_rows = {}
+        for row, vector in enumerate(vectors):
+            vector_rows[vector.uid] = row
+            expr = vector.eval_expression
+            if vector.is_basis:
+                index = self.get_index_of_basis_vector(vector)
+                vector_coords[row, index] = sp.S(1) if sympy_mode else 1
+            elif isinstance(expr, vt.ZeroVector):
+                continue
+            elif isinstance(expr, vt.VectorByBasisRepresentation):
+                for basis_vector, coef in expr.coeffs.items():
+                    index = self.get_index_of_basis_vector(basis_vector)
+                    vector_coords[row, index] += self.eval_vector(coef)
+            elif isinstance(expr, vt.VectorSumRepresentation):
+                vector_coords[row] = _weighted_sum(
+                    [self.eval_vector(w, sympy_mode=sympy_mode) for w in expr.weights],
+                    [vector_coords[vector_rows[x.uid]] for x in expr.terms],
+                )
+            else:
+                operands = []
+                for x in [expr.left_vector, expr.right_vector]:
+                    if isinstance(x, vt.Vector):
+                        operands.append(vector_coords[vector_rows[x.uid]])
+                    else:
+                        operands.append(self.eval_vector(x, sympy_mode=sympy_mode))
+                vector_coords[row] = utils.apply_op(expr.op, *operands)
+
+        func_coords = self._zeros((len(scalars), self._num_basis_scalars), sympy_mode)
+        inner_prod_coords = self._zeros((len(scalars), n, n), sympy_mode)
+        offsets = np.empty(len(scalars), dtype=object)
+        scalar_rows = {}
+
+        def vector_row(vector: vt.Vector) -> np.ndarray:
+            return vector_coords[vector_rows[vector.uid]]
+
+        for row, scalar in enumerate(scalars):
+            scalar_rows[scalar.uid] = row
+            expr = scalar.eval_expression
+            offsets[row] = sp.S(0) if sympy_mode else float(0.0)
+            if scalar.is_basis:
+                index = self.get_index_of_basis_scalar(scalar)
+                func_coords[row, index] = sp.S(1) if sympy_mode else 1
+            elif isinstance(expr, sc.ZeroScalar):
+                continue
+            elif isinstance(expr, sc.ScalarByBasisRepresentation):
+                for key, coef in expr.func_coeffs.items():
+                    index = self.get_index_of_basis_scalar(key)
+                    func_coords[row, index] += self.eval_scalar(coef)
+                for key, coef in expr.inner_prod_coeffs.items():
+                    inner_prod_coords[row] += self.eval_scalar(coef) * utils.SOP(
+                        vector_row(key[0]), vector_row(key[1]), sympy_mode=sympy_mode
+                    )
+                offsets[row] = offsets[row] + self.eval_scalar(expr.offset)
+            elif isinstance(expr, sc.ScalarSumRepresentation):
+                weights = [
+                    self.eval_scalar(w, sympy_mode=sympy_mode) for w in expr.weights
+                ]
+                rows = [scalar_rows[x.uid] for x in expr.terms]
+                func_coords[row] = _weighted_sum(
+                    weights, [func_coords[r] for r in rows]
+                )
+                inner_prod_coords[row] = _weighted_sum(
+                    weights, [inner_prod_coords[r] for r in rows]
+                )
+                offsets[row] = _weighted_sum(weights, [offsets[r] for r in rows])
+            elif (
+                expr.op == utils.Op.MUL
+                and isinstance(expr.left_scalar, vt.Vector)
+                and isinstance(expr.right_scalar, vt.Vector)
+            ):
+                inner_prod_coords[row] = utils.SOP(
+                    vector_row(expr.left_scalar),
+                    vector_row(expr.right_scalar),
+                    sympy_mode=sympy_mode,
+                )
+            else:
+                operands = []
+                for x in [expr.left_scalar, expr.right_scalar]:
+                    if isinstance(x, sc.Scalar):
+                        r = scalar_rows[x.uid]
+                        operands.append(
+                            sc.EvaluatedScalar(
+                                func_coords=func_coords[r],
+                                inner_prod_coords=inner_prod_coords[r],
+                                offset=offsets[r],
+                            )
+                        )
+                    else:
+                        operands.append(self.eval_scalar(x, sympy_mode=sympy_mode))
+                result = utils.apply_op(expr.op, *operands)
+                func_coords[row] = result.func_coords
+                inner_prod_coords[row] = result.inner_prod_coords
+                offsets[row] = result.offset
+
+        for array in [vector_coords, func_coords, inner_prod_coords, offsets]:
+            array.flags.writeable = False
+        self._compiled[sympy_mode] = CompiledExpressions(
+            vector_coords=vector_coords,
+            vector_uid_to_row=vector_rows,
+            scalar_func_coords=func_coords,
+            scalar_inner_prod_coords=inner_prod_coords,
+            scalar_offsets=offsets,
+            scalar_uid_to_row=scalar_rows,
+        )
+        return self
+
+    def parametrize(
+        self, param_names: list[str] | None = None
+    ) -> ParametricExpressions:
+        """
+        Evaluate every :class:`Vector` and :class:`Scalar` of the associated
+        :class:`PEPContext` as functions of the :class:`Parameter` objects.
+
+        The expressions are walked once with a `sympy.Symbol` in place of each
+        parameter. The resulting coefficients, which are polynomial or
+        rational functions of the parameters, are lowered into
+        numpy-vectorized functions. Evaluating many parameter values, e.g.,
+        for a sweep over step sizes, then costs one call of these functions
+        per batch instead of one walk of the expressions per value.
+
+        The `resolve_parameters` of this :class:`ExpressionManager` are not
+        used.
+
+        Args:
+            param_names (list[str] | `None`): The names of the parameters to
+                keep symbolic. `None` means all the parameters used by the
+                :class:`Vector` and :class:`Scalar` objects.
+
+        Returns:
+            :class:`ParametricExpressions`: The parametric representations.
+
+        Example:
+            >>> ctx = pf.PEPContext("ctx").set_as_current()
+            >>> x_0 = pf.Vector(is_basis=True, tags=["x_0"])
+            >>> x_1 = x_0 * pf.Parameter("h")
+            >>> parametric = pf.ExpressionManager(ctx).parametrize()
+            >>> batch = parametric.batch_substitute({"h": [0.5, 1.0]})
+            >>> batch[1].evaluated_vector(x_1).coords
+        """
+        order = topological_order([*self.context.vectors, *self.context.scalars])
+        if param_names is None:
+            names = set()
+            for node in order:
+                names.update(_parameter_names(node))
+            param_names = sorted(names)
+        symbols = [sp.Symbol(name, real=True) for name in param_names]
+        em = ExpressionManager(
+            self.context, resolve_parameters=dict(zip(param_names, symbols))
+        )
+        vectors = [x for x in order if isinstance(x, vt.Vector)]
+        scalars = [x for x in order if isinstance(x, sc.Scalar)]
+        n = self._num_basis_vectors
+
+        vector_coords = np.zeros((len(vectors), n), dtype=object)
+        for row, vector in enumerate(vectors):
+            vector_coords[row] = em.eval_vector(vector).coords
+        func_coords = np.zeros((len(scalars), self._num_basis_scalars), dtype=object)
+        inner_prod_coords = np.zeros((len(scalars), n, n), dtype=object)
+        offsets = np.zeros(len(scalars), dtype=object)
+        for row, scalar in enumerate(scalars):
+            evaluated = em.eval_scalar(scalar)
+            func_coords[row] = evaluated.func_coords
+            inner_prod_coords[row] = evaluated.inner_prod_coords
+            offsets[row] = evaluated.offset
+
+        return ParametricExpressions(
+            param_names=tuple(param_names),
+            vector_coords=ParametricArray.from_expressions(vector_coords, symbols),
+            vector_uid_to_row={x.uid: row for row, x in enumerate(vectors)},
+            scalar_func_coords=ParametricArray.from_expressions(func_coords, symbols),
+            scalar_inner_prod_coords=ParametricArray.from_expressions(
+                inner_prod_coords, symbols
+            ),
+            scalar_offsets=ParametricArray.from_expressions(offsets, symbols),
+            scalar_uid_to_row={x.uid: row for row, x in enumerate(scalars)},
+        )
+
+    def _zero_evaluated_scalar(self, sympy_mode: bool) -> sc.EvaluatedScalar:
+        return sc.EvaluatedScalar(
+            func_coords=self._coords_from_entries(
+                (self._num_basis_scalars,), {}, sympy_mode
+            ),
+            inner_prod_coords=self._zero_matrix(sympy_mode),
+            offset=self._zero_offset(sympy_mode),
+        )
+
     def eval_vector(
         self, vector: vt.Vector | pm.Parameter | float | int, sympy_mode: bool = False
     ):
@@ -137,28 +807,51 @@ class ExpressionManager:
                 f"Encountered unknown type of vector to evaluate with: {type(vector)=}"
             )
 
+        return self._evaluate(vector, sympy_mode)
+
+    def _eval_vector_node(
+        self, vector: vt.Vector, sympy_mode: bool
+    ) -> vt.EvaluatedVector:
+        """Evaluate `vector` once its operands are evaluated and memoized."""
+        if sympy_mode in self._compiled:
+            evaluated = self._compiled[sympy_mode].evaluated_vector(vector)
+            if evaluated is not None:
+                return evaluated
+
         if vector.is_basis:
             index = self.get_index_of_basis_vector(vector)
-            array = np.zeros(self._num_basis_vectors)
-            if sympy_mode:
-                array = array * sp.S(0)
-            array[index] = sp.S(1) if sympy_mode else 1
+            array = self._coords_from_entries(
+                (self._num_basis_vectors,),
+                {index: sp.S(1) if sympy_mode else 1},
+                sympy_mode,
+            )
             return vt.EvaluatedVector(coords=array)
         assert vector.eval_expression is not None  # To make typecheck happy
 
         if isinstance(vector.eval_expression, vt.ZeroVector):
-            return vt.EvaluatedVector.zero(
-                num_basis_vectors=self._num_basis_vectors, sympy_mode=sympy_mode
+            return vt.EvaluatedVector(
+                coords=self._coords_from_entries(
+                    (self._num_basis_vectors,), {}, sympy_mode
+                )
             )
         # TODO: add test for this
         if isinstance(vector.eval_expression, vt.VectorByBasisRepresentation):
-            array = np.zeros(self._num_basis_vectors)
-            if sympy_mode:
-                array = array * sp.S(0)
+            entries = {}
             for basis_vector, coef in vector.eval_expression.coeffs.items():
                 index = self.get_index_of_basis_vector(basis_vector)
-                array[index] += self.eval_vector(coef)  # we may need to resolve coef.
+                # we may need to resolve coef.
+                entries[index] = entries.get(index, 0) + self.eval_vector(coef)
+            array = self._coords_from_entries(
+                (self._num_basis_vectors,), entries, sympy_mode
+            )
             return vt.EvaluatedVector(coords=array)
+        if isinstance(vector.eval_expression, vt.VectorSumRepresentation):
+            expr = vector.eval_expression
+            coords = _weighted_sum(
+                [self.eval_vector(w, sympy_mode=sympy_mode) for w in expr.weights],
+                [self.eval_vector(x, sympy_mode=sympy_mode).coords for x in expr.terms],
+            )
+            return vt.EvaluatedVector(coords=coords)
 
         op = vector.eval_expression.op
         left_evaled_vector = self.eval_vector(
@@ -178,7 +871,6 @@ class ExpressionManager:
 
         raise ValueError(f"Encountered unknown {op=} when evaluation the vector.")
 
-    @functools.cache
     def eval_scalar(
         self, scalar: sc.Scalar | pm.Parameter | float | int, sympy_mode: bool = False
     ):
@@ -231,34 +923,41 @@ class ExpressionManager:
                 f"Encounter unknown type of scalar to evaludated with: {type(scalar)=}"
             )
 
+        return self._evaluate(scalar, sympy_mode)
+
+    def _eval_scalar_node(
+        self, scalar: sc.Scalar, sympy_mode: bool
+    ) -> sc.EvaluatedScalar:
+        """Evaluate `scalar` once its operands are evaluated and memoized."""
+        if sympy_mode in self._compiled:
+            evaluated = self._compiled[sympy_mode].evaluated_scalar(scalar)
+            if evaluated is not None:
+                return evaluated
+
         if scalar.is_basis:
             index = self.get_index_of_basis_scalar(scalar)
-            array = np.zeros(self._num_basis_scalars)
-            if sympy_mode:
-                array = array * sp.S(0)
-            array[index] = sp.S(1) if sympy_mode else 1
-            matrix = np.zeros((self._num_basis_vectors, self._num_basis_vectors))
-            if sympy_mode:
-                matrix = matrix * sp.S(0)
             return sc.EvaluatedScalar(
-                func_coords=array,
-                inner_prod_coords=matrix,
-                offset=sp.S(0) if sympy_mode else float(0.0),
+                func_coords=self._coords_from_entries(
+                    (self._num_basis_scalars,),
+                    {index: sp.S(1) if sympy_mode else 1},
+                    sympy_mode,
+                ),
+                inner_prod_coords=self._zero_matrix(sympy_mode),
+                offset=self._zero_offset(sympy_mode),
             )
         assert scalar.eval_expression is not None  # To make typecheck happy
 
         if isinstance(scalar.eval_expression, sc.ScalarByBasisRepresentation):
-            array = np.zeros(self._num_basis_vectors)
-            if sympy_mode:
-                array = array * sp.S(0)
-            matrix = np.zeros((self._num_basis_vectors, self._num_basis_vectors))
-            if sympy_mode:
-                matrix = matrix * sp.S(0)
+            entries = {}
             for key, coef in scalar.eval_expression.func_coeffs.items():
                 index = self.get_index_of_basis_scalar(key)
-                array[index] += self.eval_scalar(coef)
+                entries[index] = entries.get(index, 0) + self.eval_scalar(coef)
+            array = self._coords_from_entries(
+                (self._num_basis_scalars,), entries, sympy_mode
+            )
+            matrix = self._zero_matrix(sympy_mode)
             for key, coef in scalar.eval_expression.inner_prod_coeffs.items():
-                matrix += self.eval_scalar(coef) * utils.SOP(
+                matrix = matrix + self.eval_scalar(coef) * self._sym_outer(
                     self.eval_vector(key[0], sympy_mode=sympy_mode).coords,
                     self.eval_vector(key[1], sympy_mode=sympy_mode).coords,
                     sympy_mode=sympy_mode,
@@ -266,14 +965,22 @@ class ExpressionManager:
             return sc.EvaluatedScalar(
                 func_coords=array,
                 inner_prod_coords=matrix,
-                offset=scalar.eval_expression.offset,
+                offset=self._zero_offset(sympy_mode)
+                + self.eval_scalar(scalar.eval_expression.offset),
             )
 
         if isinstance(scalar.eval_expression, sc.ZeroScalar):
-            return sc.EvaluatedScalar.zero(
-                num_basis_scalars=self._num_basis_scalars,
-                num_basis_vectors=self._num_basis_vectors,
-                sympy_mode=sympy_mode,
+            return self._zero_evaluated_scalar(sympy_mode)
+        if isinstance(scalar.eval_expression, sc.ScalarSumRepresentation):
+            expr = scalar.eval_expression
+            weights = [self.eval_scalar(w, sympy_mode=sympy_mode) for w in expr.weights]
+            terms = [self.eval_scalar(x, sympy_mode=sympy_mode) for x in expr.terms]
+            return sc.EvaluatedScalar(
+                func_coords=_weighted_sum(weights, [x.func_coords for x in terms]),
+                inner_prod_coords=_weighted_sum(
+                    weights, [x.inner_prod_coords for x in terms]
+                ),
+                offset=_weighted_sum(weights, [x.offset for x in terms]),
             )
 
         op = scalar.eval_expression.op
@@ -283,14 +990,11 @@ class ExpressionManager:
             and isinstance(scalar.eval_expression.left_scalar, vt.Vector)
             and isinstance(scalar.eval_expression.right_scalar, vt.Vector)
         ):
-            array = (
-                np.zeros(self._num_basis_scalars) * sp.S(0)
-                if sympy_mode
-                else np.zeros(self._num_basis_scalars)
-            )
             return sc.EvaluatedScalar(
-                func_coords=array,
-                inner_prod_coords=utils.SOP(
+                func_coords=self._coords_from_entries(
+                    (self._num_basis_scalars,), {}, sympy_mode
+                ),
+                inner_prod_coords=self._sym_outer(
                     self.eval_vector(
                         scalar.eval_expression.left_scalar, sympy_mode=sympy_mode
                     ).coords,
@@ -299,7 +1003,7 @@ class ExpressionManager:
                     ).coords,
                     sympy_mode=sympy_mode,
                 ),
-                offset=sp.S(0) if sympy_mode else float(0.0),
+                offset=self._zero_offset(sympy_mode),
             )
 
         left_evaled_scalar = self.eval_scalar(
@@ -319,7 +1023,41 @@ class ExpressionManager:
 
         raise ValueError(f"Encountered unknown {op=} when evaluation the scalar.")
 
-    @functools.cache
+    def _coefficient_matrix(self, vectors: tuple[vt.Vector, ...]) -> np.ndarray:
+        """Stack the coordinates of `vectors` as the columns of a float matrix."""
+        columns = []
+        for vector in vectors:
+            coords = self.eval_vector(vector).coords
+            if isinstance(coords, spa.SparseArray):
+                coords = coords.toarray()
+            elif isinstance(coords, ra.RationalArray):
+                coords = coords.to_float()
+            columns.append(np.asarray(coords, dtype=float))
+        return np.stack(columns, axis=1).reshape(self._num_basis_vectors, len(vectors))
+
+    def eval_gram(self, gram: gm.GramMatrix) -> gm.EvaluatedGramMatrix:
+        """
+        Return the concrete representation of the :class:`GramMatrix`.
+
+        The coordinates of the vectors of each term are stacked into a
+        coefficient matrix once, so no :class:`Scalar` object is created or
+        evaluated per entry.
+
+        Args:
+            gram (:class:`GramMatrix`): The abstract :class:`GramMatrix` object
+                whose concrete representation we want to find.
+
+        Returns:
+            :class:`EvaluatedGramMatrix`: The concrete representation of the
+            `gram` argument.
+        """
+        terms = []
+        for X, Y, coef in gram.terms:
+            Cx = self._coefficient_matrix(X)
+            Cy = Cx if Y is X else self._coefficient_matrix(Y)
+            terms.append((Cx, Cy, float(self.eval_scalar(coef))))
+        return gm.EvaluatedGramMatrix(terms=tuple(terms))
+
     def repr_vector_by_basis(
         self, vector: vt.Vector, *, sympy_mode: bool = False
     ) -> str:
@@ -343,6 +1081,8 @@ class ExpressionManager:
             with this :class:`ExpressionManager`.
         """
         assert isinstance(vector, vt.Vector)
+        # Only the evaluation is memoized. The string embeds the tags of the
+        # basis vectors, which can still be added to.
         evaluated_vector = self.eval_vector(vector, sympy_mode=sympy_mode)
         return self.repr_evaluated_vector_by_basis(evaluated_vector)
 
@@ -365,6 +1105,7 @@ class ExpressionManager:
             the basis :class:`Vector` objects of the :class:`PEPContext`
             associated with this :class:`ExpressionManager`.
         """
+        evaluated_vector = evaluated_vector.to_dense()
         repr_str = ""
         for i, v in enumerate(evaluated_vector.coords):
             ith_tag = self.get_tag_of_basis_vector_index(i)
@@ -379,7 +1120,6 @@ class ExpressionManager:
             repr_str = "-" + repr_str[2:]
         return repr_str.strip()
 
-    @functools.cache
     def repr_scalar_by_basis(
         self,
         scalar: sc.Scalar,
@@ -416,6 +1156,7 @@ class ExpressionManager:
             :class:`ExpressionManager`.
         """
         assert isinstance(scalar, sc.Scalar)
+        # Only the evaluation is memoized, see `repr_vector_by_basis`.
         evaluated_scalar = self.eval_scalar(scalar, sympy_mode=sympy_mode)
         return self.repr_evaluated_scalar_by_basis(
             evaluated_scalar, greedy_square=greedy_square
@@ -448,6 +1189,7 @@ class ExpressionManager:
             the basis :class:`Vector` and :class:`Scalar` objects of the
             :class:`PEPContext` associated with this :class:`ExpressionManager`.
         """
+        evaluated_scalar = evaluated_scalar.to_dense()
         repr_str = ""
         if not math.isclose(evaluated_scalar.offset, 0, abs_tol=1e-5):
             repr_str += utils.numerical_str(evaluated_scalar.offset)
@@ -538,8 +1280,8 @@ def represent_matrix_by_basis(
         >>> matrix = np.array([[0.5, 0.5, 0], [0.5, 2, 0], [0, 0, 3]])
         >>> exm.represent_matrix_by_basis(matrix, pep_context, greedy_square=True)
     """
-    em = ExpressionManager(ctx)
-    matrix_shape = (len(em._basis_vectors), len(em._basis_vectors))
+    em = ctx.get_expression_manager()
+    matrix_shape = (em._num_basis_vectors, em._num_basis_vectors)
     if matrix.shape != matrix_shape:
         raise ValueError(
             "The valid matrix for given context should have shape {matrix_shape}"
@@ -549,7 +1291,7 @@ def represent_matrix_by_basis(
 
     return em.repr_evaluated_scalar_by_basis(
         sc.EvaluatedScalar(
-            func_coords=np.zeros(len(em._basis_scalars)),
+            func_coords=np.zeros(em._num_basis_scalars),
             inner_prod_coords=matrix,
             offset=0.0,
         ),
@@ -18,6 +18,9 @@
 # under the License.
 
 
+import gc
+import sys
+import weakref
 from typing import Iterator
 
 import numpy as np
@@ -26,10 +29,14 @@ import sympy as sp
 
 from pepflow import expression_manager as exm
 from pepflow import function as fc
+from pepflow import low_rank as lr
 from pepflow import math_expression as me
+from pepflow import parameter as pm
 from pepflow import pep as pep
 from pepflow import pep_context as pc
+from pepflow import rational_array as ra
 from pepflow import scalar as sc
+from pepflow import sparse_array as spa
 from pepflow import vector as vt
 
 
@@ -412,6 +419,20 @@ def test_repr_scalar_by_basis_interpolation_sympy_mode(
     )
 
 
+def test_repr_by_basis_simplifies_sympy_coefficients(
+    pep_context: pc.PEPContext,
+) -> None:
+    x = vt.Vector(is_basis=True, tags=["x"])
+    y = vt.Vector(is_basis=True, tags=["y"])
+    trig = sp.sin(1) ** 2 + sp.cos(1) ** 2
+    em = exm.ExpressionManager(pep_context)
+
+    v = trig * x + sp.sqrt(2) * trig * y
+    assert em.repr_vector_by_basis(v, sympy_mode=True) == "x + \\sqrt{2}*y"
+    s = trig * (x * y) + sp.Rational(1, 3) * (x * x)
+    assert em.repr_scalar_by_basis(s, sympy_mode=True) == "1/3*|x|^2 + ⟨x,y⟩"
+
+
 # TODO add more tests about repr_scalar_by_basis
 
 
@@ -424,3 +445,277 @@ def test_represent_matrix_by_basis(pep_context: pc.PEPContext) -> None:
         exm.represent_matrix_by_basis(matrix, pep_context, greedy_square=True)
         == "0.5*|x_1+x_2|^2 + 1.5*|x_2|^2 + 3*|x_3|^2"
     )
+
+
+def test_expression_manager_sparse_backend(pep_context: pc.PEPContext) -> None:
+    p1 = vt.Vector(is_basis=True, tags=["p1"])
+    p2 = vt.Vector(is_basis=True, tags=["p2"])
+    p3 = vt.Vector(is_basis=True, tags=["p3"])
+    s1 = sc.Scalar(is_basis=True, tags=["s1"])
+    s2 = sc.Scalar(is_basis=True, tags=["s2"])
+    p4 = 2 * p1 - p3 / 4
+    s3 = 3 * s1 + p4 * p2 + p3 * p3 - 1
+    s4 = vt.Vector.zero() * p1 + sc.Scalar.zero()
+
+    dense_em = exm.ExpressionManager(pep_context)
+    sparse_em = exm.ExpressionManager(pep_context, backend="sparse")
+    assert sparse_em.is_sparse
+
+    evaled_p4 = sparse_em.eval_vector(p4)
+    assert isinstance(evaled_p4.coords, spa.SparseArray)
+    assert evaled_p4.coords.nnz == 2
+    np.testing.assert_allclose(
+        evaled_p4.to_dense().coords, dense_em.eval_vector(p4).coords
+    )
+
+    for s in [s1, s2, s3, s4]:
+        evaled = sparse_em.eval_scalar(s)
+        assert isinstance(evaled.func_coords, spa.SparseArray)
+        assert isinstance(evaled.inner_prod_coords, spa.SparseArray)
+        expected = dense_em.eval_scalar(s)
+        np.testing.assert_allclose(evaled.to_dense().func_coords, expected.func_coords)
+        np.testing.assert_allclose(
+            evaled.to_dense().inner_prod_coords, expected.inner_prod_coords
+        )
+        np.testing.assert_allclose(evaled.offset, expected.offset)
+    # p1*p2, p3*p2 (both symmetric) and p3*p3.
+    assert sparse_em.eval_scalar(s3).inner_prod_coords.nnz == 5
+
+    assert sparse_em.repr_scalar_by_basis(s3) == dense_em.repr_scalar_by_basis(s3)
+    assert sparse_em.repr_vector_by_basis(p4) == dense_em.repr_vector_by_basis(p4)
+
+    # sympy mode
+    np.testing.assert_equal(
+        sparse_em.eval_vector(p4, sympy_mode=True).to_dense().coords,
+        np.array([sp.S(2), sp.S(0), -sp.S(1) / 4]),
+        strict=True,
+    )
+
+
+def test_expression_manager_compile(pep_context: pc.PEPContext) -> None:
+    f = fc.SmoothConvexFunction(is_basis=True, L=1, tags=["f"])
+    x = vt.Vector(is_basis=True, tags=["x_0"])
+    s = sc.Scalar(is_basis=True, tags=["s"])
+    for i in range(5):
+        x = x - sp.S(1) / 2 * f.grad(x)
+        s = 2 * s + f(x) - x * x / 3 + 1
+    p_zero = vt.Vector.zero() * 2
+    s_zero = sc.Scalar.zero() + p_zero * x
+
+    nodes = [*pep_context.vectors, *pep_context.scalars]
+    order = exm.topological_order(nodes[::-1])
+    assert len(order) == len(nodes)
+    position = {node.uid: i for i, node in enumerate(order)}
+    for node in order:
+        for child in exm._children(node):
+            assert position[child.uid] < position[node.uid]
+
+    em = exm.ExpressionManager(pep_context)
+    compiled_em = exm.ExpressionManager(pep_context).compile()
+    assert len(compiled_em._compiled[False].vector_uid_to_row) == len(
+        pep_context.vectors
+    )
+    for v in [x, p_zero]:
+        np.testing.assert_allclose(
+            compiled_em.eval_vector(v).coords,
+            em.eval_vector(v).coords.astype(float),
+        )
+    for sc_ in [s, s_zero]:
+        evaled = compiled_em.eval_scalar(sc_)
+        expected = em.eval_scalar(sc_)
+        np.testing.assert_allclose(
+            evaled.func_coords, expected.func_coords.astype(float)
+        )
+        np.testing.assert_allclose(
+            evaled.inner_prod_coords, expected.inner_prod_coords.astype(float)
+        )
+        np.testing.assert_allclose(float(evaled.offset), float(expected.offset))
+
+    # The compiled arrays are shared so they cannot be modified.
+    with pytest.raises(ValueError):
+        compiled_em.eval_vector(x).coords[0] = 1.0
+
+    # Objects created after compiling are evaluated on demand.
+    s_new = s - x * x
+    np.testing.assert_allclose(
+        compiled_em.eval_scalar(s_new).inner_prod_coords,
+        em.eval_scalar(s_new).inner_prod_coords.astype(float),
+    )
+
+    # sympy mode
+    compiled_em.compile(sympy_mode=True)
+    np.testing.assert_equal(
+        compiled_em.eval_vector(x, sympy_mode=True).coords,
+        em.eval_vector(x, sympy_mode=True).coords,
+        strict=True,
+    )
+    np.testing.assert_equal(
+        compiled_em.eval_scalar(s, sympy_mode=True).inner_prod_coords,
+        em.eval_scalar(s, sympy_mode=True).inner_prod_coords,
+    )
+    assert compiled_em.repr_scalar_by_basis(
+        s, sympy_mode=True
+    ) == em.repr_scalar_by_basis(s, sympy_mode=True)
+
+    with pytest.raises(ValueError):
+        exm.ExpressionManager(pep_context, backend="sparse").compile()
+
+
+def test_expression_manager_cache(pep_context: pc.PEPContext) -> None:
+    p1 = vt.Vector(is_basis=True, tags=["p1"])
+    p2 = vt.Vector(is_basis=True, tags=["p2"])
+    p3 = p1 + p2
+    s1 = p3 * p3
+
+    em = exm.ExpressionManager(pep_context)
+    em.eval_scalar(s1)
+    # s1, p3, p1 and p2 are all evaluated once. The operands are looked up
+    # from the cache when evaluating p3 and s1.
+    assert em.cache_info() == {"hits": 4, "misses": 1, "maxsize": None, "currsize": 4}
+    assert em.eval_scalar(s1) is em.eval_scalar(s1)
+    assert em.cache.hits == 6
+
+    # sympy_mode is part of the key.
+    em.eval_vector(p3, sympy_mode=True)
+    assert em.cache.misses == 2
+    assert len(em.cache) == 7
+
+    em.clear_cache()
+    assert em.cache_info() == {"hits": 0, "misses": 0, "maxsize": None, "currsize": 0}
+
+    bounded_em = exm.ExpressionManager(pep_context, cache_size=2)
+    bounded_em.eval_scalar(s1)
+    assert len(bounded_em.cache) == 2
+    np.testing.assert_allclose(
+        bounded_em.eval_scalar(s1).inner_prod_coords,
+        em.eval_scalar(s1).inner_prod_coords,
+    )
+
+    with pytest.raises(ValueError):
+        exm.ExpressionManager(pep_context, cache_size=0)
+
+
+def test_expression_manager_cache_is_released(pep_context: pc.PEPContext) -> None:
+    p1 = vt.Vector(is_basis=True, tags=["p1"])
+    em = exm.ExpressionManager(pep_context)
+    em.eval_vector(p1)
+    ref = weakref.ref(em)
+    del em
+    gc.collect()
+    assert ref() is None
+
+
+def test_expression_manager_deep_expression(pep_context: pc.PEPContext) -> None:
+    p = vt.Vector(is_basis=True, tags=["p"])
+    s = sc.Scalar(is_basis=True, tags=["s"])
+    depth = 3 * sys.getrecursionlimit()
+    x = p
+    y = s
+    for _ in range(depth):
+        x = x + p
+        y = y + s
+
+    em = exm.ExpressionManager(pep_context)
+    np.testing.assert_allclose(em.eval_vector(x).coords, [depth + 1])
+    np.testing.assert_allclose(em.eval_scalar(y).func_coords, [depth + 1])
+    np.testing.assert_allclose(
+        em.eval_scalar(x * x).inner_prod_coords, [[(depth + 1) ** 2]]
+    )
+
+
+def test_expression_manager_low_rank_backend(pep_context: pc.PEPContext) -> None:
+    f = fc.SmoothConvexFunction(is_basis=True, L=1, tags=["f"])
+    x_0 = vt.Vector(is_basis=True, tags=["x_0"])
+    x_1 = x_0 - f.grad(x_0)
+    s = f(x_1) - f(x_0) + (f.grad(x_1) - f.grad(x_0)) ** 2 / 2 + 3 * x_0 * x_1
+
+    dense_em = exm.ExpressionManager(pep_context)
+    low_rank_em = exm.ExpressionManager(pep_context, backend="low_rank")
+
+    evaled = low_rank_em.eval_scalar(s)
+    assert isinstance(evaled.inner_prod_coords, lr.LowRankMatrix)
+    expected = dense_em.eval_scalar(s)
+    np.testing.assert_allclose(evaled.func_coords, expected.func_coords)
+    np.testing.assert_allclose(
+        evaled.to_dense().inner_prod_coords, expected.inner_prod_coords
+    )
+    assert low_rank_em.repr_scalar_by_basis(s) == dense_em.repr_scalar_by_basis(s)
+
+
+def test_expression_manager_rational_backend(pep_context: pc.PEPContext) -> None:
+    f = fc.SmoothConvexFunction(is_basis=True, L=1, tags=["f"])
+    x_0 = vt.Vector(is_basis=True, tags=["x_0"])
+    x = x_0
+    for _ in range(3):
+        x = x - sp.S(1) / 3 * f.grad(x)
+    s = f(x) - f(x_0) + sp.S(2) / 7 * (x - x_0) ** 2 - 1
+
+    sympy_em = exm.ExpressionManager(pep_context)
+    rational_em = exm.ExpressionManager(pep_context, backend="rational")
+
+    evaled_x = rational_em.eval_vector(x)
+    assert isinstance(evaled_x.coords, ra.RationalArray)
+    assert evaled_x.coords.denominator == 3
+    np.testing.assert_equal(
+        evaled_x.to_dense().coords,
+        sympy_em.eval_vector(x, sympy_mode=True).coords,
+        strict=True,
+    )
+
+    evaled = rational_em.eval_scalar(s)
+    assert isinstance(evaled.func_coords, ra.RationalArray)
+    assert isinstance(evaled.inner_prod_coords, ra.RationalArray)
+    expected = sympy_em.eval_scalar(s, sympy_mode=True)
+    np.testing.assert_equal(evaled.to_dense().func_coords, expected.func_coords)
+    np.testing.assert_equal(
+        evaled.to_dense().inner_prod_coords, expected.inner_prod_coords
+    )
+    assert evaled.to_dense().offset == expected.offset == -1
+    assert rational_em.repr_scalar_by_basis(s) == sympy_em.repr_scalar_by_basis(
+        s, sympy_mode=True
+    )
+
+    with pytest.raises(ValueError, match="not an exact rational number"):
+        rational_em.eval_vector(0.5 * x_0)
+
+
+def test_expression_manager_parametrize(pep_context: pc.PEPContext) -> None:
+    f = fc.SmoothConvexFunction(is_basis=True, L=1, tags=["f"])
+    h = pm.Parameter("h")
+    L = pm.Parameter("L")
+    x_0 = vt.Vector(is_basis=True, tags=["x_0"])
+    x = x_0
+    for _ in range(3):
+        x = x - h / L * f.grad(x)
+    s = f(x) - f(x_0) + L / 2 * (x - x_0) ** 2 + h
+
+    parametric = exm.ExpressionManager(pep_context).parametrize()
+    assert parametric.param_names == ("L", "h")
+
+    hs = [0.5, 1.0, 1.5]
+    batch = parametric.batch_substitute({"h": hs, "L": [2.0, 2.0, 4.0]})
+    assert len(batch) == 3
+    for compiled, h_val, L_val in zip(batch, hs, [2.0, 2.0, 4.0]):
+        em = exm.ExpressionManager(
+            pep_context, resolve_parameters={"h": h_val, "L": L_val}
+        )
+        np.testing.assert_allclose(
+            compiled.evaluated_vector(x).coords,
+            em.eval_vector(x).coords.astype(float),
+        )
+        expected = em.eval_scalar(s)
+        evaled = compiled.evaluated_scalar(s)
+        np.testing.assert_allclose(
+            evaled.func_coords, expected.func_coords.astype(float)
+        )
+        np.testing.assert_allclose(
+            evaled.inner_prod_coords, expected.inner_prod_coords.astype(float)
+        )
+        np.testing.assert_allclose(evaled.offset, float(expected.offset))
+
+    single = parametric.substitute({"h": 1.0, "L": 2.0})
+    np.testing.assert_allclose(
+        single.evaluated_vector(x).coords, batch[1].evaluated_vector(x).coords
+    )
+    with pytest.raises(ValueError, match="Cannot resolve Parameters"):
+        parametric.substitute({"h": 1.0})
@@ -20,11 +20,12 @@
 from __future__ import annotations
 
 import numbers
-import uuid
 import warnings
+from collections.abc import Hashable, Sequence
 from typing import TYPE_CHECKING
 
 import attrs
+import numpy as np
 import sympy as sp
 
 from pepflow import constraint as ct
@@ -65,7 +66,7 @@ class Triplet:
     grad: Vector
     func: Function
     name: str | None
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
 
     def expand(self) -> tuple[vt.Vector, sc.Scalar, vt.Vector]:
         """
@@ -154,7 +155,7 @@ class Function:
     math_expr: MathExpr = attrs.field(factory=me.MathExpr)
 
     # Generate an automatic id
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
 
     def __attrs_post_init__(self):
         if self.is_basis:
@@ -238,6 +239,41 @@ class Function:
             raise RuntimeError("Did you forget to create a context?")
         pep_context.add_triplet(triplet)
 
+    def structural_key(self) -> Hashable:
+        """
+        Return a key that identifies this :class:`Function` object by how it is
+        built from basis :class:`Function` objects.
+
+        Every `f + g` or `c * f` creates a new :class:`Function` object with a
+        new `uid`. Separately built but identical combinations, e.g., two
+        `f + g`, have the same key.
+
+        Returns:
+            Hashable: The `uid` of a basis :class:`Function` object, or a tuple
+            made of the kind of composition and the keys of its components.
+        """
+        if isinstance(self.composition, AddedFunc):
+            return (
+                AddedFunc,
+                self.composition.left_func.structural_key(),
+                self.composition.right_func.structural_key(),
+            )
+        if isinstance(self.composition, ScaledFunc):
+            return (
+                ScaledFunc,
+                # The type keeps, e.g., `2 * f` and `2.0 * f` apart.
+                type(self.composition.scale),
+                self.composition.scale,
+                self.composition.base_func.structural_key(),
+            )
+        return self.uid
+
+    def add_composite_triplet_to_func(self, triplet: Triplet) -> None:
+        pep_context = pc.get_current_context()
+        if pep_context is None:
+            raise RuntimeError("Did you forget to create a context?")
+        pep_context.add_composite_triplet(triplet)
+
     def add_point_with_grad_restriction(
         self, point: vt.Vector, desired_grad: vt.Vector
     ) -> Triplet:
@@ -304,6 +340,7 @@ class Function:
                 raise ValueError(
                     f"Unknown composition of functions: {self.composition}"
                 )
+            self.add_composite_triplet_to_func(triplet)
         return triplet
 
     def set_stationary_point(self, name: str) -> vt.Vector:
@@ -350,11 +387,8 @@ class Function:
             raise ValueError("The Function can only take point as input.")
 
         if self.is_basis:
-            for triplet in pep_context.func_to_triplets[self]:
-                if (
-                    triplet.point.uid == point.uid
-                ):  # TODO: make different way to determine this point
-                    return triplet
+            if (triplet := pep_context.find_triplet(point, self)) is not None:
+                return triplet
 
             func_val = sc.Scalar(
                 is_basis=True,
@@ -379,6 +413,12 @@ class Function:
             self.add_triplet_to_func(new_triplet)
             return new_triplet
         else:
+            if (triplet := pep_context.find_composite_triplet(point, self)) is not None:
+                if triplet.func is self:
+                    return triplet
+                # Cached for an identical but separately built function.
+                return attrs.evolve(triplet, func=self)
+
             if isinstance(self.composition, AddedFunc):
                 left_triplet = self.composition.left_func.generate_triplet(point)
                 right_triplet = self.composition.right_func.generate_triplet(point)
@@ -392,15 +432,93 @@ class Function:
                 raise ValueError(
                     f"Unknown composition of functions: {self.composition}"
                 )
-            return Triplet(
+            new_triplet = Triplet(
                 point,
                 func_val,
                 grad,
                 self,
                 name=utils.triplet_tag(point, func_val, grad),
             )
+            pep_context.add_composite_triplet(new_triplet)
+            return new_triplet
+
+    def generate_triplets(self, points: Sequence[vt.Vector]) -> list[Triplet]:
+        """
+        Return the triplets of this :class:`Function` at several points.
+
+        This is equivalent to calling :py:func:`generate_triplet` for each
+        point, but the new function values, gradients and triplets of a basis
+        :class:`Function` are registered in the current :class:`PEPContext`
+        with a single update instead of one at a time.
+
+        Args:
+            points (Sequence[:class:`Vector`]): The points.
+
+        Returns:
+            list[:class:`Triplet`]: The triplets at `points`, in the same order.
 
-    def grad(self, point: vt.Vector) -> vt.Vector:
+        Example:
+            >>> import pepflow as pf
+            >>> ctx = pf.PEPContext("ctx").set_as_current()
+            >>> f = pf.SmoothConvexFunction(is_basis=True, L=1, tags=["f"])
+            >>> points = pf.Vector.make_basis("x_{}", 3)
+            >>> grads = [t.grad for t in f.generate_triplets(points)]
+        """
+        pep_context = pc.get_current_context()
+        if pep_context is None:
+            raise RuntimeError("Did you forget to create a context?")
+        if not all(isinstance(point, vt.Vector) for point in points):
+            raise ValueError("The Function can only take point as input.")
+        if not self.is_basis:
+            return [self.generate_triplet(point) for point in points]
+
+        uid_to_triplet = {}
+        new_points = []
+        for point in points:
+            if point.uid not in uid_to_triplet:
+                uid_to_triplet[point.uid] = pep_context.find_triplet(point, self)
+                if uid_to_triplet[point.uid] is None:
+                    new_points.append(point)
+
+        with pep_context._deferred_registration():
+            func_vals = [
+                sc.Scalar(
+                    is_basis=True,
+                    math_expr=me.MathExpr(
+                        expr_str=f"{self.__repr__()}({point.__repr__()})"
+                    ),
+                )
+                for point in new_points
+            ]
+            grads = [
+                vt.Vector(
+                    is_basis=True,
+                    math_expr=me.MathExpr(
+                        expr_str=utils.grad_tag(
+                            f"{self.__repr__()}({point.__repr__()})"
+                        )
+                    ),
+                )
+                for point in new_points
+            ]
+        new_triplets = [
+            Triplet(
+                point,
+                func_val,
+                grad,
+                self,
+                name=utils.triplet_tag(point, func_val, grad),
+            )
+            for point, func_val, grad in zip(new_points, func_vals, grads)
+        ]
+        pep_context.add_scalars(func_vals)
+        pep_context.add_vectors(grads)
+        pep_context.add_triplets(new_triplets)
+        for triplet in new_triplets:
+            uid_to_triplet[triplet.point.uid] = triplet
+        return [uid_to_triplet[point.uid] for point in points]
+
+    def grad(self, point: vt.Vector | vt.VectorArray) -> vt.Vector | vt.VectorArray:
         """
         Returns a :class:`Vector` object that is the gradient of the
         :class:`Function` at the given :class:`Vector`.
@@ -409,11 +527,14 @@ class Function:
         and subgradients are effectively treated the same in the context of PEP.
 
         Args:
-            point (:class:`Vector`): Any :class:`Vector`.
+            point (:class:`Vector` | :class:`VectorArray`): Any :class:`Vector`.
+                For a :class:`VectorArray`, the triplets at all of its points
+                are generated with :py:func:`generate_triplets`.
 
         Returns:
-            :class:`Vector`: The gradient of the :class:`Function` at the
-            given :class:`Vector`.
+            :class:`Vector` | :class:`VectorArray`: The gradient of the
+            :class:`Function` at the given :class:`Vector`, or the stacked
+            gradients at the points of the given :class:`VectorArray`.
 
         Example:
             >>> import pepflow as pf
@@ -422,25 +543,37 @@ class Function:
             >>> f = pf.SmoothConvexFunction(is_basis=True, L=1, tags=["f"])
             >>> f.grad(x_0)
         """
+        if isinstance(point, vt.VectorArray):
+            triplets = self.generate_triplets(point.to_vectors())
+            return vt.VectorArray.from_vectors([t.grad for t in triplets])
         triplet = self.generate_triplet(point)
         return triplet.grad
 
-    def func_val(self, point: vt.Vector) -> sc.Scalar:
+    def func_val(self, point: vt.Vector | vt.VectorArray) -> sc.Scalar | np.ndarray:
         """
         Returns a :class:`Scalar` object that is the function value of the
         :class:`Function` at the given :class:`Vector`.
 
         Args:
-            point (:class:`Vector`): Any :class:`Vector`.
+            point (:class:`Vector` | :class:`VectorArray`): Any :class:`Vector`.
+                For a :class:`VectorArray`, the triplets at all of its points
+                are generated with :py:func:`generate_triplets`.
 
         Returns:
-            :class:`Vector`: The function value of the :class:`Function` at the
-            given :class:`Vector`.
+            :class:`Scalar` | np.ndarray: The function value of the
+            :class:`Function` at the given :class:`Vector`, or the
+            `np.ndarray` of the function values at the points of the given
+            :class:`VectorArray`.
         """
+        if isinstance(point, vt.VectorArray):
+            triplets = self.generate_triplets(point.to_vectors())
+            func_vals = np.empty(len(triplets), dtype=object)
+            func_vals[:] = [t.func_val for t in triplets]
+            return func_vals
         triplet = self.generate_triplet(point)
         return triplet.func_val
 
-    def __call__(self, point: vt.Vector) -> sc.Scalar:
+    def __call__(self, point: vt.Vector | vt.VectorArray) -> sc.Scalar | np.ndarray:
         return self.func_val(point)
 
     def __add__(self, other):
@@ -346,3 +346,113 @@ def test_smooth_interpolability_constraints(pep_context: pc.PEPContext):
         ).offset,
         0,
     )
+
+
+def test_generate_triplets(pep_context: pc.PEPContext):
+    f = fc.Function(is_basis=True, tags=["f"])
+    g = fc.Function(is_basis=True, tags=["g"])
+    x_0 = vector.Vector(is_basis=True, tags=["x_0"])
+    first = f.generate_triplet(x_0)
+    points = vector.Vector.make_basis("x_{}", range(1, 4))
+
+    triplets = f.generate_triplets([x_0, *points, points[0]])
+    assert triplets[0] is first
+    assert triplets[1] is triplets[4]
+    assert [t.point for t in triplets] == [x_0, *points, points[0]]
+    assert pep_context.func_to_triplets[f] == triplets[:4]
+    assert repr(triplets[1].func_val) == "f(x_1)"
+    assert repr(triplets[1].grad) == "grad_f(x_1)"
+    # Same basis as generating the triplets one at a time.
+    assert pep_context.basis_scalars() == [t.func_val for t in triplets[:4]]
+    assert pep_context.basis_vectors() == [
+        x_0,
+        first.grad,
+        *points,
+        *[t.grad for t in triplets[1:4]],
+    ]
+    assert f.grad(points[1]) is triplets[2].grad
+
+    h = f + 2 * g
+    triplets = h.generate_triplets(points)
+    assert [t.point for t in triplets] == points
+    assert len(pep_context.func_to_triplets[g]) == 3
+
+
+def test_function_of_vector_array(pep_context: pc.PEPContext):
+    f = fc.Function(is_basis=True, tags=["f"])
+    X = vector.VectorArray.from_vectors(vector.Vector.make_basis("x_{}", 3))
+    G = f.grad(X)
+    assert isinstance(G, vector.VectorArray)
+    assert len(pep_context.func_to_triplets[f]) == 3
+    assert [repr(g) for g in G] == ["grad_f(x_0)", "grad_f(x_1)", "grad_f(x_2)"]
+    F = f(X)
+    assert [repr(val) for val in F] == ["f(x_0)", "f(x_1)", "f(x_2)"]
+
+    # A gradient step on all the points at once.
+    Y = X - 0.5 * G
+    f.grad(Y)
+    assert len(pep_context.func_to_triplets[f]) == 6
+    assert f.grad(Y[1]) is pep_context.func_to_triplets[f][4].grad
+
+
+def test_composite_triplet_is_cached(pep_context: pc.PEPContext):
+    f = fc.Function(is_basis=True, tags=["f"])
+    g = fc.Function(is_basis=True, tags=["g"])
+    h = f + 2 * g
+    x = vector.Vector(is_basis=True, tags=["x"])
+
+    grad = h.grad(x)
+    num_vectors = len(pep_context.vectors)
+    num_scalars = len(pep_context.scalars)
+    assert h.grad(x) is grad
+    assert h(x) is h.generate_triplet(x).func_val
+    assert h.generate_triplets([x, x])[1].grad is grad
+    assert len(pep_context.vectors) == num_vectors
+    assert len(pep_context.scalars) == num_scalars
+    # Composite triplets are not interpolation points of `h`.
+    assert h not in pep_context.func_to_triplets
+
+    # The triplets built inside ephemeral scopes are not cached.
+    y = vector.Vector(is_basis=True, tags=["y"])
+    with pep_context.ephemeral():
+        grad_y = h.grad(y)
+    assert h.grad(y) is not grad_y
+
+    pep_context.clear()
+    assert pep_context.find_composite_triplet(x, h) is None
+
+
+def test_composite_triplet_is_shared_by_rebuilt_functions(
+    pep_context: pc.PEPContext,
+):
+    f = fc.Function(is_basis=True, tags=["f"])
+    g = fc.Function(is_basis=True, tags=["g"])
+    x = vector.Vector(is_basis=True, tags=["x"])
+
+    grad = (f + g).grad(x)
+    func_val = (f + g)(x)
+    scaled_grad = (2 * f - g / 2).grad(x)
+    num_vectors = len(pep_context.vectors)
+    num_scalars = len(pep_context.scalars)
+    num_triplets = len(pep_context._composite_triplets)
+    for _ in range(3):
+        assert (f + g).grad(x) is grad
+        assert (f + g)(x) is func_val
+        assert (2 * f - g / 2).grad(x) is scaled_grad
+    assert len(pep_context.vectors) == num_vectors
+    assert len(pep_context.scalars) == num_scalars
+    assert len(pep_context._composite_triplets) == num_triplets
+
+    # Different combinations are not mixed up.
+    assert (g + f).grad(x) is not grad
+    assert (f + 2 * g).grad(x) is not grad
+    assert (f + g).structural_key() != (f + 2 * g).structural_key()
+    assert (2 * f).structural_key() != (2.0 * f).structural_key()
+    assert (2.0 * f).grad(x) is not (2 * f).grad(x)
+
+    # A cached triplet is returned bound to the requesting function.
+    h = f + g
+    triplet = h.generate_triplet(x)
+    assert triplet.func is h
+    assert triplet.grad is grad
+    assert triplet.func_val is func_val
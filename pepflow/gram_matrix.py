@@ -0,0 +1,225 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+import attrs
+import numpy as np
+
+from pepflow import scalar as sc
+from pepflow import utils
+from pepflow import vector as vt
+
+if TYPE_CHECKING:
+    import cvxpy
+
+    from pepflow.parameter import Parameter
+
+
+@attrs.frozen
+class GramMatrix:
+    """
+    A matrix of inner products of two lists of :class:`Vector` objects.
+
+    A :class:`GramMatrix` with terms `[(X_1, Y_1, c_1), ..., (X_k, Y_k, c_k)]`
+    represents the matrix whose `(i, j)`-th entry is
+    `sum_l c_l * <X_l[i], Y_l[j]>`. Unlike `np.outer(X, Y)`, it does not
+    create a :class:`Scalar` object per entry. Its concrete representation
+    is computed as `sum_l c_l * Cx_l^T G Cy_l` from the coefficient matrices
+    `Cx_l` and `Cy_l` of the vectors, where `G` is the Gram matrix of the
+    basis vectors.
+
+    :class:`GramMatrix` objects should be created with :py:func:`gram`. They
+    support addition and subtraction of other :class:`GramMatrix` objects of
+    the same shape and multiplication and division by numbers and
+    :class:`Parameter` objects. Combining them with anything else, e.g., an
+    `np.ndarray` of :class:`Scalar` objects, falls back to the matrix of
+    :class:`Scalar` objects returned by :py:func:`to_scalar_matrix`.
+
+    Attributes:
+        terms (tuple): A tuple of `(X, Y, coef)` triples where `X` and `Y` are
+            tuples of :class:`Vector` objects and `coef` is a number or a
+            :class:`Parameter`.
+    """
+
+    terms: tuple[tuple[tuple[vt.Vector, ...], tuple[vt.Vector, ...], Any], ...]
+
+    # Make numpy defer to our reflected operators.
+    __array_ufunc__ = None
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        X, Y, _ = self.terms[0]
+        return (len(X), len(Y))
+
+    def vectors(self) -> list[vt.Vector]:
+        """Return the distinct :class:`Vector` objects the matrix is built from."""
+        seen = {}
+        for X, Y, _ in self.terms:
+            for vector in (*X, *Y):
+                seen.setdefault(vector.uid, vector)
+        return list(seen.values())
+
+    def __getitem__(self, index: tuple[int, int]) -> sc.Scalar:
+        i, j = index
+        entry = None
+        for X, Y, coef in self.terms:
+            term = coef * (X[i] * Y[j])
+            entry = term if entry is None else entry + term
+        return entry
+
+    def to_scalar_matrix(self) -> np.ndarray:
+        """Return the equivalent `np.ndarray` of :class:`Scalar` objects."""
+        matrix = np.empty(self.shape, dtype=object)
+        for i, j in np.ndindex(self.shape):
+            matrix[i, j] = self[i, j]
+        return matrix
+
+    def _merge(self, other: GramMatrix, sign: int) -> GramMatrix:
+        if self.shape != other.shape:
+            raise ValueError(
+                f"Cannot combine GramMatrix of shape {self.shape} and {other.shape}."
+            )
+        terms = other.terms
+        if sign < 0:
+            terms = tuple((X, Y, -coef) for X, Y, coef in terms)
+        return GramMatrix(terms=self.terms + terms)
+
+    def _scale(self, factor: Any) -> GramMatrix:
+        return GramMatrix(
+            terms=tuple((X, Y, factor * coef) for X, Y, coef in self.terms)
+        )
+
+    def __add__(self, other):
+        if isinstance(other, GramMatrix):
+            return self._merge(other, 1)
+        if utils.is_numerical(other) and other == 0:
+            return self
+        return self.to_scalar_matrix() + other
+
+    def __radd__(self, other):
+        if utils.is_numerical(other) and other == 0:
+            return self
+        return other + self.to_scalar_matrix()
+
+    def __sub__(self, other):
+        if isinstance(other, GramMatrix):
+            return self._merge(other, -1)
+        if utils.is_numerical(other) and other == 0:
+            return self
+        return self.to_scalar_matrix() - other
+
+    def __rsub__(self, other):
+        if utils.is_numerical(other) and other == 0:
+            return -self
+        return other - self.to_scalar_matrix()
+
+    def __neg__(self):
+        return self._scale(-1)
+
+    def __mul__(self, other):
+        if utils.is_numerical_or_parameter(other):
+            return self._scale(other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if utils.is_numerical_or_parameter(other):
+            return GramMatrix(
+                terms=tuple((X, Y, coef / other) for X, Y, coef in self.terms)
+            )
+        return NotImplemented
+
+
+@attrs.frozen
+class EvaluatedGramMatrix:
+    """
+    The concrete representation of a :class:`GramMatrix` object.
+
+    Attributes:
+        terms (tuple): A tuple of `(Cx, Cy, coef)` triples where `Cx` and `Cy`
+            are the coefficient matrices, of shape `(num_basis_vectors, len(X))`
+            and `(num_basis_vectors, len(Y))`, and `coef` is a number.
+    """
+
+    terms: tuple[tuple[np.ndarray, np.ndarray, Any], ...]
+
+    def contract(self, gram: np.ndarray | cvxpy.Expression):
+        """Return `sum_l coef_l * Cx_l^T @ gram @ Cy_l`.
+
+        `gram` can be a numerical Gram matrix of the basis vectors or a cvxpy
+        expression such as the Gram matrix variable.
+        """
+        matrix = 0
+        for Cx, Cy, coef in self.terms:
+            matrix = matrix + coef * (Cx.T @ gram @ Cy)
+        return matrix
+
+    def adjoint(self, dual: np.ndarray | cvxpy.Expression):
+        """Return the symmetric `M` such that `Tr(dual @ contract(G)) = Tr(M @ G)`
+        for every symmetric `G` and symmetric `dual`.
+
+        This is `sum_l coef_l * (Cx_l @ dual @ Cy_l^T + Cy_l @ dual @ Cx_l^T) / 2`.
+        """
+        matrix = 0
+        for Cx, Cy, coef in self.terms:
+            matrix = matrix + coef / 2 * (Cx @ dual @ Cy.T + Cy @ dual @ Cx.T)
+        return matrix
+
+
+def gram(
+    X: Sequence[vt.Vector],
+    Y: Sequence[vt.Vector] | None = None,
+    coef: utils.NUMERICAL_TYPE | Parameter = 1,
+) -> GramMatrix:
+    """Return the matrix of inner products `[<X[i], Y[j]>]_{i, j}`.
+
+    Args:
+        X (Sequence[:class:`Vector`]): The vectors indexing the rows.
+        Y (Sequence[:class:`Vector`] | None): The vectors indexing the columns.
+            By default `X`, i.e., the Gram matrix of `X`.
+        coef (:data:`NUMERICAL_TYPE` | :class:`Parameter`): A factor applied to
+            every entry. By default `1`.
+
+    Returns:
+        :class:`GramMatrix`: The matrix of inner products.
+
+    Example:
+        >>> import pepflow as pf
+        >>> ctx = pf.PEPContext("ctx").set_as_current()
+        >>> x = pf.Vector(is_basis=True, tags=["x"])
+        >>> y = pf.Vector(is_basis=True, tags=["y"])
+        >>> pf.gram([x, y]).shape
+        (2, 2)
+    """
+    X = tuple(X)
+    Y = X if Y is None else tuple(Y)
+    if len(X) == 0 or len(Y) == 0:
+        raise ValueError("The lists of vectors should not be empty.")
+    for vector in (*X, *Y):
+        if not isinstance(vector, vt.Vector):
+            raise TypeError(
+                f"Expected Vector objects but got {type(vector).__name__}."
+            )
+    return GramMatrix(terms=((X, Y, coef),))
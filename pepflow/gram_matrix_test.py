@@ -0,0 +1,126 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from collections.abc import Iterator
+
+import numpy as np
+import pytest
+
+from pepflow import constraint as ct
+from pepflow import expression_manager as exm
+from pepflow import gram_matrix as gm
+from pepflow import operator as oper
+from pepflow import pep_context as pc
+from pepflow import registry as reg
+from pepflow import solver as ps
+from pepflow import utils
+from pepflow import vector as vt
+
+
+@pytest.fixture
+def pep_context() -> Iterator[pc.PEPContext]:
+    """Prepare the pep context and reset the context to None at the end."""
+
+    ctx = pc.PEPContext("test").set_as_current()
+    yield ctx
+    pc.set_current_context(None)
+    pc.GLOBAL_CONTEXT_DICT.clear()
+    reg.REGISTERED_FUNC_AND_OPER_DICT.clear()
+
+
+def test_gram_does_not_create_scalars(pep_context: pc.PEPContext):
+    x = vt.Vector(is_basis=True, tags=["x"])
+    y = vt.Vector(is_basis=True, tags=["y"])
+    z = x + 2 * y
+
+    num_scalars = len(pep_context.scalars)
+    mat = 2 * gm.gram([x, z]) - gm.gram([y, z], [x, y]) / 2
+    assert mat.shape == (2, 2)
+    assert len(pep_context.scalars) == num_scalars
+
+    em = exm.ExpressionManager(pep_context)
+    G = np.array([[2.0, 0.5], [0.5, 1.0]])
+    evaluated = em.eval_gram(mat).contract(G)
+    for i, j in np.ndindex(mat.shape):
+        entry = em.eval_scalar(mat[i, j])
+        assert evaluated[i, j] == pytest.approx(np.trace(G @ entry.inner_prod_coords))
+
+
+def test_gram_matrix_adjoint(pep_context: pc.PEPContext):
+    x = vt.Vector(is_basis=True, tags=["x"])
+    y = vt.Vector(is_basis=True, tags=["y"])
+    z = vt.Vector(is_basis=True, tags=["z"])
+    em = exm.ExpressionManager(pep_context)
+    evaluated = em.eval_gram(gm.gram([x, y + z], [z, x - y]))
+
+    rng = np.random.default_rng(0)
+    G = rng.standard_normal((3, 3))
+    G = G + G.T
+    P = rng.standard_normal((2, 2))
+    P = P + P.T
+    assert np.trace(P @ evaluated.contract(G)) == pytest.approx(
+        np.trace(evaluated.adjoint(P) @ G)
+    )
+
+
+def test_gram_rejects_invalid_inputs(pep_context: pc.PEPContext):
+    x = vt.Vector(is_basis=True, tags=["x"])
+    with pytest.raises(ValueError):
+        gm.gram([])
+    with pytest.raises(TypeError):
+        gm.gram([x, 1.0])
+
+
+def test_gram_falls_back_to_matrix_of_scalars(pep_context: pc.PEPContext):
+    x = vt.Vector(is_basis=True, tags=["x"])
+    y = vt.Vector(is_basis=True, tags=["y"])
+    mat = gm.gram([x, y]) - np.outer([x, y], [x, y])
+    assert isinstance(mat, np.ndarray)
+    assert mat.shape == (2, 2)
+
+    em = exm.ExpressionManager(pep_context)
+    for entry in mat.flat:
+        np.testing.assert_allclose(em.eval_scalar(entry).inner_prod_coords, 0)
+
+
+@pytest.mark.parametrize("solver_cls", [ps.CVXPrimalSolver, ps.CVXDualSolver])
+@pytest.mark.parametrize("backend", ["dense", "sparse"])
+def test_gram_psd_constraint_matches_outer(
+    pep_context: pc.PEPContext, solver_cls, backend
+):
+    A = oper.LinearOperator(is_basis=True, tags=["A"], M=1)
+    x = vt.Vector(is_basis=True, tags=["x"])
+    y = vt.Vector(is_basis=True, tags=["y"])
+    X = [x, y, x - y]
+    Y = [A(p) for p in X]
+    obj = Y[0] * Y[1] + Y[2] * Y[2]
+    bound = [(x * x).le(1, name="x"), (y * y).le(1, name="y")]
+
+    results = []
+    for lhs in [
+        gm.gram(X) - gm.gram(Y),
+        np.outer(X, X) - np.outer(Y, Y),
+    ]:
+        solver = solver_cls(
+            perf_metric=obj,
+            constraints=[*bound, ct.PSDConstraint(lhs, 0, utils.Comparator.SEQ, "A")],
+            context=pep_context,
+        )
+        results.append(solver.build_problem(backend=backend).solve())
+    assert results[0] == pytest.approx(results[1], abs=1e-4)
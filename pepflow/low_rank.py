@@ -0,0 +1,193 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import attrs
+import numpy as np
+import sympy as sp
+
+from pepflow import utils
+
+if TYPE_CHECKING:
+    import cvxpy
+
+
+@attrs.frozen
+class LowRankMatrix:
+    """
+    A symmetric matrix kept as a sum of weighted symmetric rank-1 terms.
+
+    A :class:`LowRankMatrix` with terms `[(u_1, v_1, c_1), ..., (u_k, v_k, c_k)]`
+    represents the matrix `sum_i c_i * (u_i v_i^T + v_i u_i^T) / 2`, i.e., the
+    inner product `sum_i c_i * <u_i, v_i>`. It is used by the low-rank backend
+    of :class:`ExpressionManager` as the `inner_prod_coords` of
+    :class:`EvaluatedScalar` objects so that an inner product of two vectors
+    costs O(n) instead of forming the dense n x n outer product.
+
+    The terms are only materialized by :py:func:`toarray` or contracted
+    against a Gram matrix by :py:func:`contract` when needed. Once there are
+    more terms than the size of the matrix, numeric matrices are compacted
+    into at most `size` terms through an eigendecomposition.
+
+    Attributes:
+        size (int): The number of rows (and columns) of the matrix.
+        terms (tuple): A tuple of `(u, v, coef)` triples where `u` and `v` are
+            one-dimensional `np.ndarray` objects.
+        sympy_mode (bool): If true, the entries are SymPy objects.
+            By default `False`.
+    """
+
+    size: int
+    terms: tuple[tuple[np.ndarray, np.ndarray, Any], ...] = ()
+    sympy_mode: bool = False
+
+    # Make numpy scalars defer to our reflected operators.
+    __array_ufunc__ = None
+
+    @classmethod
+    def zeros(cls, size: int, sympy_mode: bool = False) -> LowRankMatrix:
+        return cls(size=size, terms=(), sympy_mode=sympy_mode)
+
+    @classmethod
+    def sym_outer(
+        cls, v: np.ndarray, w: np.ndarray, sympy_mode: bool = False
+    ) -> LowRankMatrix:
+        """The symmetric outer product `(v w^T + w v^T) / 2` as a single term."""
+        one = sp.S(1) if sympy_mode else 1.0
+        return cls(size=len(v), terms=((v, w, one),), sympy_mode=sympy_mode)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (self.size, self.size)
+
+    @property
+    def rank_bound(self) -> int:
+        """The number of rank-1 terms, an upper bound of half the rank."""
+        return len(self.terms)
+
+    def __getitem__(self, index: tuple[int, int]):
+        i, j = index
+        half = sp.S(1) / 2 if self.sympy_mode else 1 / 2
+        val = sp.S(0) if self.sympy_mode else 0.0
+        for u, v, coef in self.terms:
+            val += coef * half * (u[i] * v[j] + v[i] * u[j])
+        return val
+
+    def toarray(self) -> np.ndarray:
+        """Return the equivalent dense `np.ndarray`."""
+        if self.sympy_mode:
+            matrix = np.zeros(self.shape) * sp.S(0)
+            for u, v, coef in self.terms:
+                matrix = matrix + coef * utils.SOP(u, v, sympy_mode=True)
+            return matrix
+        if not self.terms:
+            return np.zeros(self.shape)
+        U = np.array([u for u, _, _ in self.terms], dtype=float)
+        V = np.array([v for _, v, _ in self.terms], dtype=float)
+        coefs = np.array([coef for _, _, coef in self.terms], dtype=float)
+        matrix = (U.T * coefs) @ V
+        return (matrix + matrix.T) / 2
+
+    def contract(self, matrix: np.ndarray | cvxpy.Expression):
+        """Return `Tr(matrix @ self)` for a symmetric `matrix`.
+
+        `matrix` can be a numerical array or a cvxpy expression such as the
+        Gram matrix variable. This is `sum_i c_i * u_i^T matrix v_i`, which
+        never materializes this :class:`LowRankMatrix`.
+        """
+        if not self.terms:
+            return 0
+        U = np.array([u for u, _, _ in self.terms], dtype=float)
+        V = np.array([v for _, v, _ in self.terms], dtype=float)
+        coefs = np.array([coef for _, _, coef in self.terms], dtype=float)
+        if isinstance(matrix, np.ndarray):
+            return float(coefs @ np.sum((U @ matrix) * V, axis=1))
+        import cvxpy
+
+        return cvxpy.sum(cvxpy.multiply(U @ matrix, coefs[:, None] * V))
+
+    def _compact(self) -> LowRankMatrix:
+        """Keep at most `size` terms for numeric matrices."""
+        if self.sympy_mode or len(self.terms) <= max(self.size, 1):
+            return self
+        eigvals, eigvecs = np.linalg.eigh(self.toarray())
+        return LowRankMatrix(
+            size=self.size,
+            terms=tuple(
+                (eigvecs[:, i], eigvecs[:, i], eigvals[i])
+                for i in range(self.size)
+                if eigvals[i] != 0
+            ),
+        )
+
+    def _merge(self, other: LowRankMatrix, sign: int) -> LowRankMatrix:
+        if self.size != other.size:
+            raise ValueError(
+                f"Cannot combine LowRankMatrix of size {self.size} and {other.size}."
+            )
+        terms = other.terms
+        if sign < 0:
+            terms = tuple((u, v, -coef) for u, v, coef in terms)
+        return LowRankMatrix(
+            size=self.size,
+            terms=self.terms + terms,
+            sympy_mode=self.sympy_mode or other.sympy_mode,
+        )._compact()
+
+    def _scale(self, factor: Any) -> LowRankMatrix:
+        if factor == 0:
+            return LowRankMatrix.zeros(self.size, sympy_mode=self.sympy_mode)
+        return LowRankMatrix(
+            size=self.size,
+            terms=tuple((u, v, coef * factor) for u, v, coef in self.terms),
+            sympy_mode=self.sympy_mode,
+        )
+
+    def __add__(self, other):
+        if isinstance(other, LowRankMatrix):
+            return self._merge(other, 1)
+        return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, LowRankMatrix):
+            return self._merge(other, -1)
+        return NotImplemented
+
+    def __neg__(self):
+        return self._scale(-1)
+
+    def __mul__(self, other):
+        if utils.is_numerical(other) or utils.is_sympy_expr(other):
+            return self._scale(other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if utils.is_numerical(other) or utils.is_sympy_expr(other):
+            return LowRankMatrix(
+                size=self.size,
+                terms=tuple((u, v, coef / other) for u, v, coef in self.terms),
+                sympy_mode=self.sympy_mode,
+            )
+        return NotImplemented
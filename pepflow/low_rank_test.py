@@ -0,0 +1,64 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import numpy as np
+import sympy as sp
+
+from pepflow import low_rank as lr
+from pepflow import utils
+
+
+def test_low_rank_matrix_arithmetic():
+    u = np.array([1.0, 0.0, 2.0])
+    v = np.array([0.0, 3.0, 1.0])
+    w = np.array([1.0, 1.0, 0.0])
+
+    m = 2 * lr.LowRankMatrix.sym_outer(u, v) - lr.LowRankMatrix.sym_outer(w, w) / 4
+    expected = 2 * utils.SOP(u, v) - utils.SOP(w, w) / 4
+    assert m.rank_bound == 2
+    np.testing.assert_allclose(m.toarray(), expected)
+    np.testing.assert_allclose((-m).toarray(), -expected)
+    assert m[1, 2] == expected[1, 2]
+    assert (np.float64(0) * m).rank_bound == 0
+
+    G = np.array([[2.0, 1.0, 0.0], [1.0, 3.0, 1.0], [0.0, 1.0, 1.0]])
+    np.testing.assert_allclose(m.contract(G), np.trace(G @ expected))
+
+
+def test_low_rank_matrix_compaction():
+    rng = np.random.default_rng(0)
+    m = lr.LowRankMatrix.zeros(3)
+    expected = np.zeros((3, 3))
+    for _ in range(10):
+        u, v = rng.standard_normal(3), rng.standard_normal(3)
+        m = m + lr.LowRankMatrix.sym_outer(u, v)
+        expected += utils.SOP(u, v)
+    assert m.rank_bound <= 3
+    np.testing.assert_allclose(m.toarray(), expected)
+
+
+def test_low_rank_matrix_sympy_mode():
+    u = np.array([sp.S(1), sp.S(0)])
+    v = np.array([sp.S(1), sp.S(1)])
+    m = lr.LowRankMatrix.sym_outer(u, v, sympy_mode=True) / 3
+    np.testing.assert_equal(
+        m.toarray(),
+        np.array([[sp.S(1) / 3, sp.S(1) / 6], [sp.S(1) / 6, sp.S(0)]]),
+        strict=True,
+    )
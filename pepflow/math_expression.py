@@ -17,14 +17,154 @@
 # specific language governing permissions and limitations
 # under the License.
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 import attrs
 
+from pepflow import utils
+
+if TYPE_CHECKING:
+    from pepflow.scalar import Scalar
+    from pepflow.vector import Vector
+
 INNER_PROD_STR = "⟨{A},{B}⟩"
 
 
-@attrs.mutable
+@attrs.frozen
+class Operand:
+    """
+    A :class:`Vector` or :class:`Scalar` used inside a :class:`MathExpr` that
+    has not been rendered yet.
+
+    Attributes:
+        obj (:class:`Vector` | :class:`Scalar`): The operand.
+        parenthesize (bool): If true, the operand is wrapped in parentheses
+            when it is a sum or a difference, as in
+            :py:func:`utils.parenthesize_tag`. By default `False`.
+    """
+
+    obj: Any
+    parenthesize: bool = False
+
+
+@attrs.mutable(eq=False)
 class MathExpr:
-    expr_str: str = ""
+    """
+    The string representation of a :class:`Vector`, :class:`Scalar`,
+    :class:`Function` or :class:`Operator` object.
+
+    The string can be given directly through `expr_str`. Arithmetic on
+    :class:`Vector` and :class:`Scalar` objects instead creates lazy
+    :class:`MathExpr` objects through :py:func:`lazy`, which only keep the
+    pieces of the string and the operands. The string is rendered, without
+    recursion, and memoized the first time it is needed, e.g., by `repr`.
+    Thus, building long expressions that are never printed does not build
+    their strings.
+
+    Attributes:
+        expr_str (str): The rendered string. It can be assigned to.
+        op (:class:`Op` | `None`): The arithmetic operation that built the
+            :class:`Vector` or :class:`Scalar` object, if any. It decides the
+            parentheses around the object as an operand and is kept here
+            since a flattened `eval_expression` no longer records it.
+    """
+
+    _expr_str: str | None = attrs.field(default="", alias="expr_str")
+    _parts: tuple[str | Operand | MathExpr, ...] = attrs.field(
+        default=(), alias="parts"
+    )
+    op: utils.Op | None = None
+
+    @classmethod
+    def lazy(cls, *parts: str | Operand | MathExpr) -> MathExpr:
+        """Return the :class:`MathExpr` concatenating `parts` when rendered."""
+        return cls(expr_str=None, parts=parts)
+
+    @classmethod
+    def inner_prod(cls, left: Vector, right: Vector) -> MathExpr:
+        """The lazy version of `INNER_PROD_STR.format(A=left, B=right)`."""
+        return cls.lazy(
+            _INNER_PROD_BEGIN,
+            Operand(left),
+            _INNER_PROD_SEP,
+            Operand(right),
+            _INNER_PROD_END,
+        )
+
+    @classmethod
+    def weighted_sum(cls, terms: list[Any], weights: list[Any]) -> MathExpr:
+        """The lazy version of `w_1*t_1+w_2*t_2+...`, omitting unit weights."""
+        parts: list[str | Operand] = []
+        for i, (term, weight) in enumerate(zip(terms, weights)):
+            if i > 0:
+                parts.append("+")
+            if utils.is_numerical(weight) and weight == 1:
+                parts.append(Operand(term))
+            else:
+                parts.extend(
+                    [
+                        f"{utils.numerical_str(weight)}*",
+                        Operand(term, parenthesize=True),
+                    ]
+                )
+        return cls.lazy(*parts)
+
+    @property
+    def expr_str(self) -> str:
+        if self._expr_str is None:
+            self._expr_str = self._render()
+            self._parts = ()
+        return self._expr_str
+
+    @expr_str.setter
+    def expr_str(self, value: str) -> None:
+        self._expr_str = value
+        self._parts = ()
+
+    def _render(self) -> str:
+        pieces = []
+        stack: list = list(reversed(self._parts))
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                pieces.append(item)
+            elif isinstance(item, MathExpr):
+                if item._expr_str is not None:
+                    pieces.append(item._expr_str)
+                else:
+                    stack.extend(reversed(item._parts))
+            else:
+                stack.extend(reversed(_expand_operand(item)))
+        return "".join(pieces)
 
     def __repr__(self):
         return self.expr_str
+
+    def __eq__(self, other):
+        if not isinstance(other, MathExpr):
+            return NotImplemented
+        return self.expr_str == other.expr_str
+
+
+def _expand_operand(operand: Operand) -> list[str | MathExpr]:
+    """The pieces of `repr(operand.obj)`, parenthesized if requested."""
+    obj: Vector | Scalar = operand.obj
+    if obj.tags:
+        pieces: list[str | MathExpr] = [obj.tag]
+    elif isinstance(obj.math_expr, MathExpr):
+        pieces = [obj.math_expr]
+    else:
+        pieces = [repr(obj)]
+    if (
+        operand.parenthesize
+        and not obj.is_basis
+        and utils.arithmetic_op(obj) in (utils.Op.ADD, utils.Op.SUB)
+    ):
+        pieces = ["(", *pieces, ")"]
+    return pieces
+
+
+_INNER_PROD_BEGIN, _rest = INNER_PROD_STR.split("{A}")
+_INNER_PROD_SEP, _INNER_PROD_END = _rest.split("{B}")
@@ -22,15 +22,14 @@ from __future__ import annotations
 import itertools
 import numbers
 import sys
-import uuid
 from functools import cached_property
 from typing import TYPE_CHECKING
 
 import attrs
-import numpy as np
 import sympy as sp
 
 from pepflow import constraint as ct
+from pepflow import gram_matrix as gm
 from pepflow import math_expression as me
 from pepflow import pep_context as pc
 from pepflow import registry as reg
@@ -61,7 +60,7 @@ class Duplet:
     output: Vector
     oper: Operator
     name: str | None
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
 
     def expand(self) -> tuple[vt.Vector, vt.Vector]:
         """
@@ -150,7 +149,7 @@ class Operator:
     math_expr: MathExpr = attrs.field(factory=me.MathExpr)
 
     # Generate an automatic id
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
 
     def __attrs_post_init__(self):
         if self.is_basis:
@@ -347,11 +346,8 @@ class Operator:
             raise ValueError("The Operator can only take point as input.")
 
         if self.is_basis:
-            for duplet in pep_context.oper_to_duplets[self]:
-                if (
-                    duplet.point.uid == point.uid
-                ):  # TODO: Should come up better way to handle this
-                    return duplet
+            if (duplet := pep_context.find_duplet(point, self)) is not None:
+                return duplet
 
             output = vt.Vector(
                 is_basis=True,
@@ -650,9 +646,7 @@ class LinearOperator(Operator):
         if len(pep_context.oper_to_duplets[self]) > 0:
             X = [d.point for d in pep_context.oper_to_duplets[self]]
             Y = [d.output for d in pep_context.oper_to_duplets[self]]
-            matrix_SDP_constraint_1 = (self.M * self.M) * np.outer(X, X) - np.outer(  # ty: ignore
-                Y, Y
-            )
+            matrix_SDP_constraint_1 = (self.M * self.M) * gm.gram(X) - gm.gram(Y)
 
             cd.add_psd_constraint(
                 "Linear Operator PSD",
@@ -667,9 +661,7 @@ class LinearOperator(Operator):
         if len(pep_context.oper_to_duplets[self.T]) > 0:
             U = [d.point for d in pep_context.oper_to_duplets[self.T]]
             V = [d.output for d in pep_context.oper_to_duplets[self.T]]
-            matrix_SDP_constraint_2 = (self.M * self.M) * np.outer(U, U) - np.outer(  # ty: ignore
-                V, V
-            )
+            matrix_SDP_constraint_2 = (self.M * self.M) * gm.gram(U) - gm.gram(V)
 
             cd.add_psd_constraint(
                 "Linear Operator PSD (Transpose)",
@@ -24,6 +24,7 @@ import pytest
 
 from pepflow import constraint as ct
 from pepflow import expression_manager as exm
+from pepflow import gram_matrix as gm
 from pepflow import operator as oper
 from pepflow import pep as pep
 from pepflow import pep_context as pc
@@ -484,9 +485,7 @@ def test_linear_operator_interpolability_constraints(pep_context: pc.PEPContext)
     )
 
     if isinstance(inter_constrs[2], ct.PSDConstraint):
-        if isinstance(inter_constrs[2].lhs, np.ndarray) and isinstance(
-            inter_constrs[2].rhs, float
-        ):
+        if isinstance(inter_constrs[2].lhs, gm.GramMatrix):
             assert inter_constrs[2].rhs == 0
             assert inter_constrs[2].lhs.shape == (2, 2)
             assert (inter_constrs[2].lhs - inter_constrs[2].rhs).shape == (2, 2)  # ty: ignore
@@ -512,9 +511,7 @@ def test_linear_operator_interpolability_constraints(pep_context: pc.PEPContext)
             )
 
     if isinstance(inter_constrs[3], ct.PSDConstraint):
-        if isinstance(inter_constrs[3].lhs, np.ndarray) and isinstance(
-            inter_constrs[3].rhs, float
-        ):
+        if isinstance(inter_constrs[3].lhs, gm.GramMatrix):
             assert inter_constrs[3].rhs == 0
             assert inter_constrs[3].lhs.shape == (1, 1)
             np.testing.assert_allclose(
@@ -19,7 +19,6 @@
 
 from __future__ import annotations
 
-import uuid
 from collections import defaultdict
 from typing import Any, FrozenSet, Tuple
 
@@ -97,7 +96,7 @@ class ParameterByDictRepresentation:
     offset: int | float | sp.Number = 0
 
     # Generate an automatic id
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
 
     def __repr__(self) -> str:
         terms = []
@@ -504,11 +503,16 @@ class Parameter:
             utils.simplify_if_param_or_sympy_expr(self - other)
         )
 
-    def simplify(self) -> Parameter:
+    def simplify(self, *, full: bool = False) -> Parameter:
         """
         Flatten the `eval_expression` of a :class:`Parameter` object into a
         :class:`ParameterByDictRepresentation` consisting of generating terms and their coefficients.
 
+        Args:
+            full (bool): Whether to apply `sp.simplify` to SymPy coefficients
+                instead of the cheaper canonicalization by `sp.cancel`.
+                Defaults to `False`.
+
         Returns:
             :class:`Parameter`: A new :class:`Parameter` object whose
             `eval_expression` is flattened into a
@@ -521,9 +525,11 @@ class Parameter:
             if isinstance(parameter_or_number, Parameter):
                 # We know after simplification, the eval_expression is always
                 # ParameterByDictRepresentation
-                return parameter_or_number.simplify().eval_expression  # type: ignore
+                return parameter_or_number.simplify(full=full).eval_expression  # type: ignore
             elif isinstance(parameter_or_number, sp.Basic):
-                simplified_result = parameter_or_number.simplify()
+                simplified_result = utils.canonicalize_sympy_expr(
+                    parameter_or_number, full=full
+                )
                 assert isinstance(
                     simplified_result, utils.NUMERICAL_TYPE
                 )  # to make type checker happy
@@ -161,13 +161,17 @@ class PEPBuilder:
         self,
         context: PEPContext | None = None,
         resolve_parameters: dict[str, NUMERICAL_TYPE] | None = None,
+        backend: utils.EvalBackend | str = utils.EvalBackend.DENSE,
     ):
-        return self.solve_primal(context, resolve_parameters=resolve_parameters)
+        return self.solve_primal(
+            context, resolve_parameters=resolve_parameters, backend=backend
+        )
 
     def solve_primal(
         self,
         context: PEPContext | None = None,
         resolve_parameters: dict[str, NUMERICAL_TYPE] | None = None,
+        backend: utils.EvalBackend | str = utils.EvalBackend.DENSE,
     ):
         """
         Solve the Primal PEP associated with this :class:`PEPBuilder` object
@@ -181,6 +185,10 @@ class PEPBuilder:
             resolve_parameters (dict[str, :data:`NUMERICAL_TYPE`] | `None`): A
                 dictionary that maps the name of parameters to the numerical
                 values.
+            backend (:class:`EvalBackend`): The storage of the coordinates
+                used to build the problem. :attr:`EvalBackend.SPARSE` is
+                preferable when there are many basis vectors and scalars.
+                By default :attr:`EvalBackend.DENSE`.
 
         Returns:
             :class:`PEPResult`: A :class:`PEPResult` object that contains the
@@ -194,48 +202,58 @@ class PEPBuilder:
         if context is None:
             raise RuntimeError("Did you forget to create a context?")
 
-        all_constraints: list[Constraint] = [*self.init_conditions]
-        for f in self.ctx.func_to_triplets.keys():
-            all_constraints.extend(f.get_interpolation_constraints(context))
-
-        for op in self.ctx.oper_to_duplets.keys():
-            # Skip LinearOperator objects because they should not have interpolation conditions implemented.
-            if isinstance(op, LinearOperatorTranspose):
-                continue
-            all_constraints.extend(op.get_interpolation_constraints(context))
-
-        constraints = []
-        for c in all_constraints:
-            if not isinstance(c, ScalarConstraint) and not isinstance(c, PSDConstraint):
-                raise ValueError(
-                    "A constraint is not a ScalarConstraint or a PSDConstraint."
+        # The constraints are rebuilt by every solve. Do not keep these
+        # temporaries in the context so that repeated solves do not grow it.
+        # `context` is also made current, as the objects built here are added
+        # to the current context, which need not be `context` in this thread.
+        with context, context.ephemeral():
+            all_constraints: list[Constraint] = [*self.init_conditions]
+            for f in self.ctx.func_to_triplets.keys():
+                all_constraints.extend(f.get_interpolation_constraints(context))
+
+            for op in self.ctx.oper_to_duplets.keys():
+                # Skip LinearOperator objects because they should not have interpolation conditions implemented.
+                if isinstance(op, LinearOperatorTranspose):
+                    continue
+                all_constraints.extend(op.get_interpolation_constraints(context))
+
+            constraints = []
+            for c in all_constraints:
+                if not isinstance(c, ScalarConstraint) and not isinstance(
+                    c, PSDConstraint
+                ):
+                    raise ValueError(
+                        "A constraint is not a ScalarConstraint or a PSDConstraint."
+                    )
+                if c.name not in self.relaxed_constraints:
+                    constraints.append(c)
+            # For now, we heavily rely on CVX. We can make a wrapper class to avoid
+            # direct dependencies in the future.
+            if isinstance(self.performance_metric, sc.Scalar):
+                solver = ps.CVXPrimalSolver(
+                    perf_metric=self.performance_metric,
+                    constraints=constraints,
+                    context=context,
+                )
+                problem = solver.build_problem(
+                    resolve_parameters=resolve_parameters, backend=backend
+                )
+                result = problem.solve()
+
+                return pr.PEPResult(
+                    opt_value=result,
+                    dual_var_manager=solver.dual_var_manager,
+                    pep_type=utils.PEPType.PRIMAL,
+                    solver_status=problem.status,
+                    context=context,
                 )
-            if c.name not in self.relaxed_constraints:
-                constraints.append(c)
-        # For now, we heavily rely on CVX. We can make a wrapper class to avoid
-        # direct dependencies in the future.
-        if isinstance(self.performance_metric, sc.Scalar):
-            solver = ps.CVXPrimalSolver(
-                perf_metric=self.performance_metric,
-                constraints=constraints,
-                context=context,
-            )
-            problem = solver.build_problem(resolve_parameters=resolve_parameters)
-            result = problem.solve()
-
-            return pr.PEPResult(
-                opt_value=result,
-                dual_var_manager=solver.dual_var_manager,
-                pep_type=utils.PEPType.PRIMAL,
-                solver_status=problem.status,
-                context=context,
-            )
         raise ValueError("The performance metric has not yet been initialized.")
 
     def solve_dual(
         self,
         context: PEPContext | None = None,
         resolve_parameters: dict[str, NUMERICAL_TYPE] | None = None,
+        backend: utils.EvalBackend | str = utils.EvalBackend.DENSE,
     ):
         """
         Solve the Dual PEP associated with this :class:`PEPBuilder` object
@@ -248,6 +266,10 @@ class PEPBuilder:
                 :class:`PEPContext` object.
             resolve_parameters (dict[str, :data:`NUMERICAL_TYPE`] | `None`): A
                 dictionary that maps the name of parameters to the numerical values.
+            backend (:class:`EvalBackend`): The storage of the coordinates
+                used to build the problem. :attr:`EvalBackend.SPARSE` is
+                preferable when there are many basis vectors and scalars.
+                By default :attr:`EvalBackend.DENSE`.
 
         Returns:
             :class:`PEPResult`: A :class:`PEPResult` object that
@@ -261,67 +283,73 @@ class PEPBuilder:
         if context is None:
             raise RuntimeError("Did you forget to create a context?")
 
-        all_constraints: list[Constraint] = [*self.init_conditions]
-        for f in self.ctx.func_to_triplets.keys():
-            all_constraints.extend(f.get_interpolation_constraints(context))
-
-        for op in self.ctx.oper_to_duplets.keys():
-            # Skip LinearOperator objects because they should not have interpolation conditions implemented.
-            if isinstance(op, LinearOperatorTranspose):
-                continue
-            all_constraints.extend(op.get_interpolation_constraints(context))
-
-        # TODO: Consider a better API and interface to adding constraint for dual
-        # variable in dual problem. We can add `extra_dual_val_constraints` to add
-        # more constraints on dual var in dual PEP.
-        constraints = []
-        for c in all_constraints:
-            if not isinstance(c, ScalarConstraint) and not isinstance(c, PSDConstraint):
-                raise ValueError(
-                    "A constraint is not a ScalarConstraint or a PSDConstraint."
+        # As in `solve_primal`, the temporaries are not kept in the context.
+        with context, context.ephemeral():
+            all_constraints: list[Constraint] = [*self.init_conditions]
+            for f in self.ctx.func_to_triplets.keys():
+                all_constraints.extend(f.get_interpolation_constraints(context))
+
+            for op in self.ctx.oper_to_duplets.keys():
+                # Skip LinearOperator objects because they should not have interpolation conditions implemented.
+                if isinstance(op, LinearOperatorTranspose):
+                    continue
+                all_constraints.extend(op.get_interpolation_constraints(context))
+
+            # TODO: Consider a better API and interface to adding constraint for dual
+            # variable in dual problem. We can add `extra_dual_val_constraints` to add
+            # more constraints on dual var in dual PEP.
+            constraints = []
+            for c in all_constraints:
+                if not isinstance(c, ScalarConstraint) and not isinstance(
+                    c, PSDConstraint
+                ):
+                    raise ValueError(
+                        "A constraint is not a ScalarConstraint or a PSDConstraint."
+                    )
+                if c.name in self.relaxed_constraints:
+                    continue
+
+                if isinstance(c, ScalarConstraint):
+                    for op, val in self.dual_val_constraint[c.name]:
+                        if op in ["le", "lt", "<=", "<"]:
+                            c.dual_le(val)
+                        elif op in ["ge", "gt", ">=", ">"]:
+                            c.dual_ge(val)
+                        elif op == "eq" or op == "==":
+                            c.dual_eq(val)
+                        else:
+                            raise ValueError(f"Unknown op when construct the {c}")
+                    constraints.append(c)
+
+                if isinstance(c, PSDConstraint):
+                    for op, val in self.dual_val_constraint[c.name]:
+                        if op in ["peq", "<<"]:
+                            c.dual_peq(val)
+                        elif op in ["seq", ">>"]:
+                            c.dual_seq(val)
+                        elif op == "eq" or op == "==":
+                            c.dual_eq(val)
+                        else:
+                            raise ValueError(f"Unknown op when construct the {c}")
+                    constraints.append(c)
+
+            if isinstance(self.performance_metric, sc.Scalar):
+                dual_solver = ps.CVXDualSolver(
+                    perf_metric=self.performance_metric,
+                    constraints=constraints,
+                    context=context,
+                )
+                problem = dual_solver.build_problem(
+                    resolve_parameters=resolve_parameters, backend=backend
+                )
+                result = problem.solve()
+
+                return pr.PEPResult(
+                    opt_value=result,
+                    dual_var_manager=dual_solver.dual_var_manager,
+                    pep_type=utils.PEPType.DUAL,
+                    solver_status=problem.status,
+                    context=context,
                 )
-            if c.name in self.relaxed_constraints:
-                continue
-
-            if isinstance(c, ScalarConstraint):
-                for op, val in self.dual_val_constraint[c.name]:
-                    if op in ["le", "lt", "<=", "<"]:
-                        c.dual_le(val)
-                    elif op in ["ge", "gt", ">=", ">"]:
-                        c.dual_ge(val)
-                    elif op == "eq" or op == "==":
-                        c.dual_eq(val)
-                    else:
-                        raise ValueError(f"Unknown op when construct the {c}")
-                constraints.append(c)
-
-            if isinstance(c, PSDConstraint):
-                for op, val in self.dual_val_constraint[c.name]:
-                    if op in ["peq", "<<"]:
-                        c.dual_peq(val)
-                    elif op in ["seq", ">>"]:
-                        c.dual_seq(val)
-                    elif op == "eq" or op == "==":
-                        c.dual_eq(val)
-                    else:
-                        raise ValueError(f"Unknown op when construct the {c}")
-                constraints.append(c)
-
-        if isinstance(self.performance_metric, sc.Scalar):
-            dual_solver = ps.CVXDualSolver(
-                perf_metric=self.performance_metric,
-                constraints=constraints,
-                context=context,
-            )
-            problem = dual_solver.build_problem(resolve_parameters=resolve_parameters)
-            result = problem.solve()
-
-            return pr.PEPResult(
-                opt_value=result,
-                dual_var_manager=dual_solver.dual_var_manager,
-                pep_type=utils.PEPType.DUAL,
-                solver_status=problem.status,
-                context=context,
-            )
 
         raise ValueError("The performance metric has not yet been initialized.")
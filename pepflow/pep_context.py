@@ -19,9 +19,13 @@
 
 from __future__ import annotations
 
+import contextlib
+import contextvars
+import copy
 import warnings
 from collections import defaultdict
-from typing import TYPE_CHECKING
+from collections.abc import Callable, Hashable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any
 
 import attrs
 import natsort
@@ -31,18 +35,63 @@ from pepflow import constraint as ct
 from pepflow import utils
 
 if TYPE_CHECKING:
+    from typing_extensions import Self
+
     from pepflow.constraint import PSDConstraint, ScalarConstraint
+    from pepflow.expression_manager import ExpressionManager
     from pepflow.function import Function, Triplet
+    from pepflow.math_expression import MathExpr
     from pepflow.operator import Duplet, Operator
     from pepflow.pep_result import PEPResult
     from pepflow.scalar import Scalar
     from pepflow.vector import Vector
 
-# A global variable for storing the current context that manages objects
-# such as vectors and scalars.
-CURRENT_CONTEXT: PEPContext | None = None
+# The current context that manages objects such as vectors and scalars. A
+# ContextVar instead of a module global, so that threads and asyncio tasks can
+# build different PEPs at the same time. It has no default so that threads
+# that never set it fall back to `_DEFAULT_CONTEXT`.
+_CURRENT_CONTEXT: contextvars.ContextVar[PEPContext | None] = contextvars.ContextVar(
+    "pepflow_current_context"
+)
+# The context last set by `set_current_context` in any thread. It is current in
+# the threads and asyncio tasks that did not set their own, e.g., the worker
+# threads of Dash.
+_DEFAULT_CONTEXT: PEPContext | None = None
+# The tokens of the enclosing `with ctx:` blocks, innermost last.
+_ENTERED_TOKENS: contextvars.ContextVar[tuple[contextvars.Token, ...]] = (
+    contextvars.ContextVar("pepflow_entered_tokens", default=())
+)
 # Keep the track of all previous created contexts.
 GLOBAL_CONTEXT_DICT: dict[str, PEPContext] = {}
+# The number of shared ExpressionManagers, one per `resolve_parameters`, that
+# each PEPContext keeps.
+EXPRESSION_MANAGER_CACHE_SIZE = 16
+# The containers of a PEPContext that `PEPContext.fork` shares as a whole. The
+# first of the two contexts to change one copies it.
+_FORK_SHARED_CONTAINERS = (
+    "vectors",
+    "scalars",
+    "_basis_vectors",
+    "_basis_vector_uid_to_index",
+    "_basis_scalars",
+    "_basis_scalar_uid_to_index",
+    "tag_to_vectors_or_scalars",
+    "vector_to_triplet_or_duplet",
+    "_composite_triplets",
+    "_interned_nodes",
+)
+# The dictionaries keyed by functions and operators. There are few keys and
+# they are also read with `[]`, which inserts missing keys, so `PEPContext.fork`
+# copies them right away and only shares their values.
+_FORK_SHARED_VALUES = (
+    "func_to_triplets",
+    "func_to_stationary_triplets",
+    "oper_to_duplets",
+    "oper_to_fixed_duplets",
+    "oper_to_zero_duplets",
+    "_triplet_indexes",
+    "_duplet_indexes",
+)
 
 
 @attrs.frozen
@@ -124,30 +173,201 @@ class ConstraintData:
         return sc_df_dict
 
 
+@attrs.define
+class _PointIndex:
+    """Hash indexes of the triplets or duplets of a function or an operator by
+    the uid and by the tags of their points.
+
+    The tags are indexed when a triplet or duplet is added. Tags added to the
+    point afterwards are found by a scan and then indexed.
+    """
+
+    by_uid: dict[int, Triplet | Duplet] = attrs.field(factory=dict)
+    by_tag: dict[str, Triplet | Duplet] = attrs.field(factory=dict)
+    # The number of indexed triplets or duplets, to detect direct changes to
+    # the lists of the PEPContext.
+    size: int = 0
+
+    @classmethod
+    def build(cls, items: list[Triplet] | list[Duplet]) -> _PointIndex:
+        index = cls()
+        for item in items:
+            index.add(item)
+        return index
+
+    def add(self, item: Triplet | Duplet) -> None:
+        self.by_uid[item.point.uid] = item
+        for tag in item.point.tags:
+            self.by_tag.setdefault(tag, item)
+        self.size += 1
+
+    def copy(self) -> _PointIndex:
+        return _PointIndex(dict(self.by_uid), dict(self.by_tag), self.size)
+
+    def get_by_tag(
+        self, tag: str, items: list[Triplet] | list[Duplet]
+    ) -> Triplet | Duplet | None:
+        if (item := self.by_tag.get(tag)) is not None:
+            return item
+        for item in items:
+            if tag in item.point.tags:
+                self.by_tag[tag] = item
+                return item
+        return None
+
+
+def _copy_value(value: Any) -> Any:
+    """Copy a value of a container that is shared by forks of a PEPContext."""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, tuple):
+        # The `(triplets, duplets)` of `vector_to_triplet_or_duplet`.
+        return tuple(list(items) for items in value)
+    if isinstance(value, _PointIndex):
+        return value.copy()
+    return value
+
+
+def _empty_like(container: Any) -> Any:
+    if isinstance(container, defaultdict):
+        return defaultdict(container.default_factory)
+    return type(container)()
+
+
 def get_current_context() -> PEPContext | None:
     """
-    Return the current global :class:`PEPContext`.
+    Return the current :class:`PEPContext`.
+
+    The current :class:`PEPContext` is stored in a `contextvars.ContextVar`,
+    so each thread and each asyncio task can have its own. A thread or task
+    that did not set one uses the :class:`PEPContext` last set by
+    :py:func:`set_current_context` in any thread.
 
     Returns:
-        :class:`PEPContext`: The current global :class:`PEPContext`.
+        :class:`PEPContext`: The current :class:`PEPContext`.
     """
-    return CURRENT_CONTEXT
+    return _CURRENT_CONTEXT.get(_DEFAULT_CONTEXT)
 
 
 def set_current_context(ctx: PEPContext | None):
     """
-    Change the current global :class:`PEPContext`.
+    Change the current :class:`PEPContext` of the running thread or asyncio
+    task. It also becomes the current :class:`PEPContext` of the threads and
+    tasks that did not set their own.
 
     Args:
         ctx (:class:`PEPContext`): The :class:`PEPContext` to set as the new
-            global :class:`PEPContext`.
+            current :class:`PEPContext`.
 
     Example:
         >>> ctx = pf.PEPContext(ctx).set_as_current()
     """
-    global CURRENT_CONTEXT
+    global _DEFAULT_CONTEXT
     assert ctx is None or isinstance(ctx, PEPContext)
-    CURRENT_CONTEXT = ctx
+    _DEFAULT_CONTEXT = ctx
+    _CURRENT_CONTEXT.set(ctx)
+
+
+def _operand_types(eval_expression: Any) -> tuple:
+    """Return the types of the operands of `eval_expression`.
+
+    They are part of the hash-consing key since numbers of different types
+    compare equal, e.g., `2 == 2.0`, but do not evaluate the same with
+    `sympy_mode`.
+    """
+    return tuple(
+        tuple(type(x) for x in value) if isinstance(value, tuple) else type(value)
+        for value in attrs.astuple(eval_expression, recurse=False)
+    )
+
+
+def make_composite(cls: type, eval_expression: Any, math_expr: MathExpr):
+    """
+    Create a composite :class:`Vector` or :class:`Scalar` object in the current
+    :class:`PEPContext`.
+
+    If hash-consing is enabled in the current :class:`PEPContext`, an existing
+    object of the same class with an equal `eval_expression`, i.e., the same
+    operation on the same operands, is returned instead of a new object.
+    :class:`Vector` and :class:`Scalar` operands compare by their `uid` and
+    numerical operands by their value and type.
+
+    If eager flattening is enabled in the current :class:`PEPContext`, the
+    `eval_expression` of the new object is the flat
+    :class:`VectorByBasisRepresentation` or :class:`ScalarByBasisRepresentation`
+    obtained by combining the flat representations of the operands.
+
+    Args:
+        cls (type): Either :class:`Vector` or :class:`Scalar`.
+        eval_expression: The :class:`VectorRepresentation` or
+            :class:`ScalarRepresentation` of the new object.
+        math_expr (:class:`MathExpr`): The math expression of the new object.
+
+    Returns:
+        :class:`Vector` | :class:`Scalar`: The new or the interned object.
+    """
+    ctx = get_current_context()
+    interned = ctx._interned_nodes if ctx is not None and ctx.hash_consing else None
+    key = (cls, eval_expression, _operand_types(eval_expression))
+    if interned is not None:
+        try:
+            if (node := interned.get(key)) is not None:
+                return node
+        except TypeError:  # An unhashable operand cannot be interned.
+            interned = None
+    # Recorded before flattening, which drops it from `eval_expression`.
+    math_expr.op = eval_expression.op
+    if ctx is not None and ctx.eager_flatten:
+        eval_expression = _flatten(eval_expression)
+    node = cls(
+        is_basis=False, eval_expression=eval_expression, tags=[], math_expr=math_expr
+    )
+    if interned is not None:
+        ctx._own("_interned_nodes")
+        ctx._interned_nodes[key] = node
+    return node
+
+
+def _flatten(eval_expression: Any) -> Any:
+    """Combine the flat representations of the operands of `eval_expression`.
+
+    Returns `eval_expression` itself if an operand is not flat, e.g., it was
+    created before eager flattening was enabled.
+    """
+    if (terms := getattr(eval_expression, "terms", None)) is not None:
+        # The n-ary sums of `sum_vectors` and `sum_scalars`.
+        flats = [term._flat_representation() for term in terms]
+        if any(flat is None for flat in flats):
+            return eval_expression
+        return type(flats[0]).weighted_sum(flats, list(eval_expression.weights))
+    op, left, right = attrs.astuple(eval_expression, recurse=False)
+    operands = []
+    for operand in (left, right):
+        if hasattr(operand, "_flat_representation"):
+            operand = operand._flat_representation()
+            if operand is None:
+                return eval_expression
+        operands.append(operand)
+    return utils.apply_op(op, *operands)
+
+
+def simplified_representation(node: Vector | Scalar, full: bool = False) -> Any:
+    """Return the flat representation of `node` computed by `simplify`.
+
+    The flat representations of the visited nodes are memoized by uid in the
+    current :class:`PEPContext`, so repeated calls and sub-expressions shared
+    with earlier calls cost a dictionary lookup. Nodes are immutable, hence
+    the memo never goes stale.
+    """
+    ctx = get_current_context()
+    memo = {} if ctx is None else ctx._simplified[full]
+    utils.evaluate_dag(
+        [node],
+        children=lambda n: n._simplify_operands(),
+        compute=lambda n, results: n._simplify_node(results, full=full),
+        results=memo,
+    )
+    return memo[node.uid]
 
 
 class PEPContext:
@@ -157,6 +377,19 @@ class PEPContext:
 
     Attributes:
         name (str): The unique name of the :class:`PEPContext` object.
+        version (int): A counter incremented whenever a basis :class:`Vector`,
+            a basis :class:`Scalar`, a :class:`Triplet` or a :class:`Duplet` is
+            added, or the context is cleared.
+        hash_consing (bool): If `True`, arithmetic on :class:`Vector` and
+            :class:`Scalar` objects returns the existing object for an
+            operation already applied to the same operands instead of creating
+            a structurally identical one. By default `False`.
+        eager_flatten (bool): If `True`, arithmetic on :class:`Vector` and
+            :class:`Scalar` objects directly produces the flat
+            :class:`VectorByBasisRepresentation` and
+            :class:`ScalarByBasisRepresentation` instead of an expression tree,
+            so evaluation costs O(number of nonzero coefficients). By default
+            `False`.
 
     Note:
         If the provided name matches the name of a previously created
@@ -167,7 +400,9 @@ class PEPContext:
         >>> ctx = pf.PEPContext("ctx").set_as_current()
     """
 
-    def __init__(self, name: str):
+    def __init__(
+        self, name: str, hash_consing: bool = False, eager_flatten: bool = False
+    ):
         if name in GLOBAL_CONTEXT_DICT.keys():
             warnings.warn(
                 "The provided name was already used. The older PEPContext will be overwritten. PEPBuilders constructed with the older PEPContext should be remade."
@@ -175,6 +410,11 @@ class PEPContext:
         self.name = name
         self.vectors: list[Vector] = []
         self.scalars: list[Scalar] = []
+        # Maintained incrementally so that the basis is available in O(1).
+        self._basis_vectors: list[Vector] = []
+        self._basis_vector_uid_to_index: dict = {}
+        self._basis_scalars: list[Scalar] = []
+        self._basis_scalar_uid_to_index: dict = {}
         self.func_to_triplets: dict[Function, list[Triplet]] = defaultdict(list)
         # self.func_to_triplets will contain all stationary_triplets. They are not mutually exclusive.
         self.func_to_stationary_triplets: dict[Function, list[Triplet]] = defaultdict(
@@ -185,10 +425,53 @@ class PEPContext:
         self.oper_to_fixed_duplets: dict[Operator, list[Duplet]] = defaultdict(list)
         self.oper_to_zero_duplets: dict[Operator, list[Duplet]] = defaultdict(list)
 
+        # Hash indexes of the triplets and duplets of each function and
+        # operator by the uid and the tags of their points.
+        self._triplet_indexes: dict[Function, _PointIndex] = {}
+        self._duplet_indexes: dict[Operator, _PointIndex] = {}
+        # The natural-sort orders of `tracked_point` and the like, keyed by the
+        # method name and the function or operator. They are dropped whenever
+        # a triplet, a duplet or a tag is added.
+        self._order_cache: dict[tuple[str, Function | Operator], tuple[int, list]] = {}
+        # The triplets of non-basis functions, e.g., `f + g`, keyed by the
+        # `structural_key` of the function and the uid of the point, so that a
+        # separately built `f + g` reuses them. They are not interpolation
+        # points, so they are kept apart from `func_to_triplets`.
+        self._composite_triplets: dict[tuple[Hashable, int], Triplet] = {}
+
         self.tag_to_vectors_or_scalars: dict[str, Vector | Scalar] = {}
         self.vector_to_triplet_or_duplet: dict[
             Vector, tuple[list[Triplet], list[Duplet]]
         ] = defaultdict(lambda: ([], []))
+        # Incremented whenever a change can alter the concrete representation
+        # of the objects in this context, e.g., a new basis vector or scalar.
+        self.version = 0
+        self.hash_consing = hash_consing
+        self.eager_flatten = eager_flatten
+        # Inside `ephemeral()` scopes, non-basis objects are not registered.
+        self._ephemeral_depth = 0
+        # Inside `_deferred_registration()` scopes, no object is registered.
+        # The bulk creation APIs register the objects afterwards at once.
+        self._deferred_depth = 0
+        # Composite objects keyed by their class and `eval_expression`. Only
+        # populated when `hash_consing` is enabled.
+        self._interned_nodes: dict[tuple, Vector | Scalar] = {}
+        # The flat representations computed by `simplify`, keyed by whether
+        # `sp.simplify` was applied and then by uid.
+        self._simplified: dict[bool, dict[int, Any]] = {False: {}, True: {}}
+        # Shared ExpressionManagers keyed by the resolved parameters. They are
+        # dropped as soon as the version changes.
+        self._expression_managers = utils.MemoCache(
+            maxsize=EXPRESSION_MANAGER_CACHE_SIZE
+        )
+        self._expression_managers_version = self.version
+        # The names of the containers still shared with a fork, and the keys
+        # whose values were copied since, see `fork`.
+        self._shared: set[str] = set()
+        self._owned_keys: dict[str, set] = {}
+        # The vectors and scalars with a smaller `uid` existed at the last fork
+        # and are shared with it, see `fork`.
+        self._fork_uid: int | None = None
         GLOBAL_CONTEXT_DICT[name] = self
 
     def set_as_current(self) -> PEPContext:
@@ -204,53 +487,343 @@ class PEPContext:
         set_current_context(self)
         return self
 
+    def fork(self, name: str) -> PEPContext:
+        """
+        Return a new :class:`PEPContext` that starts with the content of this
+        :class:`PEPContext`.
+
+        The fork shares the vectors, scalars, triplets, duplets and tags of
+        this :class:`PEPContext` instead of rebuilding them. A shared container
+        is copied, shallowly, by whichever of the two contexts first changes
+        it, so the cost of a fork is proportional to the number of functions
+        and operators and the Python-level work afterwards to the changes
+        made. This is meant for exploring variants of a large algorithm,
+        e.g., a different last step, without building the common part again.
+
+        The content of a :class:`PEPContext` should only be changed through
+        its methods, e.g., :py:func:`add_triplet`, after a fork. The vectors
+        and scalars that existed at the fork are the same objects in both
+        contexts, so neither context can add a tag to them, as it would also
+        change their representation in the other one. Tag a new object
+        instead, e.g., `x.add_tag("x_1")` before the fork, or
+        `(1 * x).add_tag("x_1")` after it.
+
+        Args:
+            name (str): The name of the new :class:`PEPContext`.
+
+        Returns:
+            :class:`PEPContext`: The new :class:`PEPContext`. It is not set as
+            the current context.
+
+        Example:
+            >>> with ctx.fork("variant") as variant:
+            ...     x_next = x - 0.5 * f.grad(x)
+        """
+        fork = PEPContext(
+            name, hash_consing=self.hash_consing, eager_flatten=self.eager_flatten
+        )
+        for attr in _FORK_SHARED_CONTAINERS:
+            setattr(fork, attr, getattr(self, attr))
+        for attr in _FORK_SHARED_VALUES:
+            setattr(fork, attr, copy.copy(getattr(self, attr)))
+        # The memo of `simplify` only depends on the nodes, which are immutable.
+        fork._simplified = self._simplified
+        fork.version = self.version
+        fork._expression_managers_version = self.version
+        fork_uid = utils.next_uid()
+        for ctx in (self, fork):
+            ctx._shared = set(_FORK_SHARED_CONTAINERS)
+            ctx._owned_keys = {attr: set() for attr in _FORK_SHARED_VALUES}
+            ctx._fork_uid = fork_uid
+        return fork
+
+    def _own(self, *attrs_to_own: str) -> None:
+        """Copy the containers `attrs_to_own` if they are still shared with a
+        fork, so that they can be changed in place."""
+        for attr in attrs_to_own:
+            if attr in self._shared:
+                self._shared.remove(attr)
+                setattr(self, attr, copy.copy(getattr(self, attr)))
+                self._owned_keys[attr] = set()
+
+    def _own_value(self, attr: str, key: Any) -> Any:
+        """Return `getattr(self, attr)[key]`, copying it first if the value is
+        still shared with a fork, so that it can be changed in place."""
+        self._own(attr)
+        container = getattr(self, attr)
+        owned = self._owned_keys.get(attr)
+        if owned is not None and key not in owned:
+            owned.add(key)
+            if key in container:
+                container[key] = _copy_value(container[key])
+        return container[key]
+
+    def __enter__(self) -> Self:
+        """
+        Make this :class:`PEPContext` object the current context until the end
+        of the `with` block, after which the previous one is restored.
+
+        Unlike :py:func:`set_as_current`, the change is scoped, so worker
+        threads and asyncio tasks can each build their own
+        :class:`PEPContext`.
+
+        Example:
+            >>> with pf.PEPContext("ctx") as ctx:
+            ...     x = pf.Vector(is_basis=True, tags=["x"])
+        """
+        token = _CURRENT_CONTEXT.set(self)
+        _ENTERED_TOKENS.set((*_ENTERED_TOKENS.get(), token))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        *tokens, token = _ENTERED_TOKENS.get()
+        _ENTERED_TOKENS.set(tuple(tokens))
+        _CURRENT_CONTEXT.reset(token)
+
+    @contextlib.contextmanager
+    def ephemeral(self) -> Iterator[PEPContext]:
+        """
+        A scope in which new composite :class:`Vector` and :class:`Scalar`
+        objects are not registered in this :class:`PEPContext`.
+
+        The objects created in the scope remain usable, e.g., they can be
+        evaluated, but they are not appended to :attr:`vectors` and
+        :attr:`scalars`, so temporaries such as the interpolation constraints
+        built by each solve do not grow this :class:`PEPContext`. Basis objects
+        and tags are still registered.
+
+        Example:
+            >>> with ctx.ephemeral():
+            ...     constraints = f.get_interpolation_constraints(ctx)
+        """
+        self._ephemeral_depth += 1
+        try:
+            yield self
+        finally:
+            self._ephemeral_depth -= 1
+
+    @contextlib.contextmanager
+    def _deferred_registration(self) -> Iterator[PEPContext]:
+        """A scope in which new :class:`Vector` and :class:`Scalar` objects and
+        their tags are not registered. The caller registers them afterwards
+        through :py:func:`add_vectors`, :py:func:`add_scalars` and
+        :py:func:`add_tags_to_vectors_or_scalars`."""
+        self._deferred_depth += 1
+        try:
+            yield self
+        finally:
+            self._deferred_depth -= 1
+
     def add_vector(self, vector: Vector) -> None:
+        if self._deferred_depth or (self._ephemeral_depth and not vector.is_basis):
+            return
+        self._own("vectors")
         self.vectors.append(vector)
+        if vector.is_basis:
+            self._own("_basis_vectors", "_basis_vector_uid_to_index")
+            self._basis_vector_uid_to_index[vector.uid] = len(self._basis_vectors)
+            self._basis_vectors.append(vector)
+            self.version += 1
 
     def add_scalar(self, scalar: Scalar) -> None:
+        if self._deferred_depth or (self._ephemeral_depth and not scalar.is_basis):
+            return
+        self._own("scalars")
         self.scalars.append(scalar)
+        if scalar.is_basis:
+            self._own("_basis_scalars", "_basis_scalar_uid_to_index")
+            self._basis_scalar_uid_to_index[scalar.uid] = len(self._basis_scalars)
+            self._basis_scalars.append(scalar)
+            self.version += 1
+
+    def add_vectors(self, vectors: Sequence[Vector]) -> None:
+        """Register several :class:`Vector` objects at once. This is equivalent
+        to, but cheaper than, calling :py:func:`add_vector` for each of them."""
+        if self._ephemeral_depth:
+            vectors = [v for v in vectors if v.is_basis]
+        self._own("vectors")
+        self.vectors.extend(vectors)
+        basis = [v for v in vectors if v.is_basis]
+        if basis:
+            self._own("_basis_vectors", "_basis_vector_uid_to_index")
+            start = len(self._basis_vectors)
+            self._basis_vector_uid_to_index.update(
+                (v.uid, start + i) for i, v in enumerate(basis)
+            )
+            self._basis_vectors.extend(basis)
+            self.version += 1
+
+    def add_scalars(self, scalars: Sequence[Scalar]) -> None:
+        """Register several :class:`Scalar` objects at once. This is equivalent
+        to, but cheaper than, calling :py:func:`add_scalar` for each of them."""
+        if self._ephemeral_depth:
+            scalars = [s for s in scalars if s.is_basis]
+        self._own("scalars")
+        self.scalars.extend(scalars)
+        basis = [s for s in scalars if s.is_basis]
+        if basis:
+            self._own("_basis_scalars", "_basis_scalar_uid_to_index")
+            start = len(self._basis_scalars)
+            self._basis_scalar_uid_to_index.update(
+                (s.uid, start + i) for i, s in enumerate(basis)
+            )
+            self._basis_scalars.extend(basis)
+            self.version += 1
+
+    def get_expression_manager(
+        self, resolve_parameters: dict[str, utils.NUMERICAL_TYPE] | None = None
+    ) -> ExpressionManager:
+        """
+        Return an :class:`ExpressionManager` of this :class:`PEPContext` that is
+        shared by all evaluations with the same `resolve_parameters`.
+
+        The evaluations memoized by the returned :class:`ExpressionManager` are
+        reused across calls such as :py:func:`Vector.eval` and
+        :py:func:`Scalar.repr_by_basis`, for both values of `sympy_mode`. The
+        shared managers are discarded once :attr:`version` changes, e.g., when
+        a basis :class:`Vector` or :class:`Scalar` is added.
+
+        Args:
+            resolve_parameters (dict[str, :data:`NUMERICAL_TYPE`] | `None`): A
+                dictionary that maps the name of parameters to the numerical
+                values.
+
+        Returns:
+            :class:`ExpressionManager`: The shared :class:`ExpressionManager`.
+        """
+        from pepflow.expression_manager import ExpressionManager
+
+        if self._expression_managers_version != self.version:
+            self._expression_managers.clear()
+            self._expression_managers_version = self.version
+        key = tuple(sorted((resolve_parameters or {}).items()))
+        em = self._expression_managers.get(key)
+        if em is utils.MemoCache.MISSING:
+            em = ExpressionManager(self, resolve_parameters=resolve_parameters)
+            self._expression_managers.put(key, em)
+        return em
 
     def add_tag_to_vectors_or_scalars(
         self, tag: str, vec_or_sc: Vector | Scalar
     ) -> None:
+        if self._fork_uid is not None and vec_or_sc.uid < self._fork_uid:
+            raise ValueError(
+                f"Cannot add the tag {tag} to {vec_or_sc} in the PEPContext {self.name} since it is shared with a fork. Add the tag to a new object instead, see `PEPContext.fork`."
+            )
+        if self._deferred_depth:
+            return
         if tag in self.tag_to_vectors_or_scalars:
             warnings.warn(
                 f"The given tag {tag} was already associated with a Vector or Scalar in this PEPContext {self.name}. You can no longer access the old object by {tag}."
             )
+        self._own("tag_to_vectors_or_scalars")
         self.tag_to_vectors_or_scalars[tag] = vec_or_sc
+        self._order_cache.clear()
+
+    def add_tags_to_vectors_or_scalars(
+        self, tag_to_vec_or_sc: dict[str, Vector | Scalar]
+    ) -> None:
+        """Associate several tags at once. This is equivalent to, but cheaper
+        than, calling :py:func:`add_tag_to_vectors_or_scalars` for each tag."""
+        for tag in tag_to_vec_or_sc.keys() & self.tag_to_vectors_or_scalars.keys():
+            warnings.warn(
+                f"The given tag {tag} was already associated with a Vector or Scalar in this PEPContext {self.name}. You can no longer access the old object by {tag}."
+            )
+        self._own("tag_to_vectors_or_scalars")
+        self.tag_to_vectors_or_scalars.update(tag_to_vec_or_sc)
+        self._order_cache.clear()
+
+    def _triplet_index(self, func: Function) -> _PointIndex:
+        triplets = self.func_to_triplets.get(func, [])
+        index = None
+        if func in self._triplet_indexes:
+            index = self._own_value("_triplet_indexes", func)
+        if index is None or index.size != len(triplets):
+            # The list was changed without `add_triplet`, e.g., by popping.
+            index = self._triplet_indexes[func] = _PointIndex.build(triplets)
+        return index
+
+    def _duplet_index(self, op: Operator) -> _PointIndex:
+        duplets = self.oper_to_duplets.get(op, [])
+        index = None
+        if op in self._duplet_indexes:
+            index = self._own_value("_duplet_indexes", op)
+        if index is None or index.size != len(duplets):
+            # The list was changed without `add_duplet`, e.g., by popping.
+            index = self._duplet_indexes[op] = _PointIndex.build(duplets)
+        return index
 
     def add_triplet(self, triplet_to_add: Triplet) -> None:
-        for triplet in self.func_to_triplets[triplet_to_add.func]:
-            if (
-                triplet.point.uid == triplet_to_add.point.uid
-            ):  # TODO: Using other way instead of uid to determine if two points are the same or not
+        index = self._triplet_index(triplet_to_add.func)
+        if triplet_to_add.point.uid in index.by_uid:
+            raise ValueError(
+                f"In this PEPContext {self.name}, the function {triplet_to_add.func} already is associated with a triplet that contains the same point {triplet_to_add.point.tag}."
+            )
+        self._own_value("func_to_triplets", triplet_to_add.func).append(triplet_to_add)
+        self._own_value("vector_to_triplet_or_duplet", triplet_to_add.point)[0].append(
+            triplet_to_add
+        )
+        index.add(triplet_to_add)
+        self._order_cache.clear()
+        self.version += 1
+
+    def add_triplets(self, triplets_to_add: Sequence[Triplet]) -> None:
+        """Add several :class:`Triplet` objects at once. This is equivalent to,
+        but cheaper than, calling :py:func:`add_triplet` for each of them.
+
+        Raises:
+            ValueError: If a function would be associated with two triplets
+                with the same point. No triplet is added in this case.
+        """
+        keys = set()
+        for triplet in triplets_to_add:
+            key = (triplet.func, triplet.point.uid)
+            if key in keys or key[1] in self._triplet_index(triplet.func).by_uid:
                 raise ValueError(
-                    f"In this PEPContext {self.name}, the function {triplet_to_add.func} already is associated with a triplet that contains the same point {triplet_to_add.point.tag}."
+                    f"In this PEPContext {self.name}, the function {triplet.func} already is associated with a triplet that contains the same point {triplet.point.tag}."
                 )
-        self.func_to_triplets[triplet_to_add.func].append(triplet_to_add)
-        self.vector_to_triplet_or_duplet[triplet_to_add.point][0].append(triplet_to_add)
+            keys.add(key)
+        func_to_new_triplets: dict[Function, list[Triplet]] = defaultdict(list)
+        for triplet in triplets_to_add:
+            func_to_new_triplets[triplet.func].append(triplet)
+            self._own_value("vector_to_triplet_or_duplet", triplet.point)[0].append(
+                triplet
+            )
+        for func, triplets in func_to_new_triplets.items():
+            index = self._triplet_index(func)
+            self._own_value("func_to_triplets", func).extend(triplets)
+            for triplet in triplets:
+                index.add(triplet)
+        if triplets_to_add:
+            self._order_cache.clear()
+            self.version += 1
 
     def add_stationary_triplet(
         self, function: Function, stationary_triplet: Triplet
     ) -> None:
-        self.func_to_stationary_triplets[function].append(stationary_triplet)
+        self._own_value("func_to_stationary_triplets", function).append(
+            stationary_triplet
+        )
 
     def add_duplet(self, duplet_to_add: Duplet) -> None:
-        for duplet in self.oper_to_duplets[duplet_to_add.oper]:
-            if (
-                duplet.point.uid == duplet_to_add.point.uid
-            ):  # TODO: Using other way instead of uid to determine if two points are the same or not
-                raise ValueError(
-                    f"In this PEPContext {self.name}, the operator {duplet_to_add.oper} already is associated with a duplet that contains the same point {duplet_to_add.point.tag}."
-                )
-        self.oper_to_duplets[duplet_to_add.oper].append(duplet_to_add)
-        self.vector_to_triplet_or_duplet[duplet_to_add.point][1].append(duplet_to_add)
+        index = self._duplet_index(duplet_to_add.oper)
+        if duplet_to_add.point.uid in index.by_uid:
+            raise ValueError(
+                f"In this PEPContext {self.name}, the operator {duplet_to_add.oper} already is associated with a duplet that contains the same point {duplet_to_add.point.tag}."
+            )
+        self._own_value("oper_to_duplets", duplet_to_add.oper).append(duplet_to_add)
+        self._own_value("vector_to_triplet_or_duplet", duplet_to_add.point)[1].append(
+            duplet_to_add
+        )
+        index.add(duplet_to_add)
+        self._order_cache.clear()
+        self.version += 1
 
     def add_fixed_duplet(self, fixed_duplet: Duplet) -> None:
-        self.oper_to_fixed_duplets[fixed_duplet.oper].append(fixed_duplet)
+        self._own_value("oper_to_fixed_duplets", fixed_duplet.oper).append(fixed_duplet)
 
     def add_zero_duplet(self, zero_duplet: Duplet) -> None:
-        self.oper_to_zero_duplets[zero_duplet.oper].append(zero_duplet)
+        self._own_value("oper_to_zero_duplets", zero_duplet.oper).append(zero_duplet)
 
     # TODO: Find a better way to declare the return type while keeping type checker happy.
     def get_by_tag(self, tag: str):
@@ -270,6 +843,32 @@ class PEPContext:
             return vec_or_sc
         raise ValueError("Cannot find the vector, scalar, or function of given tag.")
 
+    def find_triplet(self, point: Vector, func: Function) -> Triplet | None:
+        """Return the triplet of `func` at `point`, or `None` if there is none."""
+        return self._triplet_index(func).by_uid.get(point.uid)
+
+    def find_composite_triplet(self, point: Vector, func: Function) -> Triplet | None:
+        """Return the cached triplet of the non-basis `func` at `point`, or
+        `None` if there is none."""
+        return self._composite_triplets.get((func.structural_key(), point.uid))
+
+    def add_composite_triplet(self, triplet: Triplet) -> None:
+        """Cache the triplet of a non-basis function so that later calls of
+        :py:func:`Function.generate_triplet` at the same point reuse it.
+
+        Inside `ephemeral()` scopes, the triplet is not cached since its
+        function value and gradient are not registered.
+        """
+        if self._ephemeral_depth:
+            return
+        self._own("_composite_triplets")
+        key = (triplet.func.structural_key(), triplet.point.uid)
+        self._composite_triplets[key] = triplet
+
+    def find_duplet(self, point: Vector, op: Operator) -> Duplet | None:
+        """Return the duplet of `op` at `point`, or `None` if there is none."""
+        return self._duplet_index(op).by_uid.get(point.uid)
+
     def get_triplet_by_point_tag(
         self, point_or_tag: Vector | str, func: Function
     ) -> Triplet:
@@ -280,18 +879,14 @@ class PEPContext:
             raise ValueError(
                 f"Cannot find the triplets associated with {func=} in the context."
             )
-        triplets = self.func_to_triplets[func]
+        index = self._triplet_index(func)
         if isinstance(point_or_tag, Vector):
-            for t in triplets:
-                if (
-                    t.point == point_or_tag
-                ):  # TODO: Find another way besides uid to determine if two points are the same or not.
-                    return t
+            triplet = index.by_uid.get(point_or_tag.uid)
         else:
-            for t in triplets:
-                if point_or_tag in t.point.tags:
-                    return t
-        raise ValueError(f"Cannot find the triplet associated with {point_or_tag}")
+            triplet = index.get_by_tag(point_or_tag, self.func_to_triplets[func])
+        if triplet is None:
+            raise ValueError(f"Cannot find the triplet associated with {point_or_tag}")
+        return triplet
 
     def get_duplet_by_point_tag(
         self, point_or_tag: Vector | str, op: Operator
@@ -303,29 +898,63 @@ class PEPContext:
             raise ValueError(
                 f"Cannot find the duplets associated with {op=} in the context."
             )
-        duplets = self.oper_to_duplets[op]
+        index = self._duplet_index(op)
         if isinstance(point_or_tag, Vector):
-            for t in duplets:
-                if (
-                    t.point == point_or_tag
-                ):  # TODO: Find another way besides uid to determine if two points are the same or not.
-                    return t
+            duplet = index.by_uid.get(point_or_tag.uid)
         else:
-            for t in duplets:
-                if point_or_tag in t.point.tags:
-                    return t
-        raise ValueError(f"Cannot find the duplet associated with {point_or_tag}")
+            duplet = index.get_by_tag(point_or_tag, self.oper_to_duplets[op])
+        if duplet is None:
+            raise ValueError(f"Cannot find the duplet associated with {point_or_tag}")
+        return duplet
 
     def clear(self) -> None:
         """Reset this :class:`PEPContext` object."""
+        # The containers shared with a fork are replaced instead of cleared.
+        for attr in self._shared:
+            setattr(self, attr, _empty_like(getattr(self, attr)))
+        self._shared.clear()
+        self._owned_keys.clear()
+        self._fork_uid = None
         self.vectors.clear()
         self.scalars.clear()
+        # New objects instead of clear() since ExpressionManagers share them.
+        self._basis_vectors = []
+        self._basis_vector_uid_to_index = {}
+        self._basis_scalars = []
+        self._basis_scalar_uid_to_index = {}
         self.func_to_triplets.clear()
         self.func_to_stationary_triplets.clear()
         self.oper_to_duplets.clear()
         self.oper_to_fixed_duplets.clear()
         self.oper_to_zero_duplets.clear()
+        self.vector_to_triplet_or_duplet.clear()
+        self._triplet_indexes.clear()
+        self._duplet_indexes.clear()
+        self._order_cache.clear()
+        self._composite_triplets.clear()
         self.tag_to_vectors_or_scalars.clear()
+        self._interned_nodes.clear()
+        # New objects instead of clear() since forks share them.
+        self._simplified = {False: {}, True: {}}
+        self.version += 1
+        self._expression_managers.clear()
+
+    def _cached_order(
+        self,
+        name: str,
+        func_or_oper: Function | Operator,
+        items: list[Triplet] | list[Duplet],
+        compute: Callable[[], list],
+    ) -> list:
+        """Return a copy of the natural-sort order `name` of `func_or_oper`,
+        computed by `compute` if it is not cached."""
+        key = (name, func_or_oper)
+        cached = self._order_cache.get(key)
+        # The length check catches lists changed without `add_triplet`.
+        if cached is None or cached[0] != len(items):
+            cached = (len(items), compute())
+            self._order_cache[key] = cached
+        return list(cached[1])
 
     def tracked_point(self, func_or_oper: Function | Operator) -> list[Vector]:
         """
@@ -349,14 +978,24 @@ class PEPContext:
         """
 
         if (triplets := self.func_to_triplets.get(func_or_oper)) is not None:
-            return natsort.natsorted(
-                [t.point for t in triplets],
-                key=lambda x: x.tag,
+            return self._cached_order(
+                "tracked_point",
+                func_or_oper,
+                triplets,
+                lambda: natsort.natsorted(
+                    [t.point for t in triplets],
+                    key=lambda x: x.tag,
+                ),
             )
         elif (duplets := self.oper_to_duplets.get(func_or_oper)) is not None:
-            return natsort.natsorted(
-                [t.point for t in duplets],
-                key=lambda x: x.tag,
+            return self._cached_order(
+                "tracked_point",
+                func_or_oper,
+                duplets,
+                lambda: natsort.natsorted(
+                    [t.point for t in duplets],
+                    key=lambda x: x.tag,
+                ),
             )
         raise ValueError(
             "The provided Function or Operator does not have any associated triplets or duplets in this context."
@@ -382,8 +1021,13 @@ class PEPContext:
             :math:`\\{\\nabla f(x_i)\\}`.
         """
         if (triplets := self.func_to_triplets.get(func)) is not None:
-            return natsort.natsorted(
-                [t.grad for t in triplets], key=lambda x: x.__repr__()
+            return self._cached_order(
+                "tracked_grad",
+                func,
+                triplets,
+                lambda: natsort.natsorted(
+                    [t.grad for t in triplets], key=lambda x: x.__repr__()
+                ),
             )
         raise ValueError(
             "The provided Function does not have any associated triplets in this context."
@@ -409,9 +1053,14 @@ class PEPContext:
             :math:`\\{f(x_i)\\}`.
         """
         if (triplets := self.func_to_triplets.get(func)) is not None:
-            return natsort.natsorted(
-                [t.func_val for t in triplets],
-                key=lambda x: x.__repr__(),
+            return self._cached_order(
+                "tracked_func_val",
+                func,
+                triplets,
+                lambda: natsort.natsorted(
+                    [t.func_val for t in triplets],
+                    key=lambda x: x.__repr__(),
+                ),
             )
         raise ValueError(
             "The provided Function does not have any associated triplets in this context."
@@ -435,8 +1084,13 @@ class PEPContext:
             :math:`\\{A(x_i)\\}`.
         """
         if (duplets := self.oper_to_duplets.get(oper)) is not None:
-            return natsort.natsorted(
-                [t.output for t in duplets], key=lambda x: x.__repr__()
+            return self._cached_order(
+                "tracked_output",
+                oper,
+                duplets,
+                lambda: natsort.natsorted(
+                    [t.output for t in duplets], key=lambda x: x.__repr__()
+                ),
             )
         raise ValueError(
             "The provided Operator does not have any associated duplets in this context."
@@ -444,9 +1098,19 @@ class PEPContext:
 
     def order_of_point(self, func_or_oper: Function | Operator) -> list[str]:
         if (triplets := self.func_to_triplets.get(func_or_oper)) is not None:
-            return natsort.natsorted([t.point.tag for t in triplets])
+            return self._cached_order(
+                "order_of_point",
+                func_or_oper,
+                triplets,
+                lambda: natsort.natsorted([t.point.tag for t in triplets]),
+            )
         elif (duplets := self.oper_to_duplets.get(func_or_oper)) is not None:
-            return natsort.natsorted([t.point.tag for t in duplets])
+            return self._cached_order(
+                "order_of_point",
+                func_or_oper,
+                duplets,
+                lambda: natsort.natsorted([t.point.tag for t in duplets]),
+            )
         raise ValueError(
             "The provided Function or Operator does not have any associated triplets or duplets in this context."
         )
@@ -480,9 +1144,7 @@ class PEPContext:
             list[:class:`Vector`]: A list of the basis :class:`Vector` objects
             managed by this :class:`PEPContext`.
         """
-        return [
-            p for p in self.vectors if p.is_basis
-        ]  # Note the order is always the same as added time
+        return list(self._basis_vectors)
 
     def basis_scalars(self) -> list[Scalar]:
         """
@@ -503,9 +1165,7 @@ class PEPContext:
             >>> f.set_stationary_point("x_star")
             >>> ctx.basis_scalars()
         """
-        return [
-            s for s in self.scalars if s.is_basis
-        ]  # Note the order is always the same as added time
+        return list(self._basis_scalars)
 
     def basis_vectors_math_exprs(self) -> list[str]:
         """
@@ -519,9 +1179,7 @@ class PEPContext:
             list[str]: A list of the tags of the basis :class:`Vector` objects
             managed by this :class:`PEPContext`.
         """
-        return [
-            p.__repr__() for p in self.vectors if p.is_basis
-        ]  # Note the order is always the same as added time
+        return [p.__repr__() for p in self._basis_vectors]
 
     def basis_scalars_math_exprs(self) -> list[str]:
         """
@@ -535,9 +1193,7 @@ class PEPContext:
             list[str]: A list of the tags of the basis :class:`Scalar` objects
             managed by this :class:`PEPContext`.
         """
-        return [
-            s.__repr__() for s in self.scalars if s.is_basis
-        ]  # Note the order is always the same as added time
+        return [s.__repr__() for s in self._basis_scalars]
 
     def __getitem__(self, tag: str):
         """Return :class:`Vector` or :class:`Scalar: object stored in this
@@ -17,16 +17,23 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import asyncio
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterator
 
+import numpy as np
 import pytest
+import sympy as sp
 
+from pepflow import pep
 from pepflow import pep_context as pc
 from pepflow import registry as reg
 from pepflow.function import ConvexFunction, SmoothConvexFunction
 from pepflow.operator import Operator
-from pepflow.scalar import Scalar
-from pepflow.vector import Vector
+from pepflow.scalar import Scalar, ScalarByBasisRepresentation
+from pepflow.vector import Vector, VectorByBasisRepresentation
 
 
 @pytest.fixture
@@ -58,6 +65,34 @@ def test_get_triplet_by_point_tag(pep_context: pc.PEPContext):
         pep_context.get_triplet_by_point_tag("x_9", f)
 
 
+def test_triplet_and_duplet_indexes(pep_context: pc.PEPContext):
+    f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
+    A = Operator(is_basis=True, tags=["A"])
+    p1 = Vector(is_basis=True, tags=["x_1"])
+    p2 = Vector(is_basis=True, tags=["x_2"])
+    t1 = f.generate_triplet(p1)
+    d1 = A.generate_duplet(p1)
+    assert pep_context.find_triplet(p1, f) is t1
+    assert pep_context.find_triplet(p2, f) is None
+    assert pep_context.find_duplet(p1, A) is d1
+    assert pep_context.find_duplet(p2, A) is None
+
+    # A tag added after the triplet is still found.
+    p1.add_tag("y_1")
+    assert pep_context.get_triplet_by_point_tag("y_1", f) is t1
+    assert pep_context.get_duplet_by_point_tag("y_1", A) is d1
+
+    # The indexes follow direct changes to the lists.
+    t2 = f.generate_triplet(p2)
+    pep_context.func_to_triplets[f].pop(-1)
+    assert pep_context.find_triplet(p2, f) is None
+    assert f.generate_triplet(p2) is not t2
+
+    pep_context.clear()
+    assert pep_context.find_triplet(p1, f) is None
+    assert len(pep_context.vector_to_triplet_or_duplet) == 0
+
+
 def test_tracked_points_func(pep_context: pc.PEPContext):
     f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
 
@@ -125,6 +160,24 @@ def test_basis_scalars(pep_context: pc.PEPContext):
     assert pep_context.basis_scalars() == [s1, s2]
 
 
+def test_basis_index_is_incremental(pep_context: pc.PEPContext):
+    p1 = Vector(is_basis=True, tags=["x1"])
+    p2 = p1 + p1
+    em = pep_context.get_expression_manager()
+    p3 = Vector(is_basis=True, tags=["x3"])
+
+    assert pep_context._basis_vector_uid_to_index == {p1.uid: 0, p3.uid: 1}
+    # The manager keeps the basis of the time it was created.
+    assert em.get_index_of_basis_vector(p1) == 0
+    with pytest.raises(KeyError):
+        em.get_index_of_basis_vector(p3)
+    np.testing.assert_allclose(em.eval_vector(p2).coords, np.array([2]))
+
+    pep_context.clear()
+    assert pep_context.basis_vectors() == []
+    assert em.get_index_of_basis_vector(p1) == 0
+
+
 def test_tracked_point_func(pep_context: pc.PEPContext):
     f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
     p1 = Vector(is_basis=True, tags=["x2"])
@@ -197,6 +250,39 @@ def test_order_of_point_func(pep_context: pc.PEPContext):
     assert pep_context.order_of_point(f) == [p2.tag, p1.tag]
 
 
+def test_tracked_orders_are_cached(
+    pep_context: pc.PEPContext, monkeypatch: pytest.MonkeyPatch
+):
+    f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
+    p10 = Vector(is_basis=True, tags=["x_10"])
+    p2 = Vector(is_basis=True, tags=["x_2"])
+    f.generate_triplet(p10)
+    f.generate_triplet(p2)
+
+    num_sorts = 0
+    natsorted = pc.natsort.natsorted
+
+    def counting_natsorted(*args, **kwargs):
+        nonlocal num_sorts
+        num_sorts += 1
+        return natsorted(*args, **kwargs)
+
+    monkeypatch.setattr(pc.natsort, "natsorted", counting_natsorted)
+    assert pep_context.tracked_point(f) == [p2, p10]
+    assert pep_context.tracked_point(f) == [p2, p10]
+    assert pep_context.order_of_point(f) == ["x_2", "x_10"]
+    assert pep_context.order_of_point(f) == ["x_2", "x_10"]
+    assert num_sorts == 2
+
+    # Adding a triplet or a tag invalidates the cached orders.
+    p1 = Vector(is_basis=True, tags=["x_1"])
+    f.generate_triplet(p1)
+    assert pep_context.tracked_point(f) == [p1, p2, p10]
+    p10.add_tag("x_0")
+    assert pep_context.tracked_point(f) == [p10, p1, p2]
+    assert num_sorts == 4
+
+
 def test_order_of_point_oper(pep_context: pc.PEPContext):
     A = Operator(
         is_basis=True,
@@ -263,3 +349,298 @@ def test_vector_to_triplet_or_duplet(pep_context: pc.PEPContext):
 
     assert pep_context.vector_to_triplet_or_duplet[p1] == ([t1], [d1])
     assert pep_context.vector_to_triplet_or_duplet[p2] == ([t2], [d2])
+
+
+def test_shared_expression_manager(pep_context: pc.PEPContext):
+    x1 = Vector(is_basis=True, tags=["x_1"])
+    x2 = Vector(is_basis=True, tags=["x_2"])
+    v = x1 + 2 * x2
+    em = pep_context.get_expression_manager()
+    assert pep_context.get_expression_manager() is em
+    assert pep_context.get_expression_manager({"a": 1}) is not em
+
+    np.testing.assert_allclose(v.eval(), np.array([1, 2]))
+    misses = em.cache.misses
+    # Repeated evaluations are served by the shared cache.
+    np.testing.assert_allclose(v.eval(), np.array([1, 2]))
+    assert em.cache.misses == misses
+    assert v.repr_by_basis() == "x_1 + 2*x_2"
+
+    # New non-basis objects do not invalidate the shared manager.
+    version = pep_context.version
+    w = v - x1
+    assert pep_context.version == version
+    assert pep_context.get_expression_manager() is em
+    np.testing.assert_allclose(w.eval(), np.array([0, 2]))
+
+    # A new basis vector changes the dimension.
+    Vector(is_basis=True, tags=["x_3"])
+    assert pep_context.version > version
+    assert pep_context.get_expression_manager() is not em
+    np.testing.assert_allclose(v.eval(), np.array([1, 2, 0]))
+
+    f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
+    version = pep_context.version
+    f.grad(x1)
+    assert pep_context.version > version
+
+    pep_context.clear()
+    assert len(pep_context._expression_managers) == 0
+
+
+def test_repr_by_basis_follows_new_tags(pep_context: pc.PEPContext):
+    x = Vector(is_basis=True, tags=["a"])
+    y = Vector(is_basis=True, tags=["y"])
+    z = x + y
+    s = z * x
+    assert z.repr_by_basis() == "a + y"
+    assert s.repr_by_basis() == "|a|^2 + ⟨a,y⟩"
+
+    em = pep_context.get_expression_manager()
+    x.add_tag("b")
+    # The evaluations stay cached but the tags are rendered again.
+    assert pep_context.get_expression_manager() is em
+    assert z.repr_by_basis() == "b + y"
+    assert s.repr_by_basis() == "|b|^2 + ⟨b,y⟩"
+
+
+def test_hash_consing(pep_context: pc.PEPContext):
+    x1 = Vector(is_basis=True, tags=["x_1"])
+    x2 = Vector(is_basis=True, tags=["x_2"])
+    # Disabled by default.
+    assert (x1 - x2) is not (x1 - x2)
+
+    ctx = pc.PEPContext("hash_consing", hash_consing=True).set_as_current()
+    x1 = Vector(is_basis=True, tags=["x_1"])
+    x2 = Vector(is_basis=True, tags=["x_2"])
+    diff = x1 - x2
+    assert (x1 - x2) is diff
+    assert (x2 - x1) is not diff
+    assert (2 * diff) is (2 * diff)
+    assert (2 * diff) is not (diff * 2)
+    assert (diff * diff) is (diff * diff)
+    assert (diff * diff + 1) is not (diff * diff + x1 * x2)
+
+    # Numbers of different types are not interchangeable in sympy_mode.
+    assert (diff * 2) is not (diff * 2.0)
+    assert (diff * sp.Rational(1, 2)) is not (diff * 0.5)
+    half = diff * 0.5
+    exact = diff * sp.Rational(1, 2)
+    assert exact.eval(sympy_mode=True)[0] == sp.Rational(1, 2)
+    assert half.eval()[0] == 0.5
+    int_scaled = (diff * diff) * 2
+    assert (diff * diff) * 2.0 is not int_scaled
+    assert int_scaled.eval(sympy_mode=True).inner_prod_coords[0, 0] == 2
+
+    f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
+    f.grad(x1)
+    f.grad(x2)
+    f.get_interpolation_constraints()
+    num_vectors, num_scalars = len(ctx.vectors), len(ctx.scalars)
+    # Regenerating the constraints reuses all the composite objects.
+    f.get_interpolation_constraints()
+    assert (len(ctx.vectors), len(ctx.scalars)) == (num_vectors, num_scalars)
+
+    ctx.clear()
+    assert len(ctx._interned_nodes) == 0
+
+
+def test_eager_flatten(pep_context: pc.PEPContext):
+    def unroll(ctx: pc.PEPContext) -> tuple[Vector, Scalar]:
+        ctx.set_as_current()
+        f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
+        x = Vector(is_basis=True, tags=["x_0"])
+        for k in range(5):
+            x = x - 0.5 * f.grad(x)
+            x.add_tag(f"x_{k + 1}")
+        return x, f(x) - f(ctx["x_0"]) + (x - ctx["x_0"]) ** 2 / 2 + 1
+
+    x_tree, s_tree = unroll(pep_context)
+    reg.REGISTERED_FUNC_AND_OPER_DICT.clear()
+    flat_ctx = pc.PEPContext("flat", eager_flatten=True)
+    x_flat, s_flat = unroll(flat_ctx)
+
+    assert isinstance(x_flat.eval_expression, VectorByBasisRepresentation)
+    assert isinstance(s_flat.eval_expression, ScalarByBasisRepresentation)
+    # The representation is still rendered from the arithmetic.
+    assert repr(s_flat) == repr(s_tree)
+    np.testing.assert_allclose(x_flat.eval(flat_ctx), x_tree.eval(pep_context))
+    eval_tree, eval_flat = s_tree.eval(pep_context), s_flat.eval(flat_ctx)
+    np.testing.assert_allclose(eval_flat.func_coords, eval_tree.func_coords)
+    np.testing.assert_allclose(
+        eval_flat.inner_prod_coords, eval_tree.inner_prod_coords, atol=1e-12
+    )
+    assert eval_flat.offset == eval_tree.offset
+
+
+def test_with_context_restores_previous(pep_context: pc.PEPContext):
+    with pc.PEPContext("outer") as outer:
+        assert pc.get_current_context() is outer
+        with pc.PEPContext("inner") as inner:
+            x = Vector(is_basis=True, tags=["x"])
+        assert pc.get_current_context() is outer
+        y = Vector(is_basis=True, tags=["y"])
+    assert pc.get_current_context() is pep_context
+    assert inner.vectors == [x]
+    assert outer.vectors == [y]
+    assert pep_context.vectors == []
+
+
+def test_contexts_in_threads_and_tasks(pep_context: pc.PEPContext):
+    num_workers = 4
+    barrier = threading.Barrier(num_workers)
+
+    def build(k: int) -> tuple[pc.PEPContext, list[Vector]]:
+        with pc.PEPContext(f"thread_{k}") as ctx:
+            f = SmoothConvexFunction(L=1, is_basis=True, tags=[f"f_{k}"])
+            x = Vector(is_basis=True, tags=["x_0"])
+            xs = [x]
+            for i in range(20):
+                if i == 0:
+                    # Make sure that the threads build their PEPs concurrently.
+                    barrier.wait()
+                x = x - 0.5 * f.grad(x)
+                xs.append(x)
+            assert pc.get_current_context() is ctx
+        return ctx, xs
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        results = list(executor.map(build, range(num_workers)))
+    for ctx, xs in results:
+        assert all(x in ctx.vectors for x in xs)
+        assert len(ctx.basis_vectors()) == 21
+    assert pc.get_current_context() is pep_context
+    assert pep_context.vectors == []
+
+    async def build_async(k: int) -> pc.PEPContext:
+        with pc.PEPContext(f"task_{k}") as ctx:
+            x = Vector(is_basis=True, tags=["x"])
+            await asyncio.sleep(0)
+            x = x + Vector(is_basis=True, tags=["y"])
+        return ctx
+
+    async def main() -> list[pc.PEPContext]:
+        return await asyncio.gather(*(build_async(k) for k in range(3)))
+
+    for ctx in asyncio.run(main()):
+        assert [repr(v) for v in ctx.vectors] == ["x", "y", "x+y"]
+
+
+def test_solve_from_thread(pep_context: pc.PEPContext):
+    f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
+    x_star = f.set_stationary_point("x_star")
+    x_0 = Vector(is_basis=True, tags=["x_0"])
+    x_1 = x_0 - f.grad(x_0)
+    builder = pep.PEPBuilder(pep_context)
+    builder.add_initial_constraint(
+        ((x_0 - x_star) ** 2).le(1, name="initial_condition")
+    )
+    builder.set_performance_metric(f(x_1) - f(x_star))
+    num_vectors, num_scalars = len(pep_context.vectors), len(pep_context.scalars)
+
+    results = {}
+
+    def solve_in_thread():
+        # The thread did not set a context, so it uses the one set last.
+        assert pc.get_current_context() is pep_context
+        results["default"] = builder.solve_primal().opt_value
+        # Another current context does not receive the temporaries.
+        with pc.PEPContext("other") as other:
+            results["primal"] = builder.solve_primal(context=pep_context).opt_value
+            results["dual"] = builder.solve_dual(context=pep_context).opt_value
+            assert pc.get_current_context() is other
+        results["other"] = other
+
+    thread = threading.Thread(target=solve_in_thread)
+    thread.start()
+    thread.join()
+
+    for key in ["default", "primal", "dual"]:
+        assert math.isclose(results[key], 1 / 6, rel_tol=1e-3)
+    assert results["other"].vectors == [] and results["other"].scalars == []
+    assert len(pep_context.vectors) == num_vectors
+    assert len(pep_context.scalars) == num_scalars
+    assert pc.get_current_context() is pep_context
+
+
+def test_fork(pep_context: pc.PEPContext):
+    f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
+    x_star = f.set_stationary_point("x_star")
+    x = Vector(is_basis=True, tags=["x_0"])
+    for k in range(2):
+        x = x - f.grad(x)
+        x.add_tag(f"x_{k + 1}")
+    num_vectors, num_scalars = len(pep_context.vectors), len(pep_context.scalars)
+
+    def solve(ctx: pc.PEPContext, x: Vector) -> float:
+        with ctx:
+            builder = pep.PEPBuilder(ctx)
+            builder.add_initial_constraint(
+                ((ctx["x_0"] - x_star) ** 2).le(1, name="initial_condition")
+            )
+            builder.set_performance_metric(f(x) - f(x_star))
+            return builder.solve_primal().opt_value
+
+    with pep_context.fork("variant") as variant:
+        assert variant.vectors is pep_context.vectors
+        y = x - f.grad(x)
+        y.add_tag("x_3")
+    with pep_context:
+        z = x - 0.5 * f.grad(x)
+        z.add_tag("x_3")
+
+    # The shared prefix is not copied into new objects.
+    assert variant.vectors[:num_vectors] == pep_context.vectors[:num_vectors]
+    triplets, variant_triplets = (
+        pep_context.func_to_triplets[f],
+        variant.func_to_triplets[f],
+    )
+    assert len(triplets) == len(variant_triplets) == 4
+    assert all(a is b for a, b in zip(triplets[:-1], variant_triplets[:-1]))
+    # Both created their own triplet at `x` after the fork.
+    assert triplets[-1] is not variant_triplets[-1]
+    assert pep_context.find_triplet(x, f) is triplets[-1]
+    assert variant.find_triplet(x, f) is variant_triplets[-1]
+    assert variant["x_3"] is y and pep_context["x_3"] is z
+    assert y not in pep_context.vectors and z not in variant.vectors
+    assert variant.find_triplet(x_star, f) is pep_context.find_triplet(x_star, f)
+    assert len(pep_context.vector_to_triplet_or_duplet[x][0]) == 1
+    assert len(variant.vector_to_triplet_or_duplet[x][0]) == 1
+    assert len(variant.scalars) > num_scalars
+    assert variant.basis_vectors()[-1] is not pep_context.basis_vectors()[-1]
+
+    assert math.isclose(solve(pep_context, x), 1 / 10, rel_tol=1e-3)
+    assert math.isclose(solve(variant, y), 1 / 14, rel_tol=1e-3)
+
+    # Clearing one of them leaves the other intact.
+    variant.clear()
+    assert pep_context["x_3"] is z
+    assert len(pep_context.vectors) > num_vectors
+
+
+def test_fork_does_not_tag_shared_objects(pep_context: pc.PEPContext):
+    f = SmoothConvexFunction(L=1, is_basis=True, tags=["f"])
+    x = Vector(is_basis=True, tags=["x_0"])
+    y = x - f.grad(x)
+    s = f(y)
+    y_repr, s_repr = repr(y), repr(s)
+
+    with pep_context.fork("variant") as variant:
+        with pytest.raises(ValueError, match="shared with a fork"):
+            y.add_tag("x_1")
+        with pytest.raises(ValueError, match="shared with a fork"):
+            s.add_tag("f_1")
+        z = (1 * y).add_tag("x_1")
+        w = (y - f.grad(y)).add_tag("x_2")
+    # Neither can the parent change what the fork sees.
+    with pytest.raises(ValueError, match="shared with a fork"):
+        y.add_tag("x_1")
+
+    assert repr(y) == y_repr and repr(s) == s_repr
+    assert y.tags == [] and s.tags == []
+    assert "x_1" not in pep_context.tag_to_vectors_or_scalars
+    assert variant["x_1"] is z and variant["x_2"] is w
+    assert repr(w) == "x_2"
+    # The objects created after the fork can be tagged in the parent.
+    v = (y - 0.5 * f.grad(y)).add_tag("x_2")
+    assert pep_context["x_2"] is v and variant["x_2"] is w
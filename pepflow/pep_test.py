@@ -52,3 +52,40 @@ def test_add_initial_constraint_twice(pep_context: pc.PEPContext) -> None:
         builder.add_initial_constraint(
             ((x - x_star) ** 2).le(1, name="initial_condition")
         )
+
+
+def test_repeated_solves_do_not_grow_context(pep_context: pc.PEPContext) -> None:
+    builder = pep.PEPBuilder(pep_context)
+
+    f = function.SmoothConvexFunction(is_basis=True, tags=["f"], L=1)
+    x = builder.add_init_point("x_0")
+    x_star = f.set_stationary_point("x_star")
+    builder.add_initial_constraint(((x - x_star) ** 2).le(1, name="initial_condition"))
+    x_1 = x - f.grad(x)
+    builder.set_performance_metric(f(x_1) - f(x_star))
+
+    result = builder.solve_primal()
+    sizes = (len(pep_context.vectors), len(pep_context.scalars))
+    for _ in range(2):
+        assert builder.solve_primal().opt_value == pytest.approx(
+            result.opt_value, abs=1e-4
+        )
+        assert builder.solve_dual().opt_value == pytest.approx(
+            result.opt_value, abs=1e-4
+        )
+    assert (len(pep_context.vectors), len(pep_context.scalars)) == sizes
+
+
+def test_ephemeral_scope(pep_context: pc.PEPContext) -> None:
+    f = function.SmoothConvexFunction(is_basis=True, tags=["f"], L=1)
+    x = f.set_stationary_point("x_star")
+    num_vectors = len(pep_context.vectors)
+    with pep_context.ephemeral():
+        y = 2 * x
+        # Basis objects are still registered.
+        z = f.grad(y)
+    assert y not in pep_context.vectors
+    assert z in pep_context.vectors
+    assert len(pep_context.vectors) == num_vectors + 1
+    assert pep_context._ephemeral_depth == 0
+    assert (2 * x) in pep_context.vectors
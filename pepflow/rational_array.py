@@ -0,0 +1,209 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from __future__ import annotations
+
+import math
+import numbers
+from fractions import Fraction
+from typing import Any
+
+import attrs
+import numpy as np
+import sympy as sp
+
+
+def to_fraction(value: Any) -> Fraction:
+    """Convert an exact rational number into a `fractions.Fraction`.
+
+    `int`, `Fraction` and SymPy rational numbers are supported. Floating
+    numbers and irrational SymPy expressions raise a `ValueError`.
+    """
+    if isinstance(value, Fraction):
+        return value
+    if isinstance(value, (numbers.Integral, np.integer)) and not isinstance(
+        value, bool
+    ):
+        return Fraction(int(value))
+    if isinstance(value, sp.Rational):
+        return Fraction(int(value.p), int(value.q))
+    raise ValueError(
+        f"Encountered {value!r} which is not an exact rational number."
+        " The rational backend only supports int, fractions.Fraction and"
+        " sympy.Rational values. For example, convert 1/2 into sympy.S(1)/2."
+    )
+
+
+def _integers(shape: tuple[int, ...]) -> np.ndarray:
+    # Object arrays of Python ints never overflow.
+    return np.zeros(shape, dtype=object)
+
+
+@attrs.frozen(eq=False)
+class RationalArray:
+    """
+    An array of exact rational numbers stored as integer numerators over a
+    common denominator.
+
+    :class:`RationalArray` objects are used by the rational backend of
+    :class:`ExpressionManager` as the `coords` of :class:`EvaluatedVector`
+    objects and as the `func_coords` and `inner_prod_coords` of
+    :class:`EvaluatedScalar` objects. Arithmetic only involves Python
+    integers, which is much faster than the SymPy object arrays of
+    `sympy_mode` while giving the same values. SymPy numbers are created only
+    by :py:func:`toarray`, e.g., when the result is printed.
+
+    Attributes:
+        numerators (np.ndarray): An object array of Python `int`.
+        denominator (int): The positive common denominator. It is kept
+            coprime with the numerators.
+    """
+
+    numerators: np.ndarray
+    denominator: int = 1
+
+    # Make numpy scalars defer to our reflected operators.
+    __array_ufunc__ = None
+
+    @classmethod
+    def zeros(cls, shape: tuple[int, ...]) -> RationalArray:
+        return cls(numerators=_integers(shape))
+
+    @classmethod
+    def from_entries(cls, shape: tuple[int, ...], entries: dict) -> RationalArray:
+        """Build the array from a dictionary mapping indices to values."""
+        fractions = {index: to_fraction(val) for index, val in entries.items()}
+        denominator = math.lcm(1, *(val.denominator for val in fractions.values()))
+        numerators = _integers(shape)
+        for index, val in fractions.items():
+            numerators[index] += val.numerator * (denominator // val.denominator)
+        return cls._normalized(numerators, denominator)
+
+    @classmethod
+    def sym_outer(cls, v: RationalArray, w: RationalArray) -> RationalArray:
+        """Symmetric outer product `(v w^T + w v^T) / 2` of two 1-D arrays."""
+        outer = np.outer(v.numerators, w.numerators)
+        return cls._normalized(outer + outer.T, 2 * v.denominator * w.denominator)
+
+    @classmethod
+    def _normalized(cls, numerators: np.ndarray, denominator: int) -> RationalArray:
+        divisor = math.gcd(denominator, *numerators.flat)
+        if divisor > 1:
+            numerators = numerators // divisor
+            denominator //= divisor
+        return cls(numerators=numerators, denominator=denominator)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.numerators.shape
+
+    @property
+    def ndim(self) -> int:
+        return self.numerators.ndim
+
+    def __len__(self) -> int:
+        return len(self.numerators)
+
+    def __getitem__(self, index):
+        numerator = self.numerators[index]
+        if isinstance(numerator, np.ndarray):
+            return RationalArray._normalized(numerator, self.denominator)
+        return Fraction(numerator, self.denominator)
+
+    def toarray(self) -> np.ndarray:
+        """Return the equivalent object array of `sympy.Rational`."""
+        array = np.empty(self.shape, dtype=object)
+        for index, numerator in np.ndenumerate(self.numerators):
+            array[index] = sp.Rational(numerator, self.denominator)
+        return array
+
+    def to_float(self) -> np.ndarray:
+        """Return the nearest floating-point `np.ndarray`."""
+        # Python's int / int is correctly rounded even for huge integers.
+        return np.array(self.numerators / self.denominator, dtype=float)
+
+    def _merge(self, other: RationalArray, sign: int) -> RationalArray:
+        if self.shape != other.shape:
+            raise ValueError(
+                f"Cannot combine RationalArray of shape {self.shape} and {other.shape}."
+            )
+        denominator = math.lcm(self.denominator, other.denominator)
+        numerators = self.numerators * (
+            denominator // self.denominator
+        ) + sign * other.numerators * (denominator // other.denominator)
+        return RationalArray._normalized(numerators, denominator)
+
+    def _shift(self, value: Any, sign: int) -> RationalArray:
+        """Return `sign * self + value`."""
+        value = to_fraction(value)
+        denominator = math.lcm(self.denominator, value.denominator)
+        numerators = sign * self.numerators * (
+            denominator // self.denominator
+        ) + value.numerator * (denominator // value.denominator)
+        return RationalArray._normalized(numerators, denominator)
+
+    def _scale(self, factor: Any) -> RationalArray:
+        factor = to_fraction(factor)
+        if factor == 0:
+            return RationalArray.zeros(self.shape)
+        # `Fraction` keeps the sign in the numerator.
+        return RationalArray._normalized(
+            self.numerators * factor.numerator,
+            self.denominator * factor.denominator,
+        )
+
+    def __add__(self, other):
+        if isinstance(other, RationalArray):
+            return self._merge(other, 1)
+        if isinstance(other, (numbers.Number, sp.Basic)):
+            return self._shift(other, 1)
+        return NotImplemented
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        if isinstance(other, RationalArray):
+            return self._merge(other, -1)
+        if isinstance(other, (numbers.Number, sp.Basic)):
+            return self._shift(-to_fraction(other), 1)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, RationalArray):
+            return other._merge(self, -1)
+        if isinstance(other, (numbers.Number, sp.Basic)):
+            return self._shift(other, -1)
+        return NotImplemented
+
+    def __neg__(self):
+        return RationalArray(numerators=-self.numerators, denominator=self.denominator)
+
+    def __mul__(self, other):
+        if isinstance(other, (numbers.Number, sp.Basic)):
+            return self._scale(other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if isinstance(other, (numbers.Number, sp.Basic)):
+            return self._scale(1 / to_fraction(other))
+        return NotImplemented
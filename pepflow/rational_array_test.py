@@ -0,0 +1,65 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from fractions import Fraction
+
+import numpy as np
+import pytest
+import sympy as sp
+
+from pepflow import rational_array as ra
+from pepflow import utils
+
+
+def test_rational_array_arithmetic():
+    x = ra.RationalArray.from_entries((4,), {1: 1})
+    y = ra.RationalArray.from_entries((4,), {3: sp.S(1) / 2})
+
+    z = 2 * x - y / 3
+    assert z.denominator == 6
+    assert z[1] == 2
+    assert z[3] == Fraction(-1, 6)
+    np.testing.assert_equal(z.toarray(), np.array([0, 2, 0, -sp.S(1) / 6]))
+    np.testing.assert_allclose(z.to_float(), np.array([0, 2, 0, -1 / 6]))
+    assert (-z)[3] == Fraction(1, 6)
+    assert (z * sp.S(-3))[1] == -6
+    # The common denominator is reduced after cancellation.
+    assert (z + y / 3).denominator == 1
+    assert (z * 0).denominator == 1
+    assert (1 - z)[0] == 1
+
+    # numpy scalars defer to the rational operators.
+    assert (np.int64(3) * x)[1] == 3
+
+    with pytest.raises(ValueError):
+        x + ra.RationalArray.zeros((3,))
+    with pytest.raises(ValueError, match="not an exact rational number"):
+        x * 0.5
+
+
+def test_rational_array_sym_outer():
+    v = ra.RationalArray.from_entries((3,), {0: 1, 2: sp.S(1) / 3})
+    w = ra.RationalArray.from_entries((3,), {1: 2})
+
+    outer = ra.RationalArray.sym_outer(v, w)
+    expected = utils.SOP(v.toarray(), w.toarray(), sympy_mode=True)
+    np.testing.assert_equal(outer.toarray(), expected)
+    assert outer[0, 1] == 1
+    assert outer[1, 2] == Fraction(1, 3)
+    assert outer[0, 0] == 0
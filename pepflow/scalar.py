@@ -19,8 +19,9 @@
 
 from __future__ import annotations
 
-import uuid
 from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from fractions import Fraction
 from typing import TYPE_CHECKING, Any
 
 import attrs
@@ -28,8 +29,11 @@ import numpy as np
 import sympy as sp
 
 from pepflow import constraint as ctr
+from pepflow import low_rank as lr
 from pepflow import math_expression as me
 from pepflow import pep_context as pc
+from pepflow import rational_array as ra
+from pepflow import sparse_array as spa
 from pepflow import utils
 
 if TYPE_CHECKING:
@@ -52,6 +56,20 @@ class ScalarRepresentation:
     right_scalar: Vector | Scalar | float
 
 
+@attrs.frozen
+class ScalarSumRepresentation:
+    """A representation of a Scalar as the flat weighted sum
+    `weights[0]*terms[0] + weights[1]*terms[1] + ...` of other Scalars."""
+
+    terms: tuple[Scalar, ...]
+    weights: tuple[Any, ...]
+
+    @property
+    def op(self) -> utils.Op:
+        # An n-ary addition, e.g., for parenthesizing math expressions.
+        return utils.Op.ADD
+
+
 @attrs.frozen
 class ScalarByBasisRepresentation:
     """A representation of a Scalar as a linear combination of basis Scalars."""
@@ -68,7 +86,7 @@ class ScalarByBasisRepresentation:
     offset: Any = 0
 
     # Generate an automatic id
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
 
     def __repr__(self) -> str:
         terms = []
@@ -96,10 +114,36 @@ class ScalarByBasisRepresentation:
                 terms.append(f"{coeff_str}*|{vec0_repr}|^2")
         return " + ".join(terms) if terms else "0"
 
-    # TODO: Support other types for `other` and add case distinction
+    @classmethod
+    def weighted_sum(
+        cls, reprs: list[ScalarByBasisRepresentation], weights: list[Any]
+    ) -> ScalarByBasisRepresentation:
+        """Return `sum_i weights[i] * reprs[i]`, accumulated in single dicts."""
+        new_func_coeffs = defaultdict(int)
+        new_inner_prod_coeffs = defaultdict(int)
+        new_offset = 0
+        for rep, weight in zip(reprs, weights):
+            for key, val in rep.func_coeffs.items():
+                new_func_coeffs[key] += val * weight
+            for key, val in rep.inner_prod_coeffs.items():
+                new_inner_prod_coeffs[key] += val * weight
+            if not (utils.is_numerical(rep.offset) and rep.offset == 0):
+                new_offset = new_offset + rep.offset * weight
+        return cls(
+            func_coeffs=new_func_coeffs,
+            inner_prod_coeffs=new_inner_prod_coeffs,
+            offset=new_offset,
+        )
+
     def __add__(
-        self, other: ScalarByBasisRepresentation
+        self, other: ScalarByBasisRepresentation | utils.NUMERICAL_TYPE | Parameter
     ) -> ScalarByBasisRepresentation:
+        if utils.is_numerical_or_parameter(other):
+            return ScalarByBasisRepresentation(
+                func_coeffs=defaultdict(int, self.func_coeffs),
+                inner_prod_coeffs=defaultdict(int, self.inner_prod_coeffs),
+                offset=self.offset + other,
+            )
         if not isinstance(other, ScalarByBasisRepresentation):
             return NotImplemented
         new_func_coeffs = defaultdict(int, self.func_coeffs)
@@ -119,14 +163,15 @@ class ScalarByBasisRepresentation:
         )
 
     def __radd__(
-        self, other: ScalarByBasisRepresentation
+        self, other: ScalarByBasisRepresentation | utils.NUMERICAL_TYPE | Parameter
     ) -> ScalarByBasisRepresentation:
         return self.__add__(other)
 
-    # TODO: Support other types for `other` and add case distinction
     def __sub__(
-        self, other: ScalarByBasisRepresentation
+        self, other: ScalarByBasisRepresentation | utils.NUMERICAL_TYPE | Parameter
     ) -> ScalarByBasisRepresentation:
+        if utils.is_numerical_or_parameter(other):
+            return self.__add__(-other)
         if not isinstance(other, ScalarByBasisRepresentation):
             return NotImplemented
         new_func_coeffs = defaultdict(int, self.func_coeffs)
@@ -145,7 +190,12 @@ class ScalarByBasisRepresentation:
             offset=new_offset,
         )
 
-    # TODO: add __rsub__
+    def __rsub__(
+        self, other: utils.NUMERICAL_TYPE | Parameter
+    ) -> ScalarByBasisRepresentation:
+        if not utils.is_numerical_or_parameter(other):
+            return NotImplemented
+        return self.__neg__().__add__(other)
 
     def __mul__(
         self, other: utils.NUMERICAL_TYPE | Parameter
@@ -284,24 +334,56 @@ class EvaluatedScalar:
     can form a new :class:`EvaluatedScalar` object: `a*u+b*v`.
 
     Attributes:
-        func_coords (np.ndarray): The vector component of the concrete
-            representation of the abstract :class:`Scalar`.
-        inner_prod_coords (np.ndarray): The matrix component of the concrete
+        func_coords (np.ndarray | :class:`SparseArray`): The vector component
+            of the concrete representation of the abstract :class:`Scalar`.
+        inner_prod_coords (np.ndarray | :class:`SparseArray` |
+            :class:`LowRankMatrix`): The matrix component of the concrete
             representation of the abstract :class:`Scalar`. An alias is
             `matrix`.
         offset (float): The constant component of the concrete
             representation of the abstract :class:`Scalar`.
+
+    Note:
+        When evaluated with the sparse backend of :class:`ExpressionManager`,
+        `func_coords` and `inner_prod_coords` are :class:`SparseArray` objects.
+        With the low-rank backend, `inner_prod_coords` is a
+        :class:`LowRankMatrix`. With the rational backend, both are
+        :class:`RationalArray` objects. Use :py:func:`to_dense` to get the
+        `np.ndarray` version.
     """
 
-    func_coords: np.ndarray
-    inner_prod_coords: np.ndarray
+    func_coords: np.ndarray | spa.SparseArray | ra.RationalArray
+    inner_prod_coords: (
+        np.ndarray | spa.SparseArray | lr.LowRankMatrix | ra.RationalArray
+    )
     offset: float
 
     @property
-    def matrix(self) -> np.ndarray:
+    def matrix(
+        self,
+    ) -> np.ndarray | spa.SparseArray | lr.LowRankMatrix | ra.RationalArray:
         """A short alias for inner_prod_coords."""
         return self.inner_prod_coords
 
+    def to_dense(self) -> EvaluatedScalar:
+        """Return the :class:`EvaluatedScalar` with dense `np.ndarray` coords."""
+        func_coords = self.func_coords
+        if isinstance(func_coords, (spa.SparseArray, ra.RationalArray)):
+            func_coords = func_coords.toarray()
+        inner_prod_coords = self.inner_prod_coords
+        if isinstance(
+            inner_prod_coords, (spa.SparseArray, lr.LowRankMatrix, ra.RationalArray)
+        ):
+            inner_prod_coords = inner_prod_coords.toarray()
+        offset = self.offset
+        if isinstance(offset, Fraction):
+            offset = sp.Rational(offset.numerator, offset.denominator)
+        return EvaluatedScalar(
+            func_coords=func_coords,
+            inner_prod_coords=inner_prod_coords,
+            offset=offset,
+        )
+
     @classmethod
     def zero(
         cls, num_basis_scalars: int, num_basis_vectors: int, sympy_mode: bool = False
@@ -456,7 +538,7 @@ class Scalar:
     math_expr: me.MathExpr = attrs.field(factory=me.MathExpr)
 
     # Generate an automatic id
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
 
     def __attrs_post_init__(self):
         if self.is_basis:
@@ -488,6 +570,41 @@ class Scalar:
             math_expr=me.MathExpr(expr_str="0"),
         )
 
+    @staticmethod
+    def make_basis(tag_pattern: str, indices: int | Iterable[int]) -> list[Scalar]:
+        """A static method that creates several basis :class:`Scalar` objects
+        at once.
+
+        The objects are registered in the current :class:`PEPContext` with a
+        single update instead of one at a time, which is faster when creating
+        many of them.
+
+        Args:
+            tag_pattern (str): The pattern of the tags. The tag of the object
+                with index `i` is `tag_pattern.format(i)`.
+            indices (int | Iterable[int]): The indices of the objects to
+                create. An `int` `K` means the indices `0, ..., K-1`.
+
+        Returns:
+            list[:class:`Scalar`]: The new basis :class:`Scalar` objects.
+
+        Example:
+            >>> import pepflow as pf
+            >>> ctx = pf.PEPContext("ctx").set_as_current()
+            >>> x_0, x_1, x_2 = pf.Scalar.make_basis("x_{}", 3)
+        """
+        pep_context = pc.get_current_context()
+        if pep_context is None:
+            raise RuntimeError("Did you forget to create a context?")
+        if isinstance(indices, int):
+            indices = range(indices)
+        tags = [tag_pattern.format(i) for i in indices]
+        with pep_context._deferred_registration():
+            scalars = [Scalar(is_basis=True, tags=[tag]) for tag in tags]
+        pep_context.add_scalars(scalars)
+        pep_context.add_tags_to_vectors_or_scalars(dict(zip(tags, scalars)))
+        return scalars
+
     @property
     def tag(self):
         """Returns the most recently added tag.
@@ -531,12 +648,11 @@ class Scalar:
         if utils.is_numerical_or_parameter(other):
             expr_other = utils.numerical_str(other)
         else:
-            expr_other = repr(other)
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.ADD, self, other),
-            tags=[],
-            math_expr=me.MathExpr(expr_str=f"{repr(self)}+{expr_other}"),
+            expr_other = me.Operand(other)
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.ADD, self, other),
+            me.MathExpr.lazy(me.Operand(self), "+", expr_other),
         )
 
     def __radd__(self, other):
@@ -545,12 +661,11 @@ class Scalar:
         if utils.is_numerical_or_parameter(other):
             expr_other = utils.numerical_str(other)
         else:
-            expr_other = repr(other)
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.ADD, other, self),
-            tags=[],
-            math_expr=me.MathExpr(expr_str=f"{expr_other}+{repr(self)}"),
+            expr_other = me.Operand(other)
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.ADD, other, self),
+            me.MathExpr.lazy(expr_other, "+", me.Operand(self)),
         )
 
     def __sub__(self, other):
@@ -559,73 +674,61 @@ class Scalar:
         if utils.is_numerical_or_parameter(other):
             expr_other = utils.numerical_str(other)
         else:
-            expr_other = utils.parenthesize_tag(other)
-        expr_self = repr(self)
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.SUB, self, other),
-            tags=[],
-            math_expr=me.MathExpr(expr_str=f"{expr_self}-{expr_other}"),
+            expr_other = me.Operand(other, parenthesize=True)
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.SUB, self, other),
+            me.MathExpr.lazy(me.Operand(self), "-", expr_other),
         )
 
     def __rsub__(self, other):
         if not is_numerical_or_scalar(other):
             return NotImplemented
-        expr_self = utils.parenthesize_tag(self)
         if utils.is_numerical_or_parameter(other):
             expr_other = utils.numerical_str(other)
         else:
-            expr_other = repr(other.math_expr)
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.SUB, other, self),
-            tags=[],
-            math_expr=me.MathExpr(expr_str=f"{expr_other}-{expr_self}"),
+            expr_other = other.math_expr
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.SUB, other, self),
+            me.MathExpr.lazy(expr_other, "-", me.Operand(self, parenthesize=True)),
         )
 
     def __mul__(self, other):
         if not utils.is_numerical_or_parameter(other):
             return NotImplemented
-        expr_self = utils.parenthesize_tag(self)
         expr_other = utils.parenthesize_repr(other)
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.MUL, self, other),
-            tags=[],
-            math_expr=me.MathExpr(expr_str=f"{expr_self}*{expr_other}"),
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.MUL, self, other),
+            me.MathExpr.lazy(me.Operand(self, parenthesize=True), f"*{expr_other}"),
         )
 
     def __rmul__(self, other):
         if not utils.is_numerical_or_parameter(other):
             return NotImplemented
-        expr_self = utils.parenthesize_tag(self)
         expr_other = utils.parenthesize_repr(other)
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.MUL, other, self),
-            tags=[],
-            math_expr=me.MathExpr(expr_str=f"{expr_other}*{expr_self}"),
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.MUL, other, self),
+            me.MathExpr.lazy(f"{expr_other}*", me.Operand(self, parenthesize=True)),
         )
 
     def __neg__(self):
-        expr_self = utils.parenthesize_tag(self)
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.MUL, -1, self),
-            tags=[],
-            math_expr=me.MathExpr(expr_str=f"-{expr_self}"),
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.MUL, -1, self),
+            me.MathExpr.lazy("-", me.Operand(self, parenthesize=True)),
         )
 
     def __truediv__(self, other):
         if not utils.is_numerical_or_parameter(other):
             return NotImplemented
-        expr_self = utils.parenthesize_tag(self)
         expr_other = f"1/{utils.parenthesize_repr(other)}"
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.DIV, self, other),
-            tags=[],
-            math_expr=me.MathExpr(expr_str=f"{expr_other}*{expr_self}"),
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.DIV, self, other),
+            me.MathExpr.lazy(f"{expr_other}*", me.Operand(self, parenthesize=True)),
         )
 
     def __hash__(self):
@@ -636,18 +739,80 @@ class Scalar:
             return NotImplemented
         return self.uid == other.uid
 
-    def simplify(self, tag: str | None = None) -> Scalar:
+    def simplify(self, tag: str | None = None, *, full: bool = False) -> Scalar:
         """
         Flatten the `eval_expression` of a :class:`Scalar` object into a
         :class:`ScalarByBasisRepresentation` consisting of basis and their coefficients.
 
+        The flattened representations are memoized per node in the current
+        :class:`PEPContext`, so simplifying a sub-expression again is free.
+
+        Args:
+            tag (str | None): A tag for the new :class:`Scalar` object.
+            full (bool): Whether to apply `sp.simplify` to SymPy coefficients
+                instead of the cheaper canonicalization by `sp.cancel`.
+                Defaults to `False`.
+
         Returns:
             :class:`Scalar`: A new :class:`Scalar` object whose `eval_expression`
             is flattened into a :class:`ScalarByBasisRepresentation`.
         """
+        # ScalarByBasisRepresentation and the original basis vector are representating the
+        # the same basis vector. However, we do not wanna introduce another basis vector in the context.
+        # So we have to keep this is_basis = False but the eval_expression should be the same.
+        is_basis = False
+        eval_expression = pc.simplified_representation(self, full=full)
+
+        return Scalar(
+            is_basis=is_basis,
+            eval_expression=eval_expression,
+            tags=[tag] if tag is not None else [],
+            math_expr=me.MathExpr(expr_str=str(eval_expression)),
+        )
+
+    def _flat_representation(self) -> ScalarByBasisRepresentation | None:
+        """Return this :class:`Scalar` as a :class:`ScalarByBasisRepresentation`
+        if it is available without walking the expression tree, else `None`."""
+        if self.is_basis:
+            return ScalarByBasisRepresentation(
+                func_coeffs=defaultdict(int, {self: 1}),
+                inner_prod_coeffs=defaultdict(int, {}),
+                offset=0,
+            )
+        if isinstance(self.eval_expression, ZeroScalar):
+            return ScalarByBasisRepresentation(
+                func_coeffs=defaultdict(int, {}),
+                inner_prod_coeffs=defaultdict(int, {}),
+                offset=0,
+            )
+        if isinstance(self.eval_expression, ScalarByBasisRepresentation):
+            return self.eval_expression
+        return None
+
+    def _simplify_operands(self) -> list[Scalar | Vector]:
+        from pepflow.vector import Vector
+
+        if isinstance(self.eval_expression, ScalarSumRepresentation):
+            return list(self.eval_expression.terms)
+        if not isinstance(self.eval_expression, ScalarRepresentation):
+            return []
+        return [
+            x
+            for x in [
+                self.eval_expression.left_scalar,
+                self.eval_expression.right_scalar,
+            ]
+            if isinstance(x, (Scalar, Vector))
+        ]
+
+    def _simplify_node(
+        self, results: dict, full: bool = False
+    ) -> ScalarByBasisRepresentation:
+        """Flatten this :class:`Scalar` given the flattened representations of
+        its operands in `results`, keyed by uid."""
         from pepflow.vector import Vector
 
-        def _simplify(
+        def _simplified(
             scalar_or_float_or_vector: Scalar
             | utils.NUMERICAL_TYPE
             | Parameter
@@ -659,67 +824,63 @@ class Scalar:
             | VectorByBasisRepresentation
         ):
             if isinstance(scalar_or_float_or_vector, (Scalar, Vector)):
-                # We know after simplification, the eval_expression is always
-                # ScalarByBasisRepresentation or VectorByBasisRepresentation.
-                return scalar_or_float_or_vector.simplify().eval_expression  # type: ignore
+                return results[scalar_or_float_or_vector.uid]
             elif utils.is_parameter(scalar_or_float_or_vector) or utils.is_sympy_expr(
                 scalar_or_float_or_vector
             ):
-                return scalar_or_float_or_vector.simplify()  # type: ignore
+                return utils.simplify_if_param_or_sympy_expr(
+                    scalar_or_float_or_vector, full=full
+                )
             else:
                 return scalar_or_float_or_vector
 
         if self.is_basis:
-            # ScalarByBasisRepresentation and the original basis vector are representating the
-            # the same basis vector. However, we do not wanna introduce another basis vector in the context.
-            # So we have to keep this is_basis = False but the eval_expression should be the same.
-            is_basis = False
             eval_expression = ScalarByBasisRepresentation(
                 func_coeffs=defaultdict(int, {self: 1}),
                 inner_prod_coeffs=defaultdict(int, {}),
                 offset=0,
             )
+        elif isinstance(self.eval_expression, ZeroScalar):
+            eval_expression = ScalarByBasisRepresentation(
+                func_coeffs=defaultdict(int, {}),
+                inner_prod_coeffs=defaultdict(int, {}),
+                offset=0,
+            )
+        elif isinstance(self.eval_expression, ScalarByBasisRepresentation):
+            eval_expression = self.eval_expression
+        elif isinstance(self.eval_expression, ScalarSumRepresentation):
+            eval_expression = ScalarByBasisRepresentation.weighted_sum(
+                [results[term.uid] for term in self.eval_expression.terms],
+                [_simplified(weight) for weight in self.eval_expression.weights],
+            )
         else:
-            is_basis = False
-            if isinstance(self.eval_expression, ZeroScalar):
-                eval_expression = ScalarByBasisRepresentation(
-                    func_coeffs=defaultdict(int, {}),
-                    inner_prod_coeffs=defaultdict(int, {}),
-                    offset=0,
-                )
-            elif isinstance(self.eval_expression, ScalarByBasisRepresentation):
-                eval_expression = self.eval_expression
+            assert isinstance(
+                self.eval_expression, ScalarRepresentation
+            )  # to make type checker happy
+            left_eval_exression = _simplified(self.eval_expression.left_scalar)
+            right_eval_exression = _simplified(self.eval_expression.right_scalar)
+            if self.eval_expression.op == utils.Op.ADD:
+                eval_expression = left_eval_exression + right_eval_exression
+            elif self.eval_expression.op == utils.Op.SUB:
+                eval_expression = left_eval_exression - right_eval_exression
+            elif self.eval_expression.op == utils.Op.MUL:
+                eval_expression = left_eval_exression * right_eval_exression
+            elif self.eval_expression.op == utils.Op.DIV:
+                eval_expression = left_eval_exression / right_eval_exression
             else:
-                assert isinstance(
-                    self.eval_expression, ScalarRepresentation
-                )  # to make type checker happy
-                left_eval_exression = _simplify(self.eval_expression.left_scalar)
-                right_eval_exression = _simplify(self.eval_expression.right_scalar)
-                if self.eval_expression.op == utils.Op.ADD:
-                    eval_expression = left_eval_exression + right_eval_exression
-                elif self.eval_expression.op == utils.Op.SUB:
-                    eval_expression = left_eval_exression - right_eval_exression
-                elif self.eval_expression.op == utils.Op.MUL:
-                    eval_expression = left_eval_exression * right_eval_exression
-                elif self.eval_expression.op == utils.Op.DIV:
-                    eval_expression = left_eval_exression / right_eval_exression
-                else:
-                    raise NotImplementedError(
-                        "Only add,sub,mul,div are supported for Vector simplification."
-                    )
+                raise NotImplementedError(
+                    "Only add,sub,mul,div are supported for Vector simplification."
+                )
 
         # coefficient simplification
-        eval_expression = ScalarByBasisRepresentation(
-            func_coeffs=utils.simplify_dict(eval_expression.func_coeffs),
-            inner_prod_coeffs=utils.simplify_dict(eval_expression.inner_prod_coeffs),
-            offset=utils.simplify_if_param_or_sympy_expr(eval_expression.offset),
-        )
-
-        return Scalar(
-            is_basis=is_basis,
-            eval_expression=eval_expression,
-            tags=[tag] if tag is not None else [],
-            math_expr=me.MathExpr(expr_str=str(eval_expression)),
+        return ScalarByBasisRepresentation(
+            func_coeffs=utils.simplify_dict(eval_expression.func_coeffs, full=full),
+            inner_prod_coeffs=utils.simplify_dict(
+                eval_expression.inner_prod_coeffs, full=full
+            ),
+            offset=utils.simplify_if_param_or_sympy_expr(
+                eval_expression.offset, full=full
+            ),
         )
 
     def le(self, other: Scalar | float | int, name: str) -> ctr.ScalarConstraint:
@@ -830,14 +991,11 @@ class Scalar:
             :class:`EvaluatedScalar`: The concrete representation of
             this :class:`Scalar`.
         """
-        from pepflow.expression_manager import ExpressionManager
-
-        # Note this can be inefficient.
         if ctx is None:
             ctx = pc.get_current_context()
         if ctx is None:
             raise RuntimeError("Did you forget to create a context?")
-        em = ExpressionManager(ctx, resolve_parameters=resolve_parameters)
+        em = ctx.get_expression_manager(resolve_parameters)
         return em.eval_scalar(self, sympy_mode=sympy_mode)
 
     def repr_by_basis(
@@ -890,14 +1048,56 @@ class Scalar:
             >>> term_str = term.repr_by_basis(ctx, sympy_mode=True)
             >>> pf.pprint_str(term_str)
         """
-        from pepflow.expression_manager import ExpressionManager
-
-        # Note this can be inefficient.
         if ctx is None:
             ctx = pc.get_current_context()
         if ctx is None:
             raise RuntimeError("Did you forget to create a context?")
-        em = ExpressionManager(ctx, resolve_parameters=resolve_parameters)
+        em = ctx.get_expression_manager(resolve_parameters)
         return em.repr_scalar_by_basis(
             self, greedy_square=greedy_square, sympy_mode=sympy_mode
         )
+
+
+def sum_scalars(
+    terms: Sequence[Scalar],
+    weights: Sequence[utils.NUMERICAL_TYPE | Parameter] | np.ndarray | None = None,
+) -> Scalar:
+    """Return the weighted sum `weights[0]*terms[0] + weights[1]*terms[1] + ...`
+    as a single :class:`Scalar` object.
+
+    Unlike chaining `+`, which creates a left-deep tree with one
+    :class:`Scalar` object per term, the sum is a single node whose
+    concrete representation is one weighted reduction over the stacked
+    coordinates of the terms. This is useful, e.g., to combine many
+    interpolation inequalities in a proof.
+
+    Args:
+        terms (Sequence[:class:`Scalar`]): The scalars to sum.
+        weights (Sequence[:data:`NUMERICAL_TYPE` | :class:`Parameter`] | None):
+            The weights of the terms. By default all the weights are `1`.
+
+    Returns:
+        :class:`Scalar`: The weighted sum.
+
+    Example:
+        >>> import pepflow as pf
+        >>> ctx = pf.PEPContext("ctx").set_as_current()
+        >>> fs = pf.Scalar.make_basis("f_{}", 100)
+        >>> total = pf.sum_scalars(fs, [0.5] * 100)
+    """
+    terms = tuple(terms)
+    weights = (1,) * len(terms) if weights is None else tuple(weights)
+    if len(weights) != len(terms):
+        raise ValueError(f"Expected {len(terms)} weights but got {len(weights)}.")
+    if not all(isinstance(term, Scalar) for term in terms):
+        raise ValueError("sum_scalars can only sum Scalar objects.")
+    weights = tuple(w.item() if isinstance(w, np.generic) else w for w in weights)
+    if not all(utils.is_numerical_or_parameter(w) for w in weights):
+        raise ValueError("The weights should be numbers or Parameter objects.")
+    if not terms:
+        return Scalar.zero()
+    return pc.make_composite(
+        Scalar,
+        ScalarSumRepresentation(terms=terms, weights=weights),
+        me.MathExpr.weighted_sum(list(terms), list(weights)),
+    )
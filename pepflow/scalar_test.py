@@ -18,6 +18,7 @@
 # under the License.
 
 import collections
+import sys
 from collections import defaultdict
 from typing import Iterator
 
@@ -285,6 +286,27 @@ def test_simplify_scalar_basic(pep_context):
     )
 
 
+def test_simplify_scalar_deep_expression(pep_context):
+    s1 = scalar.Scalar(is_basis=True, tags=["s1"])
+    p1 = vector.Vector(is_basis=True, tags=["p1"])
+    depth = 3 * sys.getrecursionlimit()
+
+    x = p1
+    s = s1
+    for _ in range(depth):
+        x = x + p1
+        s = s - 2 * s1
+    s = s + x * p1
+
+    assert s.simplify().eval_expression.equiv(
+        scalar.ScalarByBasisRepresentation(
+            func_coeffs=defaultdict(int, {s1: 1 - 2 * depth}),
+            inner_prod_coeffs=defaultdict(int, {(p1, p1): depth + 1}),
+            offset=0,
+        )
+    )
+
+
 def test_simplify_scalar_with_param(pep_context):
     s1 = scalar.Scalar(is_basis=True, tags=["s1"])
     s2 = scalar.Scalar(is_basis=True, tags=["s2"])
@@ -314,3 +336,81 @@ def test_simplify_scalar_with_param(pep_context):
             offset=0,
         )
     )
+
+
+def test_simplify_scalar_is_memoized(pep_context, monkeypatch):
+    s1 = scalar.Scalar(is_basis=True, tags=["s1"])
+    p1 = vector.Vector(is_basis=True, tags=["p1"])
+    shared = 2 * (s1 + p1 * p1) - s1
+    s = shared + 3 * shared
+    expected = s.simplify().eval_expression
+
+    calls = collections.Counter()
+    for cls in [scalar.Scalar, vector.Vector]:
+        simplify_node = cls._simplify_node
+
+        def counted(self, results, full=False, simplify_node=simplify_node):
+            calls[self.uid] += 1
+            return simplify_node(self, results, full=full)
+
+        monkeypatch.setattr(cls, "_simplify_node", counted)
+
+    assert s.simplify().eval_expression.equiv(expected)
+    assert sum(calls.values()) == 0
+
+    # Only the new root is flattened; the shared sub-expressions are reused.
+    t = shared - s
+    t.simplify()
+    assert calls == {t.uid: 1}
+
+
+def test_simplify_scalar_sympy_tiers(pep_context):
+    s1 = scalar.Scalar(is_basis=True, tags=["s1"])
+    s2 = scalar.Scalar(is_basis=True, tags=["s2"])
+    s3 = scalar.Scalar(is_basis=True, tags=["s3"])
+    trig = sp.sin(1) ** 2 + sp.cos(1) ** 2
+    s = (
+        sp.Rational(1, 3) * s1
+        + (sp.sqrt(2) * (sp.sqrt(2) + 1) - sp.sqrt(2)) * s2
+        + trig * s3
+    )
+
+    # Exact numbers are kept and `sp.cancel` exposes the rational identities.
+    func_coeffs = s.simplify().eval_expression.func_coeffs
+    assert func_coeffs[s1] == sp.Rational(1, 3)
+    assert func_coeffs[s2] == 2
+    assert func_coeffs[s3] == sp.cancel(trig)
+    assert func_coeffs[s3] != 1
+
+    # `sp.simplify` is only applied when asked for.
+    func_coeffs = s.simplify(full=True).eval_expression.func_coeffs
+    assert func_coeffs[s3] == 1
+
+
+@pytest.mark.parametrize("backend", ["dense", "sparse", "low_rank"])
+def test_sum_scalars(pep_context: pc.PEPContext, backend):
+    xs = vector.Vector.make_basis("x_{}", 3)
+    fs = scalar.Scalar.make_basis("f_{}", 3)
+    h = parameter.Parameter("h")
+    terms = [fs[0], xs[0] * xs[1], fs[2] + 1, xs[2] ** 2]
+    weights = [2, h, -0.5, np.float64(0.25)]
+
+    num_scalars = len(pep_context.scalars)
+    total = scalar.sum_scalars(terms, weights)
+    assert len(pep_context.scalars) == num_scalars + 1
+    assert repr(total) == "2*f_0+h*⟨x_0,x_1⟩+-0.5*(f_2+1)+0.25*|x_2|^2"
+
+    expected = 2 * fs[0] + h * (xs[0] * xs[1]) - 0.5 * (fs[2] + 1) + 0.25 * xs[2] ** 2
+    em = exm.ExpressionManager(pep_context, {"h": 3.0}, backend=backend)
+    if backend == "dense":
+        em.compile()
+    actual = em.eval_scalar(total).to_dense()
+    desired = em.eval_scalar(expected).to_dense()
+    np.testing.assert_allclose(actual.func_coords, desired.func_coords)
+    np.testing.assert_allclose(actual.inner_prod_coords, desired.inner_prod_coords)
+    assert actual.offset == pytest.approx(desired.offset)
+
+    simplified = total.simplify().eval_expression
+    assert float(simplified.offset) == -0.5
+    assert simplified.func_coeffs[fs[0]] == 2
+    assert scalar.sum_scalars([]).eval().offset == 0
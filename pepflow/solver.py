@@ -18,6 +18,7 @@
 # under the License.
 
 import warnings
+from fractions import Fraction
 
 import cvxpy
 import numpy as np
@@ -25,8 +26,12 @@ import numpy as np
 from pepflow import constants
 from pepflow import constraint as ctr
 from pepflow import expression_manager as exm
+from pepflow import gram_matrix as gm
+from pepflow import low_rank as lr
 from pepflow import pep_context as pc
+from pepflow import rational_array as ra
 from pepflow import scalar as sc
+from pepflow import sparse_array as spa
 from pepflow import utils
 
 warnings.filterwarnings(
@@ -36,6 +41,27 @@ warnings.filterwarnings(
 )
 
 
+def to_cvx_constant(
+    coords: np.ndarray | spa.SparseArray | lr.LowRankMatrix | ra.RationalArray,
+):
+    """Convert the coordinates into a constant cvxpy can consume.
+
+    One-dimensional :class:`SparseArray` objects are densified as they are
+    short. Two-dimensional ones are converted into `scipy.sparse` matrices.
+    :class:`LowRankMatrix` objects are materialized. :class:`RationalArray`
+    objects are rounded to floating-point arrays.
+    """
+    if isinstance(coords, lr.LowRankMatrix):
+        return coords.toarray()
+    if isinstance(coords, ra.RationalArray):
+        return coords.to_float()
+    if isinstance(coords, spa.SparseArray):
+        if coords.ndim == 1:
+            return coords.toarray().astype(float)
+        return coords.to_scipy()
+    return coords
+
+
 def evaled_scalar_to_cvx_express(
     eval_scalar: sc.EvaluatedScalar,
     vec_var: cvxpy.Variable | np.ndarray,
@@ -46,9 +72,29 @@ def evaled_scalar_to_cvx_express(
     # Exception handling for the case where inner_prod_coords is zero-dimensional
     if isinstance(matrix_var, np.ndarray):
         cvx_inner = 0
+    elif isinstance(eval_scalar.inner_prod_coords, lr.LowRankMatrix):
+        # Contract the rank-1 terms against G without forming the matrix.
+        cvx_inner = eval_scalar.inner_prod_coords.contract(matrix_var)
+    elif isinstance(eval_scalar.inner_prod_coords, spa.SparseArray):
+        # Tr(G M) = sum(G .* M) for symmetric M, which only touches the
+        # nonzero entries of M instead of forming the dense product.
+        if eval_scalar.inner_prod_coords.nnz == 0:
+            cvx_inner = 0
+        else:
+            cvx_inner = cvxpy.sum(
+                cvxpy.multiply(
+                    matrix_var, to_cvx_constant(eval_scalar.inner_prod_coords)
+                )
+            )
     else:
-        cvx_inner = cvxpy.trace(matrix_var @ eval_scalar.inner_prod_coords)
-    return vec_var @ eval_scalar.func_coords + cvx_inner + eval_scalar.offset
+        cvx_inner = cvxpy.trace(
+            matrix_var @ to_cvx_constant(eval_scalar.inner_prod_coords)
+        )
+    func_coords = to_cvx_constant(eval_scalar.func_coords)
+    offset = eval_scalar.offset
+    if isinstance(offset, Fraction):
+        offset = float(offset)
+    return vec_var @ func_coords + cvx_inner + offset
 
 
 class PrimalPEPDualVarManager:
@@ -170,11 +216,18 @@ class CVXPrimalSolver:
         self.constraints = constraints
         self.dual_var_manager = PrimalPEPDualVarManager([])
         self.context = context
+        # The number of vectors and scalars of the context that the last built
+        # problem did not need to evaluate.
+        self.num_skipped_nodes = 0
 
     def build_problem(
-        self, resolve_parameters: dict[str, utils.NUMERICAL_TYPE] | None = None
+        self,
+        resolve_parameters: dict[str, utils.NUMERICAL_TYPE] | None = None,
+        backend: utils.EvalBackend | str = utils.EvalBackend.DENSE,
     ) -> cvxpy.Problem:
-        em = exm.ExpressionManager(self.context, resolve_parameters=resolve_parameters)
+        em = exm.ExpressionManager(
+            self.context, resolve_parameters=resolve_parameters, backend=backend
+        )
         if em._num_basis_scalars == 0:
             f_var = np.zeros(0)
         else:
@@ -186,20 +239,32 @@ class CVXPrimalSolver:
                 (em._num_basis_vectors, em._num_basis_vectors), symmetric=True
             )
 
-        # Evaluate all points and scalars in advance to store it in cache.
-        for vector in self.context.vectors:
-            em.eval_vector(vector)
-        for scalar in self.context.scalars:
-            em.eval_scalar(scalar)
+        # Only the sub-DAG reachable from the performance metric, the
+        # constraints and the entries of the PSD constraints is evaluated.
+        differences = [c.lhs - c.rhs for c in self.constraints]
+        roots = [self.perf_metric]
+        for diff in differences:
+            if isinstance(diff, gm.GramMatrix):
+                roots.extend(diff.vectors())
+                continue
+            entries = diff.flat if isinstance(diff, np.ndarray) else [diff]
+            roots.extend(x for x in entries if isinstance(x, sc.Scalar))
+        reachable = {node.uid for node in exm.topological_order(roots)}
+        self.num_skipped_nodes = sum(
+            node.uid not in reachable
+            for node in [*self.context.vectors, *self.context.scalars]
+        )
+        # The dense backend evaluates them in one batched pass; the other ones
+        # evaluate on demand.
+        if em.backend == utils.EvalBackend.DENSE:
+            em.compile(roots=roots)
 
         self.dual_var_manager.clear()
         if em._num_basis_vectors > 0:
             self.dual_var_manager.add_constraint(constants.PSD_CONSTRAINT, g_var >> 0)
-        for c in self.constraints:
+        for c, diff in zip(self.constraints, differences):
             if isinstance(c, ctr.ScalarConstraint):
-                exp = evaled_scalar_to_cvx_express(
-                    em.eval_scalar(c.lhs - c.rhs), f_var, g_var
-                )
+                exp = evaled_scalar_to_cvx_express(em.eval_scalar(diff), f_var, g_var)
                 if c.cmp == utils.Comparator.GE:
                     self.dual_var_manager.add_constraint(c.name, exp >= 0)
                 elif c.cmp == utils.Comparator.LE:
@@ -209,29 +274,32 @@ class CVXPrimalSolver:
                 else:
                     raise ValueError(f"Unknown comparator {c.cmp}")
             if isinstance(c, ctr.PSDConstraint):
-                mat_of_scalars = c.lhs - c.rhs
-                mat_of_cvx_constrs = np.empty(
-                    mat_of_scalars.shape,  # ty: ignore
-                    dtype=cvxpy.Expression,
-                )
-                for i, j in np.ndindex(mat_of_cvx_constrs.shape):
-                    mat_of_cvx_constrs[i, j] = evaled_scalar_to_cvx_express(
-                        em.eval_scalar(mat_of_scalars[i, j]),  # ty: ignore
-                        f_var,
-                        g_var,
+                if isinstance(diff, gm.GramMatrix):
+                    # Cx^T G Cy straight from the coefficient matrices.
+                    mat = em.eval_gram(diff).contract(g_var)
+                    cvx_mat = (
+                        cvxpy.Constant(mat) if isinstance(mat, np.ndarray) else mat
                     )
-                if c.cmp == utils.Comparator.SEQ:
-                    self.dual_var_manager.add_constraint(
-                        c.name, cvxpy.bmat(mat_of_cvx_constrs) >> 0
+                    cvx_mat = (cvx_mat + cvx_mat.T) / 2
+                else:
+                    mat_of_scalars = diff
+                    mat_of_cvx_constrs = np.empty(
+                        mat_of_scalars.shape,  # ty: ignore
+                        dtype=cvxpy.Expression,
                     )
+                    for i, j in np.ndindex(mat_of_cvx_constrs.shape):
+                        mat_of_cvx_constrs[i, j] = evaled_scalar_to_cvx_express(
+                            em.eval_scalar(mat_of_scalars[i, j]),  # ty: ignore
+                            f_var,
+                            g_var,
+                        )
+                    cvx_mat = cvxpy.bmat(mat_of_cvx_constrs)
+                if c.cmp == utils.Comparator.SEQ:
+                    self.dual_var_manager.add_constraint(c.name, cvx_mat >> 0)
                 elif c.cmp == utils.Comparator.PEQ:
-                    self.dual_var_manager.add_constraint(
-                        c.name, cvxpy.bmat(mat_of_cvx_constrs) << 0
-                    )
+                    self.dual_var_manager.add_constraint(c.name, cvx_mat << 0)
                 elif c.cmp == utils.Comparator.EQ:
-                    self.dual_var_manager.add_constraint(
-                        c.name, cvxpy.bmat(mat_of_cvx_constrs) == 0
-                    )
+                    self.dual_var_manager.add_constraint(c.name, cvx_mat == 0)
                 else:
                     raise ValueError(f"Unknown comparator {c.cmp}")
         obj = evaled_scalar_to_cvx_express(
@@ -261,7 +329,9 @@ class CVXDualSolver:
         self.context = context
 
     def build_problem(
-        self, resolve_parameters: dict[str, utils.NUMERICAL_TYPE] | None = None
+        self,
+        resolve_parameters: dict[str, utils.NUMERICAL_TYPE] | None = None,
+        backend: utils.EvalBackend | str = utils.EvalBackend.DENSE,
     ) -> cvxpy.Problem:
         # The primal problem is always the following form:
         #
@@ -290,7 +360,9 @@ class CVXDualSolver:
         # Similarly, the Lagrangian w.r.t. G is linear and G is PSD, the coefficients of G must << 0.
         dual_constraints = []
         lambd_constraints = []
-        em = exm.ExpressionManager(self.context, resolve_parameters=resolve_parameters)
+        em = exm.ExpressionManager(
+            self.context, resolve_parameters=resolve_parameters, backend=backend
+        )
         # The dual variable corresponding to G >= 0
         if em._num_basis_vectors > 0:
             S = cvxpy.Variable((em._num_basis_vectors, em._num_basis_vectors), PSD=True)
@@ -322,9 +394,13 @@ class CVXDualSolver:
                         f"Unknown comparator in constraint {c.name}: get {c.cmp=}"
                     )
                 if em._num_basis_vectors > 0:
-                    G_coef_mat += sign * lambd * evaled_scalar.inner_prod_coords
+                    G_coef_mat += (
+                        sign * lambd * to_cvx_constant(evaled_scalar.inner_prod_coords)
+                    )
                 if em._num_basis_scalars > 0:
-                    F_coef_vec += sign * lambd * evaled_scalar.func_coords
+                    F_coef_vec += (
+                        sign * lambd * to_cvx_constant(evaled_scalar.func_coords)
+                    )
                 obj += sign * lambd * evaled_scalar.offset
 
                 # We can add extra constraints to directly manipulate the dual variables in dual PEP.
@@ -346,36 +422,45 @@ class CVXDualSolver:
                 mat_of_scalars = c.lhs - c.rhs
                 P = cvxpy.Variable(mat_of_scalars.shape, PSD=True)  # ty: ignore
                 self.dual_var_manager.add_variable(c.name, P)
-                mat_of_eval_scalars = np.empty(
-                    mat_of_scalars.shape,  # ty: ignore
-                    dtype=sc.EvaluatedScalar,
-                )
-                for i, j in np.ndindex(mat_of_scalars.shape):  # ty: ignore
-                    mat_of_eval_scalars[i, j] = em.eval_scalar(mat_of_scalars[i, j])  # ty: ignore
-                c_F_mat = np.empty(em._num_basis_scalars, dtype=cvxpy.Expression)
-                for i in range(c_F_mat.size):
-                    block_matrix = np.zeros(mat_of_scalars.shape)  # ty: ignore
-                    for r_idx, c_idx in np.ndindex(block_matrix.shape):
-                        block_matrix[r_idx, c_idx] = mat_of_eval_scalars[
-                            r_idx, c_idx
-                        ].func_coords[i]
-                    c_F_mat[i] = cvxpy.trace(P @ block_matrix)
-                c_G_mat = np.empty(
-                    (em._num_basis_vectors, em._num_basis_vectors),
-                    dtype=cvxpy.Expression,
-                )
-                for i, j in np.ndindex(c_G_mat.shape):
-                    block_matrix = np.zeros(mat_of_scalars.shape)  # ty: ignore
-                    for r_idx, c_idx in np.ndindex(block_matrix.shape):
-                        block_matrix[r_idx, c_idx] = mat_of_eval_scalars[
-                            r_idx, c_idx
-                        ].inner_prod_coords[i, j]
-                    c_G_mat[i, j] = cvxpy.trace(P @ block_matrix)
+                if isinstance(mat_of_scalars, gm.GramMatrix):
+                    # Tr(P Cx^T G Cy) = Tr(G (Cx P Cy^T + Cy P Cx^T) / 2). A
+                    # Gram matrix has neither function values nor an offset.
+                    c_G_coef = em.eval_gram(mat_of_scalars).adjoint(P)
+                    c_F_coef = None
+                    c_offset = 0
+                else:
+                    mat_of_eval_scalars = np.empty(
+                        mat_of_scalars.shape,  # ty: ignore
+                        dtype=sc.EvaluatedScalar,
+                    )
+                    for i, j in np.ndindex(mat_of_scalars.shape):  # ty: ignore
+                        mat_of_eval_scalars[i, j] = em.eval_scalar(mat_of_scalars[i, j])  # ty: ignore
+                    c_F_mat = np.empty(em._num_basis_scalars, dtype=cvxpy.Expression)
+                    for i in range(c_F_mat.size):
+                        block_matrix = np.zeros(mat_of_scalars.shape)  # ty: ignore
+                        for r_idx, c_idx in np.ndindex(block_matrix.shape):
+                            block_matrix[r_idx, c_idx] = mat_of_eval_scalars[
+                                r_idx, c_idx
+                            ].func_coords[i]
+                        c_F_mat[i] = cvxpy.trace(P @ block_matrix)
+                    c_G_mat = np.empty(
+                        (em._num_basis_vectors, em._num_basis_vectors),
+                        dtype=cvxpy.Expression,
+                    )
+                    for i, j in np.ndindex(c_G_mat.shape):
+                        block_matrix = np.zeros(mat_of_scalars.shape)  # ty: ignore
+                        for r_idx, c_idx in np.ndindex(block_matrix.shape):
+                            block_matrix[r_idx, c_idx] = mat_of_eval_scalars[
+                                r_idx, c_idx
+                            ].inner_prod_coords[i, j]
+                        c_G_mat[i, j] = cvxpy.trace(P @ block_matrix)
 
-                block_matrix = np.zeros(mat_of_scalars.shape)  # ty: ignore
-                for i, j in np.ndindex(block_matrix.shape):
-                    block_matrix[i, j] = mat_of_eval_scalars[i, j].offset
-                c_offset = cvxpy.trace(P @ block_matrix)
+                    block_matrix = np.zeros(mat_of_scalars.shape)  # ty: ignore
+                    for i, j in np.ndindex(block_matrix.shape):
+                        block_matrix[i, j] = mat_of_eval_scalars[i, j].offset
+                    c_offset = cvxpy.trace(P @ block_matrix)
+                    c_G_coef = cvxpy.bmat(c_G_mat) if c_G_mat.size > 0 else None
+                    c_F_coef = cvxpy.hstack(c_F_mat) if c_F_mat.size > 0 else None
 
                 if c.cmp == utils.Comparator.SEQ:
                     sign = 1
@@ -388,9 +473,9 @@ class CVXDualSolver:
                         f"Unknown comparator in constraint {c.name}: get {c.cmp=}"
                     )
                 if em._num_basis_vectors > 0:
-                    G_coef_mat_PSD += sign * cvxpy.bmat(c_G_mat)
-                if em._num_basis_scalars > 0:
-                    F_coef_vec_PSD += sign * cvxpy.hstack(c_F_mat)
+                    G_coef_mat_PSD += sign * c_G_coef
+                if c_F_coef is not None:
+                    F_coef_vec_PSD += sign * c_F_coef
                 obj += sign * c_offset
 
                 # We can add extra constraints to directly manipulate the dual variables in dual PEP.
@@ -409,12 +494,15 @@ class CVXDualSolver:
 
         if em._num_basis_scalars > 0:
             dual_constraints.append(
-                F_coef_vec + F_coef_vec_PSD + evaled_perf_metric_scalar.func_coords == 0
+                F_coef_vec
+                + F_coef_vec_PSD
+                + to_cvx_constant(evaled_perf_metric_scalar.func_coords)
+                == 0
             )
         if em._num_basis_vectors > 0:
             dual_constraints.append(
                 S
-                + evaled_perf_metric_scalar.inner_prod_coords
+                + to_cvx_constant(evaled_perf_metric_scalar.inner_prod_coords)
                 + G_coef_mat
                 + G_coef_mat_PSD
                 == 0
@@ -211,3 +211,71 @@ def test_zero_basis_vectors(pep_context: pc.PEPContext):
     problem = dual_solver.build_problem()
     result = problem.solve()
     assert abs(result - 1) < 1e-6
+
+
+@pytest.mark.parametrize("solver_cls", [ps.CVXPrimalSolver, ps.CVXDualSolver])
+def test_cvx_solver_other_backends(pep_context: pc.PEPContext, solver_cls):
+    p1 = vt.Vector(is_basis=True, tags=["p1"])
+    p2 = vt.Vector(is_basis=True, tags=["p2"])
+    s1 = sc.Scalar(is_basis=True, tags=["s1"])
+    s2 = -(1 + p1 * p1) + p2 * p2
+    constraints = [
+        (p1 * p1).gt(1, name="x^2 >= 1"),
+        (p2 * p2).lt(s1, name="y^2 <= s1"),
+        s1.lt(2, name="s1 <= 2"),
+        ct.PSDConstraint(
+            np.array([[s1, p1 * p2], [p1 * p2, s1]]),
+            0,
+            utils.Comparator.SEQ,
+            "PSDConstraint",
+        ),
+    ]
+
+    solver = solver_cls(
+        perf_metric=s2,
+        constraints=constraints,
+        context=pep_context,
+    )
+    dense_result = solver.build_problem().solve()
+    solver = solver_cls(
+        perf_metric=s2,
+        constraints=constraints,
+        context=pep_context,
+    )
+    sparse_result = solver.build_problem(backend=utils.EvalBackend.SPARSE).solve()
+    assert abs(dense_result - sparse_result) < 1e-6
+    assert abs(sparse_result) < 1e-5
+
+    solver = solver_cls(
+        perf_metric=s2,
+        constraints=constraints,
+        context=pep_context,
+    )
+    low_rank_result = solver.build_problem(backend=utils.EvalBackend.LOW_RANK).solve()
+    assert abs(dense_result - low_rank_result) < 1e-6
+
+    solver = solver_cls(
+        perf_metric=s2,
+        constraints=constraints,
+        context=pep_context,
+    )
+    rational_result = solver.build_problem(backend=utils.EvalBackend.RATIONAL).solve()
+    assert abs(dense_result - rational_result) < 1e-6
+
+
+def test_cvx_primal_solver_skips_unused_nodes(pep_context: pc.PEPContext):
+    p1 = vt.Vector(is_basis=True, tags=["p1"])
+    s1 = sc.Scalar(is_basis=True, tags=["s1"])
+    # Intermediates that neither the metric nor the constraints use.
+    unused = [p1 * (k + 1) for k in range(5)]
+    _ = [x * x for x in unused]
+    constraints = [s1.lt(1, name="s1 <= 1"), (p1 * p1).lt(s1, name="p1^2 <= s1")]
+
+    solver = ps.CVXPrimalSolver(
+        perf_metric=s1 + p1 * p1,
+        constraints=constraints,
+        context=pep_context,
+    )
+    result = solver.build_problem().solve()
+    assert abs(result - 2) < 1e-5
+    assert solver.num_skipped_nodes == 10
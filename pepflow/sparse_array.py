@@ -0,0 +1,218 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from __future__ import annotations
+
+from typing import Any
+
+import attrs
+import numpy as np
+import sympy as sp
+
+from pepflow import utils
+
+
+@attrs.frozen
+class SparseArray:
+    """
+    A dictionary-of-keys array that only stores the nonzero entries.
+
+    :class:`SparseArray` objects are used by the sparse backend of
+    :class:`ExpressionManager` as the `coords` of :class:`EvaluatedVector`
+    objects and as the `func_coords` and `inner_prod_coords` of
+    :class:`EvaluatedScalar` objects. One-dimensional arrays are keyed by `int`
+    and two-dimensional arrays are keyed by `(int, int)` tuples.
+
+    :class:`SparseArray` objects support the same arithmetic as the dense
+    `np.ndarray` coordinates: addition and subtraction of arrays of the same
+    shape, and multiplication and division by numbers. Reading an entry that
+    is not stored returns zero.
+
+    Attributes:
+        shape (tuple[int, ...]): The shape of the equivalent dense array.
+        entries (dict): A dictionary mapping the index of a nonzero entry to
+            its value.
+        sympy_mode (bool): If true, the entries are SymPy objects and
+            :py:func:`toarray` returns an object array. By default `False`.
+    """
+
+    shape: tuple[int, ...]
+    entries: dict[Any, Any] = attrs.field(factory=dict)
+    sympy_mode: bool = False
+
+    # Make numpy scalars defer to our reflected operators instead of treating
+    # the array as a sequence.
+    __array_ufunc__ = None
+
+    @classmethod
+    def zeros(cls, shape: tuple[int, ...], sympy_mode: bool = False) -> SparseArray:
+        return cls(shape=shape, entries={}, sympy_mode=sympy_mode)
+
+    @classmethod
+    def unit(cls, size: int, index: int, sympy_mode: bool = False) -> SparseArray:
+        """Return the one-dimensional array with a single one at `index`."""
+        return cls(
+            shape=(size,),
+            entries={index: sp.S(1) if sympy_mode else 1.0},
+            sympy_mode=sympy_mode,
+        )
+
+    @classmethod
+    def from_dense(cls, array: np.ndarray, sympy_mode: bool = False) -> SparseArray:
+        entries = {}
+        for index, val in np.ndenumerate(array):
+            if val != 0:
+                entries[index[0] if array.ndim == 1 else index] = val
+        return cls(shape=array.shape, entries=entries, sympy_mode=sympy_mode)
+
+    @classmethod
+    def sym_outer(
+        cls, v: SparseArray, w: SparseArray, sympy_mode: bool = False
+    ) -> SparseArray:
+        """Symmetric outer product `(v w^T + w v^T) / 2` of two 1-D arrays.
+
+        The cost is proportional to the product of the numbers of nonzero
+        entries of `v` and `w` instead of the square of their length.
+        """
+        coef = sp.S(1) / 2 if sympy_mode else 1 / 2
+        entries: dict[tuple[int, int], Any] = {}
+        for i, a in v.entries.items():
+            for j, b in w.entries.items():
+                val = coef * a * b
+                entries[(i, j)] = entries.get((i, j), 0) + val
+                entries[(j, i)] = entries.get((j, i), 0) + val
+        size = v.shape[0]
+        return cls(
+            shape=(size, size),
+            entries={k: val for k, val in entries.items() if val != 0},
+            sympy_mode=sympy_mode,
+        )
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def nnz(self) -> int:
+        """The number of stored (nonzero) entries."""
+        return len(self.entries)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, np.integer):
+            index = int(index)
+        return self.entries.get(index, sp.S(0) if self.sympy_mode else 0.0)
+
+    def items(self):
+        return self.entries.items()
+
+    def toarray(self) -> np.ndarray:
+        """Return the equivalent dense `np.ndarray`."""
+        array = np.zeros(self.shape)
+        if self.sympy_mode:
+            array = array * sp.S(0)
+        for index, val in self.entries.items():
+            array[index] = val
+        return array
+
+    def to_scipy(self):
+        """Return the equivalent `scipy.sparse.coo_matrix` of a 2-D array."""
+        from scipy import sparse
+
+        if self.ndim != 2:
+            raise ValueError("Only two-dimensional SparseArray can be converted.")
+        if not self.entries:
+            return sparse.coo_matrix(self.shape)
+        rows, cols = zip(*self.entries.keys())
+        data = np.array(list(self.entries.values()), dtype=float)
+        return sparse.coo_matrix((data, (rows, cols)), shape=self.shape)
+
+    def _merge(self, other: SparseArray, sign: int) -> SparseArray:
+        if self.shape != other.shape:
+            raise ValueError(
+                f"Cannot combine SparseArray of shape {self.shape} and {other.shape}."
+            )
+        entries = dict(self.entries)
+        for index, val in other.entries.items():
+            new_val = entries.get(index, 0) + sign * val
+            if new_val == 0:
+                entries.pop(index, None)
+            else:
+                entries[index] = new_val
+        return SparseArray(
+            shape=self.shape,
+            entries=entries,
+            sympy_mode=self.sympy_mode or other.sympy_mode,
+        )
+
+    def _scale(self, factor: Any) -> SparseArray:
+        if factor == 0:
+            return SparseArray.zeros(self.shape, sympy_mode=self.sympy_mode)
+        return SparseArray(
+            shape=self.shape,
+            entries={index: val * factor for index, val in self.entries.items()},
+            sympy_mode=self.sympy_mode,
+        )
+
+    def __add__(self, other):
+        if isinstance(other, SparseArray):
+            return self._merge(other, 1)
+        if utils.is_numerical(other) or utils.is_sympy_expr(other):
+            # Adding a number to every entry destroys the sparsity.
+            return self.toarray() + other
+        return NotImplemented
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        if isinstance(other, SparseArray):
+            return self._merge(other, -1)
+        if utils.is_numerical(other) or utils.is_sympy_expr(other):
+            return self.toarray() - other
+        return NotImplemented
+
+    def __rsub__(self, other):
+        if isinstance(other, SparseArray):
+            return other._merge(self, -1)
+        if utils.is_numerical(other) or utils.is_sympy_expr(other):
+            return other - self.toarray()
+        return NotImplemented
+
+    def __neg__(self):
+        return self._scale(-1)
+
+    def __mul__(self, other):
+        if utils.is_numerical(other) or utils.is_sympy_expr(other):
+            return self._scale(other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if utils.is_numerical(other) or utils.is_sympy_expr(other):
+            return SparseArray(
+                shape=self.shape,
+                entries={index: val / other for index, val in self.entries.items()},
+                sympy_mode=self.sympy_mode,
+            )
+        return NotImplemented
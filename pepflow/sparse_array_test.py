@@ -0,0 +1,65 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import numpy as np
+import pytest
+import sympy as sp
+
+from pepflow import sparse_array as spa
+from pepflow import utils
+
+
+def test_sparse_array_arithmetic():
+    x = spa.SparseArray.unit(4, 1)
+    y = spa.SparseArray.unit(4, 3)
+
+    z = 2 * x - y / 4
+    assert z.nnz == 2
+    np.testing.assert_allclose(z.toarray(), np.array([0, 2, 0, -0.25]))
+    np.testing.assert_allclose((-z).toarray(), np.array([0, -2, 0, 0.25]))
+
+    # Cancellation drops the entry.
+    assert (z - 2 * x).nnz == 1
+    assert (z * 0).nnz == 0
+
+    # numpy scalars defer to the sparse operators.
+    np.testing.assert_allclose((np.float64(3) * x).toarray(), np.array([0, 3, 0, 0]))
+
+    with pytest.raises(ValueError):
+        x + spa.SparseArray.unit(3, 1)
+
+
+def test_sparse_array_sym_outer():
+    v = spa.SparseArray.from_dense(np.array([1.0, 0, 2.0, 0, 0]))
+    w = spa.SparseArray.from_dense(np.array([0, 0, 3.0, 0, 1.0]))
+
+    outer = spa.SparseArray.sym_outer(v, w)
+    np.testing.assert_allclose(outer.toarray(), utils.SOP(v.toarray(), w.toarray()))
+    np.testing.assert_allclose(outer.to_scipy().toarray(), outer.toarray())
+    assert outer[0, 2] == 1.5
+    assert outer[1, 1] == 0
+
+
+def test_sparse_array_sympy_mode():
+    x = spa.SparseArray.unit(3, 0, sympy_mode=True)
+    y = x / 3 + spa.SparseArray.unit(3, 2, sympy_mode=True)
+    np.testing.assert_equal(
+        y.toarray(), np.array([sp.S(1) / 3, sp.S(0), sp.S(1)]), strict=True
+    )
+    assert y[1] == sp.S(0)
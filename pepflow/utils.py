@@ -20,9 +20,11 @@
 from __future__ import annotations
 
 import enum
+import itertools
 import math
 import numbers
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, TypeAlias
 
 import numpy as np
@@ -64,6 +66,29 @@ class PEPType(enum.Enum):
     DUAL = "dual"
 
 
+class EvalBackend(enum.Enum):
+    """
+    An enum representing the storage used for the concrete representations
+    computed by :class:`ExpressionManager`.
+
+    Attributes:
+        DENSE: Coordinates are stored as dense `np.ndarray` objects.
+        SPARSE: Coordinates are stored as :class:`SparseArray` objects which
+            only keep the nonzero entries.
+        LOW_RANK: Coordinates of vectors are dense and the inner-product
+            coordinates of scalars are :class:`LowRankMatrix` objects which
+            keep a list of weighted rank-1 terms.
+        RATIONAL: Coordinates are stored as :class:`RationalArray` objects,
+            i.e., exact integer numerators over a common denominator. This
+            gives the results of `sympy_mode` without SymPy arithmetic.
+    """
+
+    DENSE = "dense"
+    SPARSE = "sparse"
+    LOW_RANK = "low_rank"
+    RATIONAL = "rational"
+
+
 class Op(enum.Enum):
     ADD = "add"
     SUB = "sub"
@@ -72,6 +97,19 @@ class Op(enum.Enum):
     POW = "pow"
 
 
+def apply_op(op: Op, left: Any, right: Any) -> Any:
+    """Return `left op right` for an arithmetic :class:`Op`."""
+    if op == Op.ADD:
+        return left + right
+    if op == Op.SUB:
+        return left - right
+    if op == Op.MUL:
+        return left * right
+    if op == Op.DIV:
+        return left / right
+    raise ValueError(f"Encountered unknown {op=} when evaluation the expression.")
+
+
 class Comparator(enum.Enum):
     """
     An enum to representing comparators of relations.
@@ -108,6 +146,121 @@ class Comparator(enum.Enum):
         return cmp
 
 
+# The source of the `uid` of Vector, Scalar, Function and Operator objects.
+# Unique within the process and increasing in creation order.
+_UID_COUNTER = itertools.count()
+
+
+def next_uid() -> int:
+    """Return a new integer id, unique within the process."""
+    return next(_UID_COUNTER)
+
+
+class MemoCache:
+    """
+    A memo with an optional least-recently-used size limit.
+
+    Unlike `functools.cache` on a method, a :class:`MemoCache` belongs to a
+    single object, so its content is released together with that object.
+
+    Attributes:
+        maxsize (int | `None`): The maximum number of entries. Once exceeded,
+            the least recently used entry is dropped. `None` means unbounded.
+        hits (int): The number of lookups that found an entry.
+        misses (int): The number of lookups that did not find an entry.
+    """
+
+    MISSING = object()
+
+    def __init__(self, maxsize: int | None = None):
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError(f"maxsize must be positive or None but got {maxsize}.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def get(self, key) -> Any:
+        """Return the value of `key`, or :attr:`MemoCache.MISSING` if absent."""
+        value = self._data.get(key, self.MISSING)
+        if value is self.MISSING:
+            self.misses += 1
+            return value
+        self.hits += 1
+        if self.maxsize is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value) -> None:
+        self._data[key] = value
+        if self.maxsize is not None:
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict[str, int | None]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self._data),
+        }
+
+
+def evaluate_dag(
+    roots: list[Any],
+    children: Callable[[Any], list[Any]],
+    compute: Callable[[Any, dict[Any, Any]], Any],
+    results: dict[Any, Any] | None = None,
+) -> dict[Any, Any]:
+    """
+    Evaluate the nodes reachable from `roots` in post-order without recursion.
+
+    An explicit stack is used instead of recursion so that very deep
+    expressions neither hit the recursion limit nor pay the frame overhead.
+    Shared sub-expressions are evaluated once.
+
+    Args:
+        roots (list): The nodes to evaluate. Each node must have a `uid`.
+        children (Callable): Return the nodes that must be evaluated before
+            the given node.
+        compute (Callable): Compute the value of a node given the `results`
+            dictionary, which already contains the values of its children.
+        results (dict | `None`): The values of nodes evaluated before, keyed
+            by uid. Updated in place.
+
+    Returns:
+        dict: A dictionary mapping the uid of each evaluated node to its value.
+    """
+    results = {} if results is None else results
+    for root in roots:
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node.uid in results:
+                continue
+            if expanded:
+                results[node.uid] = compute(node, results)
+                continue
+            stack.append((node, True))
+            for child in children(node):
+                if child.uid not in results:
+                    stack.append((child, False))
+    return results
+
+
 def is_numerical(val: Any) -> bool:
     return isinstance(val, numbers.Number) or is_sympy_real(val)
 
@@ -134,16 +287,33 @@ def is_sympy_real(val: Any) -> bool:
     return val_is_sp_real
 
 
+def canonicalize_sympy_expr(val: sp.Basic, full: bool = False) -> sp.Basic:
+    """
+    Return a canonical form of a SymPy expression.
+
+    Exact numbers, e.g., `sp.Integer` and `sp.Rational`, are returned as they
+    are. Other expressions are put over a common denominator by `sp.cancel`,
+    which is much cheaper than `sp.simplify` and already exposes every
+    rational expression that is zero. `sp.simplify` is only called if `full`.
+    """
+    if val.is_Number:
+        return val
+    if full:
+        return sp.simplify(val)
+    return sp.cancel(val)
+
+
 def simplify_if_param_or_sympy_expr(
-    val: NUMERICAL_TYPE | Parameter | sp.Basic,
+    val: NUMERICAL_TYPE | Parameter | sp.Basic, full: bool = False
 ) -> NUMERICAL_TYPE | Parameter | sp.Basic:
     if not is_numerical_or_parameter(val):
         raise TypeError(
             f"Expected a numerical value, Parameter, or SymPy expression, got {type(val)}"
         )
-    # Both Parameter and SymPy expressions have a simplify() method
-    if is_parameter(val) or is_sympy_expr(val):
-        return val.simplify()  # type: ignore
+    if is_sympy_expr(val):
+        return canonicalize_sympy_expr(val, full=full)
+    if is_parameter(val):
+        return val.simplify(full=full)  # type: ignore
     return val
 
 
@@ -159,13 +329,15 @@ def num_or_param_or_sympy_expr_is_zero(
             return expression.is_zero()
         return False
     elif is_sympy_expr(val):
+        if val.is_Number:  # type: ignore
+            return val == 0
         # Both SymPy expressions has a equals method
         return val.equals(0)  # type: ignore
     return val == 0
 
 
 def simplify_dict(
-    old_dict: defaultdict[Any, Any],
+    old_dict: defaultdict[Any, Any], full: bool = False
 ) -> defaultdict[Any, Any]:
     """
     Return a new defaultdict(int) whose values are simplified.
@@ -177,7 +349,7 @@ def simplify_dict(
             key: simplified_val
             for key, val in old_dict.items()
             if not num_or_param_or_sympy_expr_is_zero(
-                simplified_val := simplify_if_param_or_sympy_expr(val)
+                simplified_val := simplify_if_param_or_sympy_expr(val, full=full)
             )
         },
     )
@@ -200,9 +372,9 @@ def coef_times_term_to_str(
 ) -> str:
     """Returns a string representation with coefficient and term."""
 
-    # TODO: Check performance
     if isinstance(val, sp.Basic):
-        val = val.simplify()
+        # Displayed coefficients are fully simplified.
+        val = canonicalize_sympy_expr(val, full=True)
 
     if is_numerical(val):
         sign = "+" if val >= 0 else "-"
@@ -232,10 +404,21 @@ def coef_times_term_to_str(
     return f"{sign} {coef}*{term_repr} "
 
 
+def arithmetic_op(val: Vector | Scalar) -> Op | None:
+    """Return the arithmetic operation that built `val`, if any.
+
+    It is recorded by the :class:`MathExpr` of `val`, since the flattened
+    `eval_expression` of an eagerly flattened object has no `op`.
+    """
+    if (op := getattr(val.math_expr, "op", None)) is not None:
+        return op
+    return getattr(val.eval_expression, "op", None)
+
+
 def parenthesize_tag(val: Vector | Scalar) -> str:
     tmp_repr = val.__repr__()
     if not val.is_basis:
-        if op := getattr(val.eval_expression, "op", None):
+        if op := arithmetic_op(val):
             if op in (Op.ADD, Op.SUB):
                 tmp_repr = f"({val.__repr__()})"
     return tmp_repr
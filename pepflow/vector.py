@@ -19,8 +19,8 @@
 
 from __future__ import annotations
 
-import uuid
 from collections import defaultdict
+from collections.abc import Iterable, Sequence
 from typing import TYPE_CHECKING, Any
 
 import attrs
@@ -30,6 +30,8 @@ import sympy as sp
 from pepflow import math_expression as me
 from pepflow import parameter as param
 from pepflow import pep_context as pc
+from pepflow import rational_array as ra
+from pepflow import sparse_array as spa
 from pepflow import utils
 from pepflow.scalar import Scalar, ScalarByBasisRepresentation, ScalarRepresentation
 
@@ -52,6 +54,20 @@ class VectorRepresentation:
     right_vector: Vector | utils.NUMERICAL_TYPE | Parameter
 
 
+@attrs.frozen
+class VectorSumRepresentation:
+    """A representation of a Vector as the flat weighted sum
+    `weights[0]*terms[0] + weights[1]*terms[1] + ...` of other Vectors."""
+
+    terms: tuple[Vector, ...]
+    weights: tuple[Any, ...]
+
+    @property
+    def op(self) -> utils.Op:
+        # An n-ary addition, e.g., for parenthesizing math expressions.
+        return utils.Op.ADD
+
+
 @attrs.frozen
 class VectorByBasisRepresentation:
     """A representation of a Vector as a linear combination of basis Vectors."""
@@ -60,7 +76,18 @@ class VectorByBasisRepresentation:
     coeffs: defaultdict[Vector, Any] = attrs.field(factory=lambda: defaultdict(int))
 
     # Generate an automatic id
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
+
+    @classmethod
+    def weighted_sum(
+        cls, reprs: list[VectorByBasisRepresentation], weights: list[Any]
+    ) -> VectorByBasisRepresentation:
+        """Return `sum_i weights[i] * reprs[i]`, accumulated in a single dict."""
+        new_coeffs = defaultdict(int)
+        for rep, weight in zip(reprs, weights):
+            for vec, coeff in rep.coeffs.items():
+                new_coeffs[vec] += coeff * weight
+        return cls(coeffs=new_coeffs)
 
     def __repr__(self) -> str:
         # TODO: Improve representation for parameters and Scalar types.
@@ -133,11 +160,11 @@ class VectorByBasisRepresentation:
                 for vec_r, coeff_r in other.coeffs.items():
                     key = (vec_l, vec_r) if str_l < str(vec_r) else (vec_r, vec_l)
                     new_inner_prod_coeffs[key] += coeff_l * coeff_r
-                return ScalarByBasisRepresentation(
-                    func_coeffs=defaultdict(int, {}),
-                    inner_prod_coeffs=new_inner_prod_coeffs,
-                    offset=0,
-                )
+            return ScalarByBasisRepresentation(
+                func_coeffs=defaultdict(int, {}),
+                inner_prod_coeffs=new_inner_prod_coeffs,
+                offset=0,
+            )
         new_coeffs = defaultdict(int)
         for vec, coeff in self.coeffs.items():
             new_coeffs[vec] = coeff * other
@@ -219,11 +246,13 @@ class EvaluatedVector:
     can form a new :class:`EvaluatedVector` object: `a*x+b*y`.
 
     Attributes:
-        coords (np.ndarray): The concrete representation of an
-            abstract :class:`Vector`.
+        coords (np.ndarray | :class:`SparseArray` | :class:`RationalArray`): The
+            concrete representation of an abstract :class:`Vector`. It is a
+            :class:`SparseArray` when evaluated with the sparse backend and a
+            :class:`RationalArray` when evaluated with the rational backend.
     """
 
-    coords: np.ndarray
+    coords: np.ndarray | spa.SparseArray | ra.RationalArray
 
     @classmethod
     def zero(cls, num_basis_vectors: int, sympy_mode: bool = False):
@@ -232,6 +261,12 @@ class EvaluatedVector:
             coords = coords * sp.S(0)
         return EvaluatedVector(coords=coords)
 
+    def to_dense(self) -> EvaluatedVector:
+        """Return the :class:`EvaluatedVector` with dense `np.ndarray` coords."""
+        if isinstance(self.coords, (spa.SparseArray, ra.RationalArray)):
+            return EvaluatedVector(coords=self.coords.toarray())
+        return self
+
     def __add__(self, other):
         if isinstance(other, EvaluatedVector):
             return EvaluatedVector(coords=self.coords + other.coords)
@@ -326,7 +361,7 @@ class Vector:
     math_expr: me.MathExpr = attrs.field(factory=me.MathExpr)
 
     # Generate an automatic id
-    uid: uuid.UUID = attrs.field(factory=uuid.uuid4, init=False)
+    uid: int = attrs.field(factory=utils.next_uid, init=False)
 
     def __attrs_post_init__(self):
         if self.is_basis:
@@ -358,6 +393,41 @@ class Vector:
             math_expr=me.MathExpr(expr_str="0"),
         )
 
+    @staticmethod
+    def make_basis(tag_pattern: str, indices: int | Iterable[int]) -> list[Vector]:
+        """A static method that creates several basis :class:`Vector` objects
+        at once.
+
+        The objects are registered in the current :class:`PEPContext` with a
+        single update instead of one at a time, which is faster when creating
+        many of them.
+
+        Args:
+            tag_pattern (str): The pattern of the tags. The tag of the object
+                with index `i` is `tag_pattern.format(i)`.
+            indices (int | Iterable[int]): The indices of the objects to
+                create. An `int` `K` means the indices `0, ..., K-1`.
+
+        Returns:
+            list[:class:`Vector`]: The new basis :class:`Vector` objects.
+
+        Example:
+            >>> import pepflow as pf
+            >>> ctx = pf.PEPContext("ctx").set_as_current()
+            >>> x_0, x_1, x_2 = pf.Vector.make_basis("x_{}", 3)
+        """
+        pep_context = pc.get_current_context()
+        if pep_context is None:
+            raise RuntimeError("Did you forget to create a context?")
+        if isinstance(indices, int):
+            indices = range(indices)
+        tags = [tag_pattern.format(i) for i in indices]
+        with pep_context._deferred_registration():
+            vectors = [Vector(is_basis=True, tags=[tag]) for tag in tags]
+        pep_context.add_vectors(vectors)
+        pep_context.add_tags_to_vectors_or_scalars(dict(zip(tags, vectors)))
+        return vectors
+
     @property
     def tag(self):
         """Returns the most recently added tag.
@@ -399,11 +469,10 @@ class Vector:
     def __add__(self, other):
         if not isinstance(other, Vector):
             return NotImplemented
-        return Vector(
-            is_basis=False,
-            eval_expression=VectorRepresentation(utils.Op.ADD, self, other),
-            tags=[],
-            math_expr=me.MathExpr(f"{repr(self)}+{repr(other)}"),
+        return pc.make_composite(
+            Vector,
+            VectorRepresentation(utils.Op.ADD, self, other),
+            me.MathExpr.lazy(me.Operand(self), "+", me.Operand(other)),
         )
 
     def __radd__(self, other):
@@ -412,108 +481,92 @@ class Vector:
             return self
         if not isinstance(other, Vector):
             return NotImplemented
-        return Vector(
-            is_basis=False,
-            eval_expression=VectorRepresentation(utils.Op.ADD, other, self),
-            tags=[],
-            math_expr=me.MathExpr(f"{repr(other)}+{repr(self)}"),
+        return pc.make_composite(
+            Vector,
+            VectorRepresentation(utils.Op.ADD, other, self),
+            me.MathExpr.lazy(me.Operand(other), "+", me.Operand(self)),
         )
 
     def __sub__(self, other):
         if not isinstance(other, Vector):
             return NotImplemented
-        expr_other = utils.parenthesize_tag(other)
-        return Vector(
-            is_basis=False,
-            eval_expression=VectorRepresentation(utils.Op.SUB, self, other),
-            tags=[],
-            math_expr=me.MathExpr(f"{repr(self)}-{expr_other}"),
+        return pc.make_composite(
+            Vector,
+            VectorRepresentation(utils.Op.SUB, self, other),
+            me.MathExpr.lazy(
+                me.Operand(self), "-", me.Operand(other, parenthesize=True)
+            ),
         )
 
     def __rsub__(self, other):
         if not isinstance(other, Vector):
             return NotImplemented
-        expr_self = utils.parenthesize_tag(self)
-        return Vector(
-            is_basis=False,
-            eval_expression=VectorRepresentation(utils.Op.SUB, other, self),
-            tags=[],
-            math_expr=me.MathExpr(f"{repr(other)}-{expr_self}"),
+        return pc.make_composite(
+            Vector,
+            VectorRepresentation(utils.Op.SUB, other, self),
+            me.MathExpr.lazy(
+                me.Operand(other), "-", me.Operand(self, parenthesize=True)
+            ),
         )
 
     def __mul__(self, other):
         if not is_numerical_or_vector(other):
             return NotImplemented
         if utils.is_numerical_or_parameter(other):
-            expr_self = utils.parenthesize_tag(self)
             expr_other = utils.numerical_str(other)
-            return Vector(
-                is_basis=False,
-                eval_expression=VectorRepresentation(utils.Op.MUL, self, other),
-                tags=[],
-                math_expr=me.MathExpr(f"{expr_self}*{expr_other}"),
+            return pc.make_composite(
+                Vector,
+                VectorRepresentation(utils.Op.MUL, self, other),
+                me.MathExpr.lazy(me.Operand(self, parenthesize=True), f"*{expr_other}"),
             )
         else:
-            return Scalar(
-                is_basis=False,
-                eval_expression=ScalarRepresentation(utils.Op.MUL, self, other),
-                tags=[],
-                math_expr=me.MathExpr(
-                    me.INNER_PROD_STR.format(A=repr(self), B=repr(other))
-                ),
+            return pc.make_composite(
+                Scalar,
+                ScalarRepresentation(utils.Op.MUL, self, other),
+                me.MathExpr.inner_prod(self, other),
             )
 
     def __rmul__(self, other):
         if not is_numerical_or_vector(other):
             return NotImplemented
         if utils.is_numerical_or_parameter(other):
-            expr_self = utils.parenthesize_tag(self)
             expr_other = utils.numerical_str(other)
-            return Vector(
-                is_basis=False,
-                eval_expression=VectorRepresentation(utils.Op.MUL, other, self),
-                tags=[],
-                math_expr=me.MathExpr(f"{expr_other}*{expr_self}"),
+            return pc.make_composite(
+                Vector,
+                VectorRepresentation(utils.Op.MUL, other, self),
+                me.MathExpr.lazy(f"{expr_other}*", me.Operand(self, parenthesize=True)),
             )
         else:
-            return Scalar(
-                is_basis=False,
-                eval_expression=ScalarRepresentation(utils.Op.MUL, other, self),
-                tags=[],
-                math_expr=me.MathExpr(
-                    me.INNER_PROD_STR.format(A=repr(other), B=repr(self))
-                ),
+            return pc.make_composite(
+                Scalar,
+                ScalarRepresentation(utils.Op.MUL, other, self),
+                me.MathExpr.inner_prod(other, self),
             )
 
     def __pow__(self, power):
         if power != 2:
             return NotImplemented
-        return Scalar(
-            is_basis=False,
-            eval_expression=ScalarRepresentation(utils.Op.MUL, self, self),
-            tags=[],
-            math_expr=me.MathExpr(rf"|{repr(self)}|^{power}"),
+        return pc.make_composite(
+            Scalar,
+            ScalarRepresentation(utils.Op.MUL, self, self),
+            me.MathExpr.lazy("|", me.Operand(self), f"|^{power}"),
         )
 
     def __neg__(self):
-        expr_self = utils.parenthesize_tag(self)
-        return Vector(
-            is_basis=False,
-            eval_expression=VectorRepresentation(utils.Op.MUL, -1, self),
-            tags=[],
-            math_expr=me.MathExpr(f"-{expr_self}"),
+        return pc.make_composite(
+            Vector,
+            VectorRepresentation(utils.Op.MUL, -1, self),
+            me.MathExpr.lazy("-", me.Operand(self, parenthesize=True)),
         )
 
     def __truediv__(self, other):
         if not utils.is_numerical_or_parameter(other):
             return NotImplemented
-        expr_self = utils.parenthesize_tag(self)
         expr_other = f"1/{utils.numerical_str(other)}"
-        return Vector(
-            is_basis=False,
-            eval_expression=VectorRepresentation(utils.Op.DIV, self, other),
-            tags=[],
-            math_expr=me.MathExpr(f"{expr_other}*{expr_self}"),
+        return pc.make_composite(
+            Vector,
+            VectorRepresentation(utils.Op.DIV, self, other),
+            me.MathExpr.lazy(f"{expr_other}*", me.Operand(self, parenthesize=True)),
         )
 
     def __hash__(self):
@@ -524,75 +577,116 @@ class Vector:
             return NotImplemented
         return self.uid == other.uid
 
-    def simplify(self, tag: str | None = None) -> Vector:
+    def simplify(self, tag: str | None = None, *, full: bool = False) -> Vector:
         """
         Flatten the `eval_expression` of a :class:`Vector` object into a
         :class:`VectorByBasisRepresentation` consisting of basis and their coefficients.
 
+        The flattened representations are memoized per node in the current
+        :class:`PEPContext`, so simplifying a sub-expression again is free.
+
+        Args:
+            tag (str | None): A tag for the new :class:`Vector` object.
+            full (bool): Whether to apply `sp.simplify` to SymPy coefficients
+                instead of the cheaper canonicalization by `sp.cancel`.
+                Defaults to `False`.
+
         Returns:
             :class:`Vector`: A new :class:`Vector` object whose `eval_expression`
             is flattened into a :class:`VectorByBasisRepresentation`.
         """
 
-        def _simplify(
+        # VectorByBasisRepresentation and the original basis vector are representating the
+        # the same basis vector. However, we do not wanna introduce another basis vector in the context.
+        # So we have to keep this is_basis = False but the eval_expression should be the same.
+        is_basis = False
+        eval_expression = pc.simplified_representation(self, full=full)
+
+        return Vector(
+            is_basis=is_basis,
+            eval_expression=eval_expression,
+            tags=[tag] if tag is not None else [],
+            math_expr=str(eval_expression),
+        )
+
+    def _flat_representation(self) -> VectorByBasisRepresentation | None:
+        """Return this :class:`Vector` as a :class:`VectorByBasisRepresentation`
+        if it is available without walking the expression tree, else `None`."""
+        if self.is_basis:
+            return VectorByBasisRepresentation(coeffs=defaultdict(int, {self: 1}))
+        if isinstance(self.eval_expression, ZeroVector):
+            return VectorByBasisRepresentation(coeffs=defaultdict(int, {}))
+        if isinstance(self.eval_expression, VectorByBasisRepresentation):
+            return self.eval_expression
+        return None
+
+    def _simplify_operands(self) -> list[Vector]:
+        if isinstance(self.eval_expression, VectorSumRepresentation):
+            return list(self.eval_expression.terms)
+        if not isinstance(self.eval_expression, VectorRepresentation):
+            return []
+        return [
+            x
+            for x in [
+                self.eval_expression.left_vector,
+                self.eval_expression.right_vector,
+            ]
+            if isinstance(x, Vector)
+        ]
+
+    def _simplify_node(
+        self, results: dict, full: bool = False
+    ) -> VectorByBasisRepresentation:
+        """Flatten this :class:`Vector` given the flattened representations of
+        its operands in `results`, keyed by uid."""
+
+        def _simplified(
             vector_or_float: Vector | utils.NUMERICAL_TYPE | Parameter,
         ) -> VectorByBasisRepresentation | utils.NUMERICAL_TYPE | Parameter:
             if isinstance(vector_or_float, Vector):
-                # We know after simplification, the eval_expression is always VectorByBasisRepresentation.
-                return vector_or_float.simplify().eval_expression  # type: ignore
+                return results[vector_or_float.uid]
             elif utils.is_parameter(vector_or_float) or utils.is_sympy_expr(
                 vector_or_float
             ):
-                # Parameter has a simplify() method
-                return vector_or_float.simplify()  # type: ignore
+                return utils.simplify_if_param_or_sympy_expr(vector_or_float, full=full)
             else:
                 return vector_or_float
 
         if self.is_basis:
-            # VectorByBasisRepresentation and the original basis vector are representating the
-            # the same basis vector. However, we do not wanna introduce another basis vector in the context.
-            # So we have to keep this is_basis = False but the eval_expression should be the same.
-            is_basis = False
             eval_expression = VectorByBasisRepresentation(
                 coeffs=defaultdict(int, {self: 1})
             )
+        elif isinstance(self.eval_expression, ZeroVector):
+            eval_expression = VectorByBasisRepresentation(coeffs=defaultdict(int, {}))
+        elif isinstance(self.eval_expression, VectorByBasisRepresentation):
+            eval_expression = self.eval_expression
+        elif isinstance(self.eval_expression, VectorSumRepresentation):
+            eval_expression = VectorByBasisRepresentation.weighted_sum(
+                [results[term.uid] for term in self.eval_expression.terms],
+                [_simplified(weight) for weight in self.eval_expression.weights],
+            )
         else:
-            is_basis = False
-            if isinstance(self.eval_expression, ZeroVector):
-                eval_expression = VectorByBasisRepresentation(
-                    coeffs=defaultdict(int, {})
-                )
-            elif isinstance(self.eval_expression, VectorByBasisRepresentation):
-                eval_expression = self.eval_expression
+            assert isinstance(
+                self.eval_expression, VectorRepresentation
+            )  # to make type checker happy
+            left_eval_expression = _simplified(self.eval_expression.left_vector)
+            right_eval_expression = _simplified(self.eval_expression.right_vector)
+            if self.eval_expression.op == utils.Op.ADD:
+                eval_expression = left_eval_expression + right_eval_expression
+            elif self.eval_expression.op == utils.Op.SUB:
+                eval_expression = left_eval_expression - right_eval_expression
+            elif self.eval_expression.op == utils.Op.MUL:
+                eval_expression = left_eval_expression * right_eval_expression
+            elif self.eval_expression.op == utils.Op.DIV:
+                eval_expression = left_eval_expression / right_eval_expression
             else:
-                assert isinstance(
-                    self.eval_expression, VectorRepresentation
-                )  # to make type checker happy
-                left_eval_expression = _simplify(self.eval_expression.left_vector)
-                right_eval_expression = _simplify(self.eval_expression.right_vector)
-                if self.eval_expression.op == utils.Op.ADD:
-                    eval_expression = left_eval_expression + right_eval_expression
-                elif self.eval_expression.op == utils.Op.SUB:
-                    eval_expression = left_eval_expression - right_eval_expression
-                elif self.eval_expression.op == utils.Op.MUL:
-                    eval_expression = left_eval_expression * right_eval_expression
-                elif self.eval_expression.op == utils.Op.DIV:
-                    eval_expression = left_eval_expression / right_eval_expression
-                else:
-                    raise NotImplementedError(
-                        "Only add,sub,mul,div are supported for Vector simplification."
-                    )
+                raise NotImplementedError(
+                    "Only add,sub,mul,div are supported for Vector simplification."
+                )
 
         # coefficient simplification
-        eval_expression = VectorByBasisRepresentation(
-            coeffs=utils.simplify_dict(eval_expression.coeffs)
-        )
-
-        return Vector(
-            is_basis=is_basis,
-            eval_expression=eval_expression,
-            tags=[tag] if tag is not None else [],
-            math_expr=str(eval_expression),
+        return VectorByBasisRepresentation(
+            coeffs=utils.simplify_dict(eval_expression.coeffs, full=full)
         )
 
     def eval(
@@ -624,14 +718,11 @@ class Vector:
             :class:`EvaluatedVector`: The concrete representation of
             this :class:`Vector`.
         """
-        from pepflow.expression_manager import ExpressionManager
-
-        # Note this can be inefficient.
         if ctx is None:
             ctx = pc.get_current_context()
         if ctx is None:
             raise RuntimeError("Did you forget to create a context?")
-        em = ExpressionManager(ctx, resolve_parameters=resolve_parameters)
+        em = ctx.get_expression_manager(resolve_parameters)
         return em.eval_vector(self, sympy_mode=sympy_mode).coords
 
     def repr_by_basis(
@@ -663,14 +754,11 @@ class Vector:
             str: The representation of this :class:`Vector` object in terms of
             the basis :class:`Vector` objects of the given :class:`PEPContext`.
         """
-        from pepflow.expression_manager import ExpressionManager
-
-        # Note this can be inefficient.
         if ctx is None:
             ctx = pc.get_current_context()
         if ctx is None:
             raise RuntimeError("Did you forget to create a context?")
-        em = ExpressionManager(ctx, resolve_parameters=resolve_parameters)
+        em = ctx.get_expression_manager(resolve_parameters)
         return em.repr_vector_by_basis(self, sympy_mode=sympy_mode)
 
     def get_param_names(self) -> set[str]:
@@ -691,6 +779,12 @@ class Vector:
             for coeff in self.eval_expression.coeffs.values():
                 if isinstance(coeff, param.Parameter):
                     names.update(coeff.get_param_names())
+        elif isinstance(self.eval_expression, VectorSumRepresentation):
+            for term in self.eval_expression.terms:
+                names.update(term.get_param_names())
+            for weight in self.eval_expression.weights:
+                if isinstance(weight, param.Parameter):
+                    names.update(weight.get_param_names())
         return names
 
     def equiv_by_randomness(
@@ -704,8 +798,6 @@ class Vector:
         """A function that determines whether two :class:Vector objects are
         equivalent by comparing numerical values obtained by substituting all
         parameters with randomly generated numbers."""
-        from pepflow.expression_manager import ExpressionManager
-
         if repetitions < 1:
             raise ValueError("repetitions should be at least 1.")
         if atol < 0:
@@ -720,8 +812,271 @@ class Vector:
 
         for _ in range(repetitions):
             resolve_parameters_random = {name: rng.random() for name in parameters}
-            em = ExpressionManager(ctx, resolve_parameters=resolve_parameters_random)
+            em = ctx.get_expression_manager(resolve_parameters_random)
             diff_resolved = em.eval_vector(diff, sympy_mode=False).coords
             if np.any(np.abs(diff_resolved) > atol):
                 return False
         return True
+
+
+def sum_vectors(
+    terms: Sequence[Vector],
+    weights: Sequence[utils.NUMERICAL_TYPE | Parameter] | np.ndarray | None = None,
+) -> Vector:
+    """Return the weighted sum `weights[0]*terms[0] + weights[1]*terms[1] + ...`
+    as a single :class:`Vector` object.
+
+    Unlike chaining `+`, which creates a left-deep tree with one
+    :class:`Vector` object per term, the sum is a single node whose
+    concrete representation is one weighted reduction over the stacked
+    coordinates of the terms.
+
+    Args:
+        terms (Sequence[:class:`Vector`]): The vectors to sum.
+        weights (Sequence[:data:`NUMERICAL_TYPE` | :class:`Parameter`] | None):
+            The weights of the terms. By default all the weights are `1`.
+
+    Returns:
+        :class:`Vector`: The weighted sum.
+
+    Example:
+        >>> import pepflow as pf
+        >>> ctx = pf.PEPContext("ctx").set_as_current()
+        >>> gs = pf.Vector.make_basis("g_{}", 100)
+        >>> z = pf.sum_vectors(gs, [1 / (k + 1) for k in range(100)])
+    """
+    terms = tuple(terms)
+    weights = (1,) * len(terms) if weights is None else tuple(weights)
+    if len(weights) != len(terms):
+        raise ValueError(f"Expected {len(terms)} weights but got {len(weights)}.")
+    if not all(isinstance(term, Vector) for term in terms):
+        raise ValueError("sum_vectors can only sum Vector objects.")
+    weights = tuple(w.item() if isinstance(w, np.generic) else w for w in weights)
+    if not all(utils.is_numerical_or_parameter(w) for w in weights):
+        raise ValueError("The weights should be numbers or Parameter objects.")
+    if not terms:
+        return Vector.zero()
+    return pc.make_composite(
+        Vector,
+        VectorSumRepresentation(terms=terms, weights=weights),
+        me.MathExpr.weighted_sum(list(terms), list(weights)),
+    )
+
+
+def _flat_coeffs(vector: Vector) -> dict[Vector, Any]:
+    """Return the coefficients of `vector` in terms of basis :class:`Vector` objects."""
+    flat = vector._flat_representation()
+    if flat is None:
+        flat = pc.simplified_representation(vector)
+    return flat.coeffs
+
+
+def _coeff_array(array: np.ndarray) -> np.ndarray:
+    """Use a numerical dtype when every coefficient is a plain number."""
+    if all(
+        isinstance(x, (int, float, np.integer, np.floating)) and not isinstance(x, bool)
+        for x in array.flat
+    ):
+        return np.array(array.tolist(), dtype=None if array.size else float)
+    return array
+
+
+@attrs.frozen(eq=False)
+class VectorArray:
+    """
+    A block of :class:`Vector` objects stored as a single coefficient matrix.
+
+    The `i`-th :class:`Vector` of a :class:`VectorArray` is
+    `sum_j coeffs[i, j] * basis[j]`. Whole-sequence operations are numpy
+    operations on `coeffs` and do not create any :class:`Vector` object:
+
+    - Slicing with a slice, a list or an array of indices returns a
+      :class:`VectorArray`. Indexing with an `int` returns a :class:`Vector`,
+      the same one every time the same row is indexed.
+    - `weights @ VA` returns the weighted sum of the vectors, a
+      :class:`Vector` for a 1-D `weights` and a :class:`VectorArray` for a
+      2-D one.
+    - `+` and `-` combine two :class:`VectorArray` objects of the same length
+      elementwise, or a :class:`VectorArray` with a single :class:`Vector`.
+    - `*` and `/` scale every vector by a number or :class:`Parameter`, and
+      `*` with a 1-D `np.ndarray` scales each vector by its own weight.
+
+    :class:`Function` objects accept :class:`VectorArray` points:
+    `f.grad(VA)` generates the triplets at all the points at once and
+    returns the gradients as a :class:`VectorArray`.
+
+    Attributes:
+        basis (tuple[:class:`Vector`, ...]): The basis :class:`Vector` objects
+            indexing the columns of `coeffs`.
+        coeffs (np.ndarray): The matrix of shape `(len(self), len(basis))`
+            whose rows are the coefficients of the vectors.
+
+    Example:
+        >>> import numpy as np
+        >>> import pepflow as pf
+        >>> ctx = pf.PEPContext("ctx").set_as_current()
+        >>> f = pf.SmoothConvexFunction(is_basis=True, L=1, tags=["f"])
+        >>> X = pf.VectorArray.from_vectors(pf.Vector.make_basis("x_{}", 3))
+        >>> G = f.grad(X)
+        >>> x_avg = np.full(3, 1 / 3) @ X
+    """
+
+    basis: tuple[Vector, ...]
+    coeffs: np.ndarray
+
+    # The vectors already created by indexing, so that indexing the same row
+    # twice returns the same Vector, e.g., the same point of a Function.
+    _rows: dict[int, Vector] = attrs.field(factory=dict, init=False, repr=False)
+
+    # Make numpy defer to our reflected operators, e.g., for `weights @ VA`.
+    __array_ufunc__ = None
+
+    def __attrs_post_init__(self):
+        if self.coeffs.ndim != 2 or self.coeffs.shape[1] != len(self.basis):
+            raise ValueError(
+                f"The shape of coeffs {self.coeffs.shape} does not match"
+                f" the {len(self.basis)} basis vectors."
+            )
+
+    @classmethod
+    def from_vectors(cls, vectors: Iterable[Vector]) -> VectorArray:
+        """Stack :class:`Vector` objects into a :class:`VectorArray`.
+
+        Args:
+            vectors (Iterable[:class:`Vector`]): The vectors to stack.
+
+        Returns:
+            :class:`VectorArray`: The vectors as the rows of a coefficient
+            matrix.
+        """
+        vectors = list(vectors)
+        if not all(isinstance(v, Vector) for v in vectors):
+            raise ValueError("A VectorArray can only be built from Vector objects.")
+        if all(v.is_basis for v in vectors) and len(set(vectors)) == len(vectors):
+            # E.g., the gradients of a basis function.
+            return cls(basis=tuple(vectors), coeffs=np.eye(len(vectors), dtype=int))
+        rows = [_flat_coeffs(v) for v in vectors]
+        column_of: dict[Vector, int] = {}
+        for row in rows:
+            for basis_vector in row:
+                column_of.setdefault(basis_vector, len(column_of))
+        coeffs = np.zeros((len(rows), len(column_of)), dtype=object)
+        for i, row in enumerate(rows):
+            for basis_vector, coef in row.items():
+                coeffs[i, column_of[basis_vector]] = coef
+        return cls(basis=tuple(column_of), coeffs=_coeff_array(coeffs))
+
+    def __len__(self) -> int:
+        return self.coeffs.shape[0]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index) -> Vector | VectorArray:
+        if isinstance(index, (int, np.integer)):
+            index = range(len(self))[index]
+            if index not in self._rows:
+                self._rows[index] = self._row_vector(self.coeffs[index])
+            return self._rows[index]
+        return VectorArray(basis=self.basis, coeffs=self.coeffs[index])
+
+    def to_vectors(self) -> list[Vector]:
+        """Return the :class:`Vector` objects of this :class:`VectorArray`."""
+        return list(self)
+
+    def _row_vector(self, row: np.ndarray) -> Vector:
+        coeffs = defaultdict(int)
+        for basis_vector, coef in zip(self.basis, row):
+            if isinstance(coef, np.generic):
+                coef = coef.item()
+            if utils.is_numerical(coef) and coef == 0:
+                continue
+            coeffs[basis_vector] = coef
+        if len(coeffs) == 1:
+            ((basis_vector, coef),) = coeffs.items()
+            if utils.is_numerical(coef) and coef == 1:
+                return basis_vector
+        if not coeffs:
+            return Vector.zero()
+        eval_expression = VectorByBasisRepresentation(coeffs=coeffs)
+        return Vector(
+            is_basis=False,
+            eval_expression=eval_expression,
+            math_expr=me.MathExpr(expr_str=str(eval_expression)),
+        )
+
+    def _aligned(
+        self, other: VectorArray
+    ) -> tuple[tuple[Vector, ...], np.ndarray, np.ndarray]:
+        """Express the coefficients of `self` and `other` in a common basis."""
+        if self.basis == other.basis:
+            return self.basis, self.coeffs, other.coeffs
+        column_of = {v: j for j, v in enumerate(self.basis)}
+        for v in other.basis:
+            column_of.setdefault(v, len(column_of))
+        k = len(column_of)
+
+        def padded(array: VectorArray) -> np.ndarray:
+            coeffs = np.zeros((len(array), k), dtype=array.coeffs.dtype)
+            coeffs[:, [column_of[v] for v in array.basis]] = array.coeffs
+            return coeffs
+
+        return tuple(column_of), padded(self), padded(other)
+
+    def _combine(self, other, sign: int) -> VectorArray:
+        if isinstance(other, Vector):
+            other = VectorArray.from_vectors([other])
+        if not isinstance(other, VectorArray):
+            return NotImplemented
+        basis, left, right = self._aligned(other)
+        coeffs = left + right if sign > 0 else left - right
+        return VectorArray(basis=basis, coeffs=coeffs)
+
+    def __add__(self, other):
+        return self._combine(other, 1)
+
+    def __radd__(self, other):
+        return self._combine(other, 1)
+
+    def __sub__(self, other):
+        return self._combine(other, -1)
+
+    def __rsub__(self, other):
+        return (-self)._combine(other, 1)
+
+    def __neg__(self):
+        return VectorArray(basis=self.basis, coeffs=-self.coeffs)
+
+    def __mul__(self, other):
+        if isinstance(other, np.ndarray):
+            if other.shape != (len(self),):
+                raise ValueError(
+                    f"Expected {len(self)} weights but got shape {other.shape}."
+                )
+            return VectorArray(basis=self.basis, coeffs=self.coeffs * other[:, None])
+        if utils.is_numerical_or_parameter(other):
+            coeffs = self.coeffs
+            if utils.is_parameter(other):
+                coeffs = coeffs.astype(object)
+            return VectorArray(basis=self.basis, coeffs=coeffs * other)
+        return NotImplemented
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        if not utils.is_numerical_or_parameter(other):
+            return NotImplemented
+        coeffs = self.coeffs
+        if utils.is_parameter(other):
+            coeffs = coeffs.astype(object)
+        return VectorArray(basis=self.basis, coeffs=coeffs / other)
+
+    def __rmatmul__(self, weights) -> Vector | VectorArray:
+        weights = np.asarray(weights)
+        if weights.ndim == 1:
+            return self._row_vector(weights @ self.coeffs)
+        if weights.ndim == 2:
+            return VectorArray(basis=self.basis, coeffs=weights @ self.coeffs)
+        return NotImplemented
@@ -17,6 +17,7 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import sys
 import time
 from collections import defaultdict
 from typing import Iterator
@@ -31,6 +32,8 @@ from pepflow import parameter
 from pepflow import pep as pep
 from pepflow import pep_context as pc
 from pepflow import registry as reg
+from pepflow import scalar as sc
+from pepflow import utils
 from pepflow import vector
 
 
@@ -104,12 +107,39 @@ def test_vector_add_and_mul_tag(pep_context: pc.PEPContext) -> None:
     assert repr(p_rmul_add) == "0.1*(p1+p2)"
 
 
+def test_vector_repr_is_lazy(pep_context: pc.PEPContext) -> None:
+    p1 = vector.Vector(is_basis=True, tags=["p1"])
+    p2 = vector.Vector(is_basis=True, tags=["p2"])
+
+    p = p1
+    for _ in range(3 * sys.getrecursionlimit()):
+        p = p - 2 * p2
+    # Nothing is rendered until the string is needed.
+    assert p.math_expr._expr_str is None
+    assert repr(p).startswith("p1-2*p2-2*p2")
+    assert len(repr(p)) == 2 + 5 * 3 * sys.getrecursionlimit()
+
+    q = p1 + p2
+    q.math_expr.expr_str = "custom"
+    assert repr(q) == "custom"
+    assert repr(p1 - q) == "p1-(custom)"
+
+
 def test_vector_hash_different(pep_context: pc.PEPContext) -> None:
     p1 = vector.Vector(is_basis=True, eval_expression=None)
     p2 = vector.Vector(is_basis=True, eval_expression=None)
     assert p1.uid != p2.uid
 
 
+def test_vector_uid_is_increasing_int(pep_context: pc.PEPContext) -> None:
+    p1 = vector.Vector(is_basis=True, eval_expression=None)
+    p2 = vector.Vector(is_basis=True, eval_expression=None)
+    p3 = p1 + p2
+    assert isinstance(p1.uid, int)
+    assert p1.uid < p2.uid < p3.uid
+    assert not hasattr(p3, "__dict__")
+
+
 def test_vector_tag(pep_context: pc.PEPContext) -> None:
     p1 = vector.Vector(is_basis=True, eval_expression=None)
     p1.add_tag(tag="my_tag")
@@ -124,6 +154,32 @@ def test_vector_repr(pep_context: pc.PEPContext) -> None:
     assert str(p1) == "my_tag"
 
 
+@pytest.mark.parametrize("eager_flatten", [False, True])
+def test_vector_repr_parenthesizes_sums(pep_context: pc.PEPContext, eager_flatten):
+    ctx = pc.PEPContext("repr", eager_flatten=eager_flatten).set_as_current()
+    x = vector.Vector(is_basis=True, tags=["x"])
+    y = vector.Vector(is_basis=True, tags=["y"])
+    diff = x - y
+    if eager_flatten:
+        assert isinstance(diff.eval_expression, vector.VectorByBasisRepresentation)
+
+    assert repr(2 * diff) == "2*(x-y)"
+    assert repr(diff * 2) == "(x-y)*2"
+    assert repr(x - diff) == "x-(x-y)"
+    assert repr(-diff) == "-(x-y)"
+    assert repr(diff * diff) == "⟨x-y,x-y⟩"
+    assert repr(2 * vector.sum_vectors([x, y])) == "2*(x+y)"
+    assert utils.parenthesize_tag(diff) == "(x-y)"
+    assert utils.parenthesize_tag(2 * diff) == "2*(x-y)"
+
+    # The tags of the operands are used once they are set.
+    diff.add_tag("d")
+    assert repr(3 * diff) == "3*(d)"
+    s = diff * x + 1
+    assert repr(2 * s) == "2*(⟨d,x⟩+1)"
+    assert ctx.eager_flatten == eager_flatten
+
+
 def test_vector_in_a_list(pep_context: pc.PEPContext):
     p1 = vector.Vector(is_basis=True, eval_expression=None)
     p2 = vector.Vector(is_basis=True, eval_expression=None)
@@ -260,6 +316,22 @@ def test_simplify_vector_basic(pep_context):
     )
 
 
+def test_simplify_vector_deep_expression(pep_context):
+    p1 = vector.Vector(is_basis=True, tags=["p1"])
+    p2 = vector.Vector(is_basis=True, tags=["p2"])
+    depth = 3 * sys.getrecursionlimit()
+
+    p = p1
+    for _ in range(depth):
+        p = p - 2 * p2
+
+    assert p.simplify().eval_expression.equiv(
+        vector.VectorByBasisRepresentation(
+            coeffs=defaultdict(int, {p1: 1, p2: -2 * depth})
+        )
+    )
+
+
 def test_simplify_vector_with_param(pep_context):
     p1 = vector.Vector(is_basis=True, tags=["p1"])
     p2 = vector.Vector(is_basis=True, tags=["p2"])
@@ -275,3 +347,95 @@ def test_simplify_vector_with_param(pep_context):
 
     # TODO: implement simplification for Parameter objects that includes
     # multiplication between Parameter objects, and add corresponding unit test
+
+
+def test_vector_by_basis_inner_product(pep_context):
+    p1 = vector.Vector(is_basis=True, tags=["p1"])
+    p2 = vector.Vector(is_basis=True, tags=["p2"])
+
+    # All the terms of the left operand contribute to the inner product.
+    s = ((p1 + p2) * (p1 - p2)).simplify()
+    assert s.eval_expression.equiv(
+        sc.ScalarByBasisRepresentation(
+            inner_prod_coeffs=defaultdict(int, {(p1, p1): 1, (p2, p2): -1})
+        )
+    )
+
+
+def test_make_basis_vectors(pep_context: pc.PEPContext) -> None:
+    p0 = vector.Vector(is_basis=True, tags=["p_0"])
+    vectors = vector.Vector.make_basis("p_{}", range(1, 4))
+    assert [repr(v) for v in vectors] == ["p_1", "p_2", "p_3"]
+    assert all(v.is_basis for v in vectors)
+    assert pep_context.basis_vectors() == [p0, *vectors]
+    assert pep_context["p_2"] is vectors[1]
+    np.testing.assert_allclose(vectors[1].eval(), np.array([0, 0, 1, 0]))
+
+    with pytest.warns(UserWarning, match="p_0 was already associated"):
+        (new_p0,) = vector.Vector.make_basis("p_{}", 1)
+    assert pep_context["p_0"] is new_p0
+
+
+def test_vector_array(pep_context: pc.PEPContext):
+    x_0, x_1, x_2 = vector.Vector.make_basis("x_{}", 3)
+    y = x_0 - 2 * x_1
+    X = vector.VectorArray.from_vectors([x_0, x_1, x_2])
+    assert len(X) == 3
+    assert X[1] is x_1
+    assert X.basis == (x_0, x_1, x_2)
+
+    Y = vector.VectorArray.from_vectors([y, x_2 / 2])
+    assert Y.basis == (x_0, x_1, x_2)
+    np.testing.assert_allclose(Y.coeffs, [[1, -2, 0], [0, 0, 0.5]])
+
+    num_vectors = len(pep_context.vectors)
+    Z = 2 * X[:2] - Y
+    W = X[[2, 0]] * np.array([1.0, 3.0]) + y
+    assert len(pep_context.vectors) == num_vectors
+
+    em = exm.ExpressionManager(pep_context)
+
+    def coords(v: vector.Vector) -> np.ndarray:
+        return em.eval_vector(v).coords
+
+    np.testing.assert_allclose(coords(Z[0]), coords(x_0 + 2 * x_1))
+    np.testing.assert_allclose(coords(Z[1]), coords(2 * x_1 - x_2 / 2))
+    np.testing.assert_allclose(coords(W[0]), coords(x_2 + y))
+    np.testing.assert_allclose(coords(W[1]), coords(3 * x_0 + y))
+    np.testing.assert_allclose(
+        coords(np.array([1.0, 0.5, -1.0]) @ X), coords(x_0 + x_1 / 2 - x_2)
+    )
+    V = np.array([[1, 1, 0], [0, 1, 1]]) @ X
+    assert isinstance(V, vector.VectorArray)
+    np.testing.assert_allclose(coords(V[1]), coords(x_1 + x_2))
+
+
+def test_sum_vectors(pep_context: pc.PEPContext):
+    gs = vector.Vector.make_basis("g_{}", 2000)
+    weights = np.linspace(0, 1, len(gs))
+
+    num_vectors = len(pep_context.vectors)
+    z = vector.sum_vectors(gs, weights)
+    assert len(pep_context.vectors) == num_vectors + 1
+    assert repr(vector.sum_vectors(gs[:2], [1, 2])) == "g_0+2*g_1"
+
+    em = exm.ExpressionManager(pep_context)
+    np.testing.assert_allclose(em.eval_vector(z).coords, weights)
+    # The compiled and simplified representations agree.
+    y = z - vector.sum_vectors(gs[:3])
+    em.compile()
+    coords = em.eval_vector(y).coords
+    np.testing.assert_allclose(coords, weights - (np.arange(len(gs)) < 3))
+    simplified = y.simplify()
+    np.testing.assert_allclose(
+        exm.ExpressionManager(pep_context).eval_vector(simplified).coords, coords
+    )
+
+    # Eager flattening combines the flat terms into a single representation.
+    with pytest.warns(UserWarning):
+        ctx = pc.PEPContext("test", eager_flatten=True).set_as_current()
+    x_0, x_1 = vector.Vector.make_basis("x_{}", 2)
+    w = vector.sum_vectors([x_0, x_0 - x_1], [1, 2])
+    assert isinstance(w.eval_expression, vector.VectorByBasisRepresentation)
+    assert dict(w.eval_expression.coeffs) == {x_0: 3, x_1: -2}
+    assert ctx.vectors[-1] is w
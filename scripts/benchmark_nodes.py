@@ -0,0 +1,96 @@
+# Copyright: 2025 The PEPFlow Developers
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+"""
+Measure the memory and the time needed to create Vector and Scalar nodes.
+
+Usage:
+    python scripts/benchmark_nodes.py [--nodes 100000] [--repeat 3]
+
+The script builds a chain of gradient-descent style vector updates and the
+inner products of the iterates, then reports the bytes allocated per node
+(measured by tracemalloc) and the number of nodes created per second.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+import warnings
+
+import pepflow as pf
+
+
+def build_nodes(num_nodes: int) -> pf.PEPContext:
+    """Create about `num_nodes` vectors and scalars in a fresh context."""
+    with warnings.catch_warnings():
+        # The name of the context is reused across measurements.
+        warnings.simplefilter("ignore")
+        ctx = pf.PEPContext("benchmark_nodes").set_as_current()
+    x = pf.Vector(is_basis=True, tags=["x_0"])
+    g = pf.Vector(is_basis=True, tags=["g"])
+    # Each step creates 2 vectors (`0.5 * g` and `x - 0.5 * g`) and 1 scalar.
+    for _ in range(num_nodes // 3):
+        x = x - 0.5 * g
+        _ = x * g
+    return ctx
+
+
+def num_nodes_of(ctx: pf.PEPContext) -> int:
+    return len(ctx.vectors) + len(ctx.scalars)
+
+
+def measure_memory(num_nodes: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    ctx = build_nodes(num_nodes)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / num_nodes_of(ctx)
+
+
+def measure_speed(num_nodes: int, repeat: int) -> float:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        ctx = build_nodes(num_nodes)
+        best = min(best, time.perf_counter() - start)
+        count = num_nodes_of(ctx)
+        ctx.clear()
+    return count / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    bytes_per_node = measure_memory(args.nodes)
+    nodes_per_second = measure_speed(args.nodes, args.repeat)
+    print(f"nodes:          {args.nodes}")
+    print(f"bytes per node: {bytes_per_node:.1f}")
+    print(f"nodes / second: {nodes_per_second:,.0f}")
+
+
+if __name__ == "__main__":
+    main()